@@ -1,5 +1,5 @@
 """Console output utilities for the Texterify Language Processor."""
 
-from .console_output import ConsoleOutput
+from .console_output import ConsoleOutput, OutputMode
 
-__all__ = ["ConsoleOutput"]
+__all__ = ["ConsoleOutput", "OutputMode"]
@@ -1,156 +1,573 @@
 """Utility for console output formatting."""
 
+import atexit
+import threading
+import time
+from enum import Enum
+
+import json
 import sys
 from pathlib import Path
-from typing import Any, List
+from typing import Any, List, Optional, TextIO
+
+
+class OutputMode(Enum):
+    """Console verbosity modes."""
+
+    QUIET = "quiet"
+    NORMAL = "normal"
+    VERBOSE = "verbose"
+    JSON = "json"
+
+
+# Message levels: essential lines (errors, warnings, prompts) show in every
+# mode, info lines in normal and verbose mode, detail lines only in verbose
+ESSENTIAL = 0
+INFO = 1
+DETAIL = 2
+
+UNICODE_SYMBOLS = {
+    "rocket": "🚀",
+    "folder": "📁",
+    "globe": "🌐",
+    "warning": "⚠️ ",
+    "package": "📦",
+    "check": "✓",
+    "info": "📋",
+    "lightbulb": "💡",
+    "note": "📝",
+    "error": "❌",
+    "arrow": "→",
+}
+
+ASCII_SYMBOLS = {
+    "rocket": "[INFO]",
+    "folder": "[FILE]",
+    "globe": "[LANG]",
+    "warning": "[WARN]",
+    "package": "[ARCH]",
+    "check": "[OK]",
+    "info": "[INFO]",
+    "lightbulb": "[TIP]",
+    "note": "[NOTE]",
+    "error": "[ERROR]",
+    "arrow": "->",
+}
 
 
 class ConsoleOutput:
-    """Utility class for formatted console output."""
+    """Formatted console output shared by the whole application.
 
-    @staticmethod
-    def _supports_unicode():
+    Terminal capabilities are detected once per stream, lines are coalesced
+    into buffered writes, and per-file lines are rate-limited into a progress
+    summary when an export has many members.
+    """
+
+    # Renamed files listed individually in normal mode before summarizing
+    RENAME_LINE_LIMIT = 20
+    # Buffered lines are written once this many pile up or this much time passes
+    BUFFER_LINES = 64
+    FLUSH_INTERVAL = 0.2
+    # Minimum seconds between progress summaries for rate-limited lines
+    SUMMARY_INTERVAL = 1.0
+
+    _mode = OutputMode.NORMAL
+    _stream: Optional[TextIO] = None
+    _symbols: Optional[dict] = None
+    _symbols_stream: Optional[TextIO] = None
+    _buffer: List[str] = []
+    _last_flush = 0.0
+    # Each job renames its files on one thread, so rename counts are kept
+    # per thread and concurrent jobs summarize only their own renames
+    _renames = threading.local()
+    _progress_width = 0
+    _lock = threading.RLock()
+
+    @classmethod
+    def configure(
+        cls, mode: Optional[OutputMode] = None, stream: Optional[TextIO] = None
+    ):
+        """Set the output mode and target stream (stdout when None)."""
+        with cls._lock:
+            cls.flush()
+            if mode is not None:
+                cls._mode = mode
+            cls._stream = stream
+            cls._symbols = None
+
+    @classmethod
+    def get_mode(cls) -> OutputMode:
+        """Get the current output mode."""
+        return cls._mode
+
+    @classmethod
+    def _get_stream(cls) -> TextIO:
+        """Get the stream human-readable output is written to."""
+        if cls._stream is not None:
+            return cls._stream
+        # JSON documents own stdout, so human output moves to stderr
+        return sys.stderr if cls._mode == OutputMode.JSON else sys.stdout
+
+    @classmethod
+    def _supports_unicode(cls) -> bool:
         """Check if the current environment supports Unicode emojis."""
-        try:
-            # Test if we can encode a simple emoji
-            "🚀".encode(sys.stdout.encoding or "utf-8")
+        return cls._get_symbols() is UNICODE_SYMBOLS
+
+    @classmethod
+    def _get_symbols(cls) -> dict:
+        """Get appropriate symbols, detecting Unicode support once per stream."""
+        stream = cls._get_stream()
+        if cls._symbols is None or cls._symbols_stream is not stream:
+            try:
+                # Test if we can encode a simple emoji
+                "🚀".encode(getattr(stream, "encoding", None) or "utf-8")
+                cls._symbols = UNICODE_SYMBOLS
+            except (UnicodeEncodeError, UnicodeError, LookupError):
+                cls._symbols = ASCII_SYMBOLS
+            cls._symbols_stream = stream
+        return cls._symbols
+
+    @classmethod
+    def get_symbol(cls, name: str) -> str:
+        """Get a single display symbol for the current stream."""
+        return cls._get_symbols()[name]
+
+    @classmethod
+    def _is_enabled(cls, level: int) -> bool:
+        """Check if messages of the given level are shown in the current mode."""
+        if cls._mode == OutputMode.VERBOSE:
             return True
-        except (UnicodeEncodeError, UnicodeError):
-            return False
+        if cls._mode == OutputMode.NORMAL:
+            return level <= INFO
+        return level == ESSENTIAL
 
-    @staticmethod
-    def _get_symbols():
-        """Get appropriate symbols based on Unicode support."""
-        if ConsoleOutput._supports_unicode():
-            return {
-                "rocket": "🚀",
-                "folder": "📁",
-                "globe": "🌐",
-                "warning": "⚠️ ",
-                "package": "📦",
-                "check": "✓",
-                "info": "📋",
-                "lightbulb": "💡",
-                "note": "📝",
-            }
-        else:
-            return {
-                "rocket": "[INFO]",
-                "folder": "[FILE]",
-                "globe": "[LANG]",
-                "warning": "[WARN]",
-                "package": "[ARCH]",
-                "check": "[OK]",
-                "info": "[INFO]",
-                "lightbulb": "[TIP]",
-                "note": "[NOTE]",
-            }
+    @classmethod
+    def _write(cls, line: str, level: int = INFO, flush: bool = False):
+        """Queue a line for output, writing the buffer when due."""
+        if not cls._is_enabled(level):
+            return
+        with cls._lock:
+            cls._buffer.append(line)
+            now = time.monotonic()
+            if (
+                flush
+                or level == ESSENTIAL
+                or len(cls._buffer) >= cls.BUFFER_LINES
+                or now - cls._last_flush >= cls.FLUSH_INTERVAL
+            ):
+                cls._flush_locked(now)
 
-    @staticmethod
-    def print_header(version_string: str):
+    @classmethod
+    def flush(cls):
+        """Write any buffered output."""
+        with cls._lock:
+            cls._flush_locked(time.monotonic())
+
+    @classmethod
+    def _flush_locked(cls, now: float):
+        """Write the buffer; caller must hold the lock."""
+        if cls._progress_width:
+            # Erase the progress line so regular output starts on a clean line
+            stream = cls._get_stream()
+            stream.write("\r" + " " * cls._progress_width + "\r")
+            stream.flush()
+            cls._progress_width = 0
+        if cls._buffer:
+            stream = cls._get_stream()
+            stream.write("\n".join(cls._buffer) + "\n")
+            stream.flush()
+            cls._buffer = []
+        cls._last_flush = now
+
+    @classmethod
+    def prompt(cls, message: str) -> str:
+        """Read a line of user input, writing the prompt to the console stream."""
+        with cls._lock:
+            cls._flush_locked(time.monotonic())
+            stream = cls._get_stream()
+            stream.write(message)
+            stream.flush()
+        return input()
+
+    @classmethod
+    def print_json(cls, data: Any):
+        """Print a JSON document to stdout, after any pending human output."""
+        cls.flush()
+        sys.stdout.write(json.dumps(data, indent=2) + "\n")
+        sys.stdout.flush()
+
+    @classmethod
+    def print_header(cls, version_string: str):
         """Print application header."""
-        symbols = ConsoleOutput._get_symbols()
-        print(f"{symbols['rocket']} {version_string}")
+        symbols = cls._get_symbols()
+        cls._write(f"{symbols['rocket']} {version_string}")
 
-    @staticmethod
-    def print_input_info(file_path: Path, languages: List[str]):
+    @classmethod
+    def print_input_info(cls, file_path: Path, languages: List[str]):
         """Print input file information."""
-        symbols = ConsoleOutput._get_symbols()
-        print(f"{symbols['folder']} Input: {file_path.name}")
+        symbols = cls._get_symbols()
+        cls._write(f"{symbols['folder']} Input: {file_path.name}")
         if languages:
             language_list = ", ".join(languages)
-            print(f"{symbols['globe']} Languages configured: {language_list}")
+            cls._write(f"{symbols['globe']} Languages configured: {language_list}")
         else:
-            print(f"{symbols['warning']} No language mappings configured!")
+            cls._write(
+                f"{symbols['warning']} No language mappings configured!", ESSENTIAL
+            )
 
-    @staticmethod
-    def print_extraction_start():
+    @classmethod
+    def print_extraction_start(cls):
         """Print extraction start message."""
-        symbols = ConsoleOutput._get_symbols()
-        print(f"{symbols['package']} Extracting archive...")
+        symbols = cls._get_symbols()
+        cls._write(f"{symbols['package']} Extracting archive...", flush=True)
+
+    @classmethod
+    def print_inspection(cls, report: Any):
+        """Print archive inspection report."""
+        symbols = cls._get_symbols()
+        archive = report.archive
+        if not archive.is_valid:
+            cls._write(
+                f"{symbols['warning']} Error: {archive.error_message}", ESSENTIAL
+            )
+            return
+
+        cls._write(
+            f"{symbols['package']} Archive: {archive.name} "
+            f"({archive.file_count} members, "
+            f"{cls._format_size(archive.total_compressed_size)} packed, "
+            f"{cls._format_size(archive.total_size)} unpacked)"
+        )
+        for member in archive.members:
+            line = (
+                f"  {cls._format_size(member.file_size):>10} "
+                f"{cls._format_size(member.compress_size):>10} "
+                f"{member.compression_ratio:>6.1f}x  {member.name}"
+            )
+            if member.will_rename:
+                line += f" {symbols['arrow']} {member.target_name}"
+            cls._write(line)
+
+        if not archive.has_language_files():
+            cls._write(f"{symbols['warning']} No configured language files found")
+
+        if report.output_filename:
+            cls._write(f"{symbols['folder']} Output: {report.output_filename}")
+        if report.output_exists:
+            cls._write(
+                f"{symbols['info']} Output exists; counter would produce: "
+                f"{report.counter_filename}"
+            )
+        cls.flush()
 
     @staticmethod
-    def print_result(result: Any):
+    def _format_size(size: int) -> str:
+        """Format a byte count for display."""
+        value = float(size)
+        for unit in ("B", "KB", "MB"):
+            if value < 1024:
+                return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+            value /= 1024
+        return f"{value:.1f} GB"
+
+    @classmethod
+    def print_result(cls, result: Any):
         """Print processing result."""
-        if result.success:
-            ConsoleOutput._print_success_result(result)
+        if result.dry_run:
+            cls._print_plan_result(result)
+        elif result.success:
+            cls._print_success_result(result)
         else:
-            ConsoleOutput._print_error_result(result)
+            cls._print_error_result(result)
+        cls.flush()
 
-    @staticmethod
-    def _print_success_result(result: Any):
+    @classmethod
+    def _print_success_result(cls, result: Any):
         """Print successful processing result."""
-        symbols = ConsoleOutput._get_symbols()
-        print(
+        symbols = cls._get_symbols()
+        cls._write(
             f"\n{symbols['check']} Success! Processed "
             f"{result.processed_files_count} files"
         )
 
         if result.output_file:
-            print(f"{symbols['package']} Output: {result.output_file.name}")
-            print(f"{symbols['folder']} Location: {result.output_file.parent}")
+            cls._write(f"{symbols['package']} Output: {result.output_file.name}")
+            cls._write(f"{symbols['folder']} Location: {result.output_file.parent}")
 
         if result.used_counter and result.counter_value:
-            print(f"{symbols['info']} Counter: {result.counter_value}")
+            cls._write(f"{symbols['info']} Counter: {result.counter_value}")
 
-    @staticmethod
-    def _print_error_result(result: Any):
+        for shard in result.shards:
+            if shard.skipped:
+                cls._write(f"{symbols['warning']} Shard {shard.name}: skipped")
+                continue
+            note = " (unchanged)" if shard.unchanged else ""
+            cls._write(
+                f"{symbols['package']} Shard {shard.name}: "
+                f"{shard.output_file.name}{note}"
+            )
+            if shard.uploaded_to:
+                cls._write(f"{symbols['info']} Uploaded: {shard.uploaded_to}")
+
+        if result.uploaded_to:
+            cls._write(f"{symbols['info']} Uploaded: {result.uploaded_to}")
+
+        if result.unchanged:
+            cls._write(
+                f"{symbols['info']} Output unchanged; the existing file was kept"
+            )
+
+        if result.linked_files:
+            cls._write(
+                f"{symbols['info']} Reused {result.linked_files} unchanged files "
+                f"from the previous version"
+            )
+
+        for phase, duration in result.phase_timings.items():
+            cls._write(f"{symbols['info']} {phase}: {duration:.3f}s", DETAIL)
+
+    @classmethod
+    def _print_plan_result(cls, result: Any):
+        """Print dry-run plan result."""
+        symbols = cls._get_symbols()
+        cls._write(f"{symbols['note']} Dry run: nothing was extracted or written")
+        for operation in result.file_operations:
+            cls._write(
+                f"{symbols['check']} Would rename: {operation.original_name} "
+                f"{symbols['arrow']} {operation.new_name}"
+            )
+        for collision in result.collisions:
+            cls._write(f"{symbols['warning']} Collision: {collision}", ESSENTIAL)
+
+        if result.output_file:
+            cls._write(f"{symbols['package']} Output: {result.output_file.name}")
+        if result.used_counter and result.counter_value:
+            cls._write(f"{symbols['info']} Counter: {result.counter_value}")
+        if result.estimated_output_size is not None:
+            size = cls._format_size(result.estimated_output_size)
+            cls._write(f"{symbols['info']} Estimated size: {size}")
+
+        if not result.success:
+            cls._print_error_result(result)
+
+    @classmethod
+    def _print_error_result(cls, result: Any):
         """Print error result."""
-        symbols = ConsoleOutput._get_symbols()
+        symbols = cls._get_symbols()
         if result.error_message:
-            print(f"{symbols['warning']} Error: {result.error_message}")
+            cls._write(f"{symbols['warning']} Error: {result.error_message}", ESSENTIAL)
         else:
-            print(f"{symbols['warning']} Processing failed")
+            cls._write(f"{symbols['warning']} Processing failed", ESSENTIAL)
 
-    @staticmethod
-    def print_no_language_files_warning(configured_languages: List[str]):
+    @classmethod
+    def print_batch_summary(cls, batch: Any):
+        """Print batch processing summary."""
+        symbols = cls._get_symbols()
+        summary = (
+            f"\n{symbols['info']} Batch: {batch.total} jobs, "
+            f"{batch.succeeded} succeeded, {batch.failed} failed"
+        )
+        if batch.skipped:
+            summary += f", {batch.skipped} already done"
+        cls._write(summary)
+        if len(batch.workers) > 1:
+            for worker in batch.workers:
+                cls._write(
+                    f"{symbols['info']} {worker.name}: {worker.jobs} jobs, "
+                    f"busy {worker.utilization * 100:.0f}% "
+                    f"({worker.busy_seconds:.1f}s of {worker.wall_seconds:.1f}s)"
+                )
+        for input_file in batch.failed_inputs:
+            cls._write(f"{symbols['warning']} Failed: {input_file}", ESSENTIAL)
+        cls.flush()
+
+    @classmethod
+    def print_catalog_jobs(cls, jobs: List[Any]):
+        """Print catalogued jobs, oldest first."""
+        symbols = cls._get_symbols()
+        if not jobs:
+            cls._write(f"{symbols['info']} No catalogued jobs found")
+        for job in jobs:
+            line = (
+                f"{symbols['package']} {job.processed_at}  {job.input_path} "
+                f"{symbols['arrow']} {job.output_path or '-'}"
+            )
+            if job.unchanged:
+                line += " (unchanged)"
+            cls._write(line)
+        cls.flush()
+
+    @classmethod
+    def print_key_occurrences(cls, occurrences: List[Any]):
+        """Print where a translation key was found, oldest first."""
+        symbols = cls._get_symbols()
+        if not occurrences:
+            cls._write(f"{symbols['info']} Key not found in the catalog")
+        for occurrence in occurrences:
+            cls._write(
+                f"  {occurrence.processed_at}  {occurrence.language:<8} "
+                f"{occurrence.value_sha256[:12]}  "
+                f"{occurrence.output_path or occurrence.input_path}"
+            )
+        cls.flush()
+
+    @classmethod
+    def print_memory_report(cls, report: Any):
+        """Print the peak and retained memory of each phase."""
+        symbols = cls._get_symbols()
+        size = cls._format_size
+        for phase in report.phases:
+            retained = phase.retained_bytes
+            line = (
+                f"{symbols['info']} {phase.phase:<10} peak {size(phase.peak_bytes)}, "
+                f"retained {'-' if retained < 0 else ''}{size(abs(retained))}"
+            )
+            if phase.rss_peak_bytes is not None:
+                line += f", RSS peak {size(phase.rss_peak_bytes)}"
+            cls._write(line)
+            for site in phase.top_allocations:
+                cls._write(f"    {size(site.size_diff):>10}  {site.location}", DETAIL)
+        cls._write(f"{symbols['info']} Traced peak: {size(report.peak_bytes)}")
+        if not report.per_phase_peaks:
+            cls._write(
+                f"{symbols['note']} Phase peaks include earlier phases on this "
+                f"Python version"
+            )
+        cls.flush()
+
+    @classmethod
+    def print_no_language_files_warning(cls, configured_languages: List[str]):
         """Print warning when no language files are found."""
-        symbols = ConsoleOutput._get_symbols()
-        print(
+        symbols = cls._get_symbols()
+        cls._write(
             f"{symbols['warning']} Warning: No configured language files "
-            f"found in the archive!"
+            f"found in the archive!",
+            ESSENTIAL,
         )
         if configured_languages:
             lang_list = ", ".join(configured_languages)
-            print(
+            cls._write(
                 f"{symbols['lightbulb']} Make sure your zip contains files "
                 f"named: {lang_list}"
             )
-        print(
+        cls._write(
             f"{symbols['lightbulb']} Check your configuration file: "
             f"config/language_mappings.json"
         )
 
-    @staticmethod
-    def print_completion_message(success: bool):
+    @classmethod
+    def print_completion_message(cls, success: bool):
         """Print final completion message."""
-        symbols = ConsoleOutput._get_symbols()
+        symbols = cls._get_symbols()
         if success:
-            print(f"\n{symbols['check']} Processing completed successfully!")
+            cls._write(f"\n{symbols['check']} Processing completed successfully!")
         else:
-            print(f"\n{symbols['warning']} Processing failed!")
+            cls._write(f"\n{symbols['warning']} Processing failed!")
+        cls.flush()
 
-    @staticmethod
-    def print_error(message: str):
+    @classmethod
+    def print_error(cls, message: str):
         """Print error message."""
-        symbols = ConsoleOutput._get_symbols()
-        print(f"{symbols['warning']} Error: {message}")
+        symbols = cls._get_symbols()
+        cls._write(f"{symbols['warning']} Error: {message}", ESSENTIAL)
 
-    @staticmethod
-    def print_warning(message: str):
+    @classmethod
+    def print_warning(cls, message: str):
         """Print warning message."""
-        symbols = ConsoleOutput._get_symbols()
-        print(f"{symbols['warning']} Warning: {message}")
+        symbols = cls._get_symbols()
+        cls._write(f"{symbols['warning']} Warning: {message}", ESSENTIAL)
 
-    @staticmethod
-    def print_info(message: str):
+    @classmethod
+    def print_info(cls, message: str):
         """Print info message."""
-        symbols = ConsoleOutput._get_symbols()
-        print(f"{symbols['info']} Info: {message}")
+        symbols = cls._get_symbols()
+        cls._write(f"{symbols['info']} Info: {message}")
 
-    @staticmethod
-    def print_renamed_file(original_name: str, new_name: str):
-        """Print file rename operation."""
-        symbols = ConsoleOutput._get_symbols()
-        arrow = "→" if ConsoleOutput._supports_unicode() else "->"
-        print(f"{symbols['check']} Renamed: {original_name} {arrow} {new_name}")
+    @classmethod
+    def print_notice(cls, message: str):
+        """Print a message shown in every mode, such as a prompt's options."""
+        cls._write(message, ESSENTIAL)
+
+    @classmethod
+    def print_detail(cls, message: str):
+        """Print a message shown only in verbose mode."""
+        symbols = cls._get_symbols()
+        cls._write(f"{symbols['note']} {message}", DETAIL)
+
+    @classmethod
+    def print_renamed_file(cls, original_name: str, new_name: str):
+        """Print file rename operation, summarizing once there are many."""
+        symbols = cls._get_symbols()
+        renames = cls._renames
+        count = renames.count = getattr(renames, "count", 0) + 1
+
+        level = INFO if count <= cls.RENAME_LINE_LIMIT else DETAIL
+        cls._write(
+            f"{symbols['check']} Renamed: {original_name} {symbols['arrow']} "
+            f"{new_name}",
+            level,
+        )
+
+        if level == DETAIL and cls._mode == OutputMode.NORMAL:
+            now = time.monotonic()
+            if now - getattr(renames, "last_summary", 0.0) >= cls.SUMMARY_INTERVAL:
+                renames.last_summary = now
+                cls._write(f"{symbols['check']} Renamed {count} files so far...")
+
+    @classmethod
+    def print_progress(cls, snapshot: Any):
+        """Redraw the progress line of a running phase; terminals only."""
+        if not cls._is_enabled(INFO):
+            return
+        with cls._lock:
+            stream = cls._get_stream()
+            isatty = getattr(stream, "isatty", None)
+            if isatty is None or not isatty():
+                return
+            cls._flush_locked(time.monotonic())
+            if snapshot.finished:
+                return
+
+            line = cls._format_progress(snapshot)
+            stream.write(line)
+            stream.flush()
+            cls._progress_width = len(line)
+
+    @classmethod
+    def _format_progress(cls, snapshot: Any) -> str:
+        """Format a progress snapshot as a single status line."""
+        symbols = cls._get_symbols()
+        parts = [f"{symbols['package']} {snapshot.phase}"]
+        parts.append(f"{snapshot.fraction * 100:5.1f}%")
+        if snapshot.bytes_total:
+            parts.append(
+                f"{cls._format_size(snapshot.bytes_done)} / "
+                f"{cls._format_size(snapshot.bytes_total)}"
+            )
+        if snapshot.members_total:
+            parts.append(f"{snapshot.members_done}/{snapshot.members_total} files")
+        if snapshot.bytes_done:
+            parts.append(f"{snapshot.bytes_per_second / (1024 * 1024):.1f} MB/s")
+        eta = snapshot.eta
+        if eta is not None:
+            parts.append(f"ETA {eta:.0f}s")
+        return "  ".join(parts)
+
+    @classmethod
+    def print_rename_summary(cls):
+        """Summarize renames that were not listed individually and reset."""
+        renames = cls._renames
+        count = getattr(renames, "count", 0)
+        renames.count = 0
+        renames.last_summary = 0.0
+
+        hidden = count - cls.RENAME_LINE_LIMIT
+        if hidden > 0 and cls._mode == OutputMode.NORMAL:
+            symbols = cls._get_symbols()
+            cls._write(
+                f"{symbols['check']} ... and {hidden} more files renamed "
+                f"({count} total)"
+            )
+
+
+atexit.register(ConsoleOutput.flush)
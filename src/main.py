@@ -10,16 +10,58 @@ Author: Texterify Language Processor Team
 License: MIT
 """
 
+import contextlib
+
 import argparse
+import json
 import sys
+import tempfile
 from pathlib import Path
+from typing import ContextManager, List, Optional, Tuple
 
 # Add the project root to the path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import after path modification
-import texterify_processor as legacy_processor  # noqa: E402
-from console_output import ConsoleOutput  # noqa: E402
+from console_output import ConsoleOutput, OutputMode  # noqa: E402
+from texterify_processor import BatchController, ProcessorController  # noqa: E402
+from texterify_processor.models.config import (  # noqa: E402
+    ARCHIVE_EXTENSIONS,
+    MANIFEST_MODES,
+    OUTPUT_MODES,
+)
+from texterify_processor.models.merge import (  # noqa: E402
+    MERGE_CONFLICT_POLICIES,
+    MergeInput,
+)
+from texterify_processor.services import (  # noqa: E402
+    ArchiveService,
+    BatchJournal,
+    CatalogService,
+    EventSink,
+    MetricsRegistry,
+    NdjsonEventSink,
+    OutputSink,
+    open_output_sink,
+)
+from texterify_processor.services.output_sinks import (  # noqa: E402
+    DEFAULT_PART_SIZE,
+    DEFAULT_UPLOAD_CONCURRENCY,
+    DEFAULT_UPLOAD_MEMORY,
+)
+from texterify_processor.utils.cpu_profiler import (  # noqa: E402
+    DEFAULT_DUMP_SECONDS,
+    CpuProfiler,
+    SignalDumper,
+)
+from texterify_processor.utils.memory_profiler import (  # noqa: E402
+    DEFAULT_TOP_SITES,
+    MemoryProfiler,
+)
+from texterify_processor.utils.synthetic_export import SyntheticExport  # noqa: E402
+from texterify_processor.utils.user_interaction import (  # noqa: E402
+    ConflictResolution,
+)
 from version import get_version_string  # noqa: E402
 
 
@@ -35,6 +77,18 @@ Examples:
   python main.py "my_export.zip"
   python main.py "export.zip" --config "custom_mappings.json"
   python main.py "C:/exports/language_files.zip"
+  python main.py "export.zip" --dry-run --json
+  python main.py inspect "export.zip" --json
+  python main.py batch exports/*.zip --events results.ndjson
+  python main.py batch exports/*.zip --metrics-file texterify.prom
+  python main.py batch exports/*.zip --catalog catalog.db
+  python main.py "export.zip" --profile job.prof
+  python main.py merge app.zip web=web_export.zip --on-duplicate first
+  python main.py catalog key greeting.title --language tr --first -d catalog.db
+  python main.py bench-memory --keys 20000 --budget extract=8 --budget total=16
+  python main.py "export.zip" --output-mode directory
+  python main.py "export.zip" --output-mode tar.gz --output - | ssh host tar xz
+  curl -s "$EXPORT_URL" | python main.py - --output - | upload-tool
 
 Features:
   - Configurable language file mappings via JSON config
@@ -58,18 +112,757 @@ Conflict Resolution:
     )
 
     parser.add_argument(
-        "zip_file", help="Path to the Texterify zip export file to process"
+        "zip_file",
+        help="Path to the Texterify zip export file to process, or '-' for stdin",
     )
 
     parser.add_argument(
         "--config", "-c", help="Path to custom language mappings configuration file"
     )
 
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Plan all operations from the archive listing without writing anything",
+    )
+
+    add_output_arguments(parser, json_help="Print the result as JSON")
+
+    add_pipeline_arguments(parser, default_conflict="ask")
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        metavar="PATH",
+        help="Write the output archive to PATH, or stream it to stdout with '-'",
+    )
+
     parser.add_argument("--version", action="version", version=get_version_string())
 
     return parser
 
 
+def create_inspect_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the inspect command."""
+    parser = argparse.ArgumentParser(
+        prog="main.py inspect",
+        description=(
+            "List archive members, sizes and planned renames by reading only "
+            "the zip central directory"
+        ),
+    )
+
+    parser.add_argument(
+        "zip_file", help="Path to the Texterify zip export to inspect, or '-' for stdin"
+    )
+
+    parser.add_argument(
+        "--config", "-c", help="Path to custom language mappings configuration file"
+    )
+
+    add_output_arguments(parser, json_help="Print the report as JSON")
+
+    return parser
+
+
+def create_batch_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the batch command."""
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="Process many Texterify exports without prompting",
+    )
+
+    parser.add_argument("zip_files", nargs="+", help="Texterify zip exports to process")
+
+    parser.add_argument(
+        "--config", "-c", help="Path to custom language mappings configuration file"
+    )
+
+    add_output_arguments(parser, json_help="Print the batch summary as JSON")
+
+    add_pipeline_arguments(parser, default_conflict="counter")
+
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Process N exports at a time, largest first, with small ones "
+            "packed together (default: %(default)s)"
+        ),
+    )
+
+    parser.add_argument(
+        "--journal",
+        metavar="FILE",
+        help=(
+            "Record job states in FILE; rerunning with the same journal skips "
+            "completed jobs and removes outputs interrupted jobs left behind"
+        ),
+    )
+
+    parser.add_argument(
+        "--dump-dir",
+        metavar="DIR",
+        default=tempfile.gettempdir(),
+        help=(
+            "Where SIGUSR1 writes thread stacks and a sampled profile "
+            "(default: %(default)s)"
+        ),
+    )
+
+    parser.add_argument(
+        "--dump-seconds",
+        type=float,
+        default=DEFAULT_DUMP_SECONDS,
+        metavar="SECONDS",
+        help="How long SIGUSR1 samples for its profile (default: %(default)s)",
+    )
+
+    return parser
+
+
+def create_merge_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the merge command."""
+    parser = argparse.ArgumentParser(
+        prog="main.py merge",
+        description=(
+            "Stream several Texterify exports into one output archive, copying "
+            "compressed zip data without recompressing it"
+        ),
+    )
+
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        metavar="[NAMESPACE=]ZIP",
+        help=(
+            "Exports to merge, in precedence order; files of an input with a "
+            "NAMESPACE are placed in that directory of the output"
+        ),
+    )
+
+    parser.add_argument(
+        "--config", "-c", help="Path to custom language mappings configuration file"
+    )
+
+    parser.add_argument(
+        "--input-config",
+        action="append",
+        default=[],
+        metavar="NAMESPACE=FILE",
+        help="Rename the files of the input in NAMESPACE with FILE's mappings",
+    )
+
+    parser.add_argument(
+        "--on-duplicate",
+        choices=MERGE_CONFLICT_POLICIES,
+        default="error",
+        help=(
+            "What to do when inputs provide the same output path: fail, keep "
+            "the earliest input's file or keep the latest one (default: error)"
+        ),
+    )
+
+    add_output_arguments(parser, json_help="Print the result as JSON")
+
+    add_pipeline_arguments(parser, default_conflict="ask")
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        metavar="PATH",
+        help="Write the output archive to PATH, or stream it to stdout with '-'",
+    )
+
+    return parser
+
+
+def create_catalog_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the catalog command."""
+    parser = argparse.ArgumentParser(
+        prog="main.py catalog",
+        description="Query the catalog of processed exports",
+    )
+    queries = parser.add_subparsers(dest="query", metavar="QUERY")
+    queries.required = True
+
+    key_parser = queries.add_parser(
+        "key", help="List the jobs whose language files contain a key"
+    )
+    key_parser.add_argument("key", help="Translation key, nested keys joined by '.'")
+    key_parser.add_argument("--language", "-l", help="Only search this language")
+    key_parser.add_argument(
+        "--first",
+        action="store_true",
+        help="Only show the first job each language had the key in",
+    )
+
+    export_parser = queries.add_parser(
+        "export", help="List the jobs, and their outputs, that processed an export"
+    )
+    export_parser.add_argument(
+        "export", help="Path of the export; existing files also match by content"
+    )
+
+    for query_parser in (key_parser, export_parser):
+        query_parser.add_argument(
+            "--catalog",
+            "-d",
+            required=True,
+            metavar="FILE",
+            help="SQLite catalog written with --catalog",
+        )
+        add_output_arguments(query_parser, json_help="Print the matches as JSON")
+
+    return parser
+
+
+def create_bench_memory_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the bench-memory command."""
+    parser = argparse.ArgumentParser(
+        prog="main.py bench-memory",
+        description=(
+            "Process an export under tracemalloc and RSS sampling and report "
+            "peak and retained memory for every phase"
+        ),
+    )
+
+    parser.add_argument(
+        "zip_file",
+        nargs="?",
+        help="Export to profile (default: a generated synthetic export)",
+    )
+
+    parser.add_argument(
+        "--config", "-c", help="Path to custom language mappings configuration file"
+    )
+
+    defaults = SyntheticExport()
+    synthetic = parser.add_argument_group("synthetic export")
+    synthetic.add_argument(
+        "--languages",
+        default=",".join(defaults.languages),
+        help="Comma-separated languages to generate (default: %(default)s)",
+    )
+    synthetic.add_argument(
+        "--keys",
+        type=int,
+        default=defaults.keys_per_language,
+        help="Keys per language file (default: %(default)s)",
+    )
+    synthetic.add_argument(
+        "--assets",
+        type=int,
+        default=defaults.asset_count,
+        help="Number of asset files (default: %(default)s)",
+    )
+    synthetic.add_argument(
+        "--asset-size",
+        type=int,
+        default=defaults.asset_size,
+        metavar="BYTES",
+        help="Size of each asset file (default: %(default)s)",
+    )
+
+    parser.add_argument(
+        "--output-mode",
+        choices=list(ARCHIVE_EXTENSIONS),
+        help="Archive format to write (default: from config)",
+    )
+
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        type=parse_memory_budget,
+        metavar="PHASE=MB",
+        help=(
+            "Fail when the traced peak of PHASE, or of the whole run for "
+            "'total', exceeds MB megabytes; may be repeated"
+        ),
+    )
+
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=DEFAULT_TOP_SITES,
+        metavar="N",
+        help="Allocation sites to report per phase (default: %(default)s)",
+    )
+
+    parser.add_argument(
+        "--report", metavar="FILE", help="Write the memory report as JSON to FILE"
+    )
+
+    add_output_arguments(parser, json_help="Print the memory report as JSON")
+
+    return parser
+
+
+def parse_memory_budget(value: str) -> Tuple[str, int]:
+    """Parse a PHASE=MB budget into the phase name and a byte count."""
+    phase, separator, megabytes = value.partition("=")
+    try:
+        if not separator or not phase:
+            raise ValueError(value)
+        return phase, int(float(megabytes) * 1024 * 1024)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected PHASE=MB, got '{value}'")
+
+
+CONFLICT_POLICIES = {
+    "ask": None,
+    "overwrite": ConflictResolution.OVERWRITE,
+    "counter": ConflictResolution.ADD_COUNTER,
+    "skip": ConflictResolution.CANCEL,
+}
+
+
+def add_output_arguments(parser: argparse.ArgumentParser, json_help: str):
+    """Add the mutually exclusive console output mode options."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--json", action="store_true", help=json_help)
+    group.add_argument(
+        "--quiet", "-q", action="store_true", help="Only print warnings and errors"
+    )
+    group.add_argument(
+        "--verbose", "-v", action="store_true", help="Print every file and timings"
+    )
+
+
+def configure_console(args: argparse.Namespace):
+    """Apply the console mode and stream selected on the command line."""
+    if args.json:
+        mode = OutputMode.JSON
+    elif args.quiet:
+        mode = OutputMode.QUIET
+    elif args.verbose:
+        mode = OutputMode.VERBOSE
+    else:
+        mode = OutputMode.NORMAL
+
+    # Events or archive data on stdout push human-readable output to stderr
+    stdout_taken = "-" in (getattr(args, "events", None), getattr(args, "output", None))
+    stream = sys.stderr if stdout_taken else None
+    ConsoleOutput.configure(mode=mode, stream=stream)
+
+
+def add_pipeline_arguments(parser: argparse.ArgumentParser, default_conflict: str):
+    """Add options shared by commands that run the processing pipeline."""
+    choices = list(CONFLICT_POLICIES)
+    if default_conflict != "ask":
+        choices.remove("ask")
+
+    parser.add_argument(
+        "--on-conflict",
+        choices=choices,
+        default=default_conflict,
+        help=f"How to handle an existing output file (default: {default_conflict})",
+    )
+
+    parser.add_argument(
+        "--output-mode",
+        choices=OUTPUT_MODES,
+        help=(
+            "Archive format to write, or 'directory' to publish a versioned "
+            "directory behind a 'current' symlink (default: from config)"
+        ),
+    )
+
+    parser.add_argument(
+        "--deterministic",
+        action="store_true",
+        help=(
+            "Write reproducible archives: sorted members, normalized "
+            "permissions and a fixed timestamp from SOURCE_DATE_EPOCH, the "
+            "config, or the newest input member"
+        ),
+    )
+
+    parser.add_argument(
+        "--manifest",
+        choices=MANIFEST_MODES,
+        help=(
+            "Embed a manifest.json with the size and SHA-256 of every file in "
+            "the archive; 'sidecar' also writes it next to the archive"
+        ),
+    )
+
+    parser.add_argument(
+        "--shard-by-language",
+        action="store_true",
+        help=(
+            "Write one archive per language, named like lang_files_DD_MM_tr.zip, "
+            "each with its own counter and conflict handling"
+        ),
+    )
+
+    parser.add_argument(
+        "--shared-archive",
+        action="store_true",
+        help=(
+            "With --shard-by-language, put files that are not language files in "
+            "one ..._shared archive instead of in every language's archive"
+        ),
+    )
+
+    parser.add_argument(
+        "--catalog",
+        metavar="FILE",
+        help="Record every successful job in the SQLite catalog FILE",
+    )
+
+    parser.add_argument(
+        "--upload",
+        metavar="DEST",
+        help=(
+            "Also deliver every output archive, while it is written, to an "
+            "s3://BUCKET/PREFIX URL or a directory"
+        ),
+    )
+
+    parser.add_argument(
+        "--upload-endpoint",
+        metavar="URL",
+        help="S3-compatible endpoint to upload to (default: AWS_ENDPOINT_URL or AWS)",
+    )
+
+    parser.add_argument(
+        "--upload-part-size",
+        type=float,
+        default=DEFAULT_PART_SIZE / 1024 / 1024,
+        metavar="MB",
+        help="Size of each part of a multipart upload (default: %(default)g)",
+    )
+
+    parser.add_argument(
+        "--upload-concurrency",
+        type=int,
+        default=DEFAULT_UPLOAD_CONCURRENCY,
+        metavar="N",
+        help="Parts uploaded at once (default: %(default)s)",
+    )
+
+    parser.add_argument(
+        "--upload-memory",
+        type=float,
+        default=DEFAULT_UPLOAD_MEMORY / 1024 / 1024,
+        metavar="MB",
+        help="Most part data buffered for uploads (default: %(default)g)",
+    )
+
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help=(
+            "Profile the run with cProfile, writing pstats to FILE and "
+            "collapsed stacks for flame graphs to FILE.collapsed"
+        ),
+    )
+
+    parser.add_argument(
+        "--events",
+        metavar="FILE",
+        help="Stream NDJSON processing events to FILE, or to stdout with '-'",
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        help="Write Prometheus metrics to FILE for a textfile collector",
+    )
+
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while running",
+    )
+
+
+def open_event_sink(target: Optional[str]) -> EventSink:
+    """Open the event sink requested on the command line."""
+    if target is None:
+        return EventSink()
+    return NdjsonEventSink.open(target)
+
+
+def open_metrics(args: argparse.Namespace) -> MetricsRegistry:
+    """Create the metrics registry and start the exporters requested."""
+    metrics = MetricsRegistry(textfile=args.metrics_file)
+    if args.metrics_port is not None:
+        metrics.serve(args.metrics_port)
+    return metrics
+
+
+def open_profiler(path: Optional[str]) -> ContextManager:
+    """Get the CPU profiler requested on the command line, or a no-op."""
+    if path is None:
+        return contextlib.nullcontext()
+    return CpuProfiler(Path(path))
+
+
+def install_dump_handler(args: argparse.Namespace):
+    """Dump stacks and a sampled profile on SIGUSR1, where supported."""
+
+    def announce(paths: List[Path]):
+        ConsoleOutput.print_notice(
+            "Profile written: " + ", ".join(str(path) for path in paths)
+        )
+        ConsoleOutput.flush()
+
+    SignalDumper(Path(args.dump_dir), args.dump_seconds, on_dump=announce).install()
+
+
+def open_upload_sink(args: argparse.Namespace) -> Optional[OutputSink]:
+    """Open the sink that outputs are uploaded to, if one was requested."""
+    if args.upload is None:
+        return None
+    return open_output_sink(
+        args.upload,
+        endpoint=args.upload_endpoint,
+        part_size=int(args.upload_part_size * 1024 * 1024),
+        concurrency=args.upload_concurrency,
+        max_memory=int(args.upload_memory * 1024 * 1024),
+    )
+
+
+def open_catalog(path: Optional[str]) -> Optional[CatalogService]:
+    """Open the catalog requested on the command line, if any."""
+    if path is None:
+        return None
+    return CatalogService(Path(path))
+
+
+def run_inspect(argv: List[str]):
+    """Run the inspect command."""
+    args = create_inspect_parser().parse_args(argv)
+    configure_console(args)
+
+    controller = ProcessorController(args.zip_file, args.config)
+    report = controller.inspect()
+
+    if args.json:
+        ConsoleOutput.print_json(report.to_dict())
+    else:
+        ConsoleOutput.print_inspection(report)
+
+    if not report.archive.is_valid:
+        sys.exit(1)
+
+
+def run_batch(argv: List[str]):
+    """Run the batch command."""
+    args = create_batch_parser().parse_args(argv)
+    configure_console(args)
+    events = open_event_sink(args.events)
+    metrics = open_metrics(args)
+    catalog = open_catalog(args.catalog)
+    upload_sink = open_upload_sink(args)
+    journal = BatchJournal(Path(args.journal)) if args.journal else None
+    install_dump_handler(args)
+
+    try:
+        controller = BatchController(
+            args.zip_files,
+            args.config,
+            event_sink=events,
+            conflict_resolution=CONFLICT_POLICIES[args.on_conflict],
+            metrics=metrics,
+            output_mode=args.output_mode,
+            deterministic=args.deterministic or None,
+            manifest=args.manifest,
+            shard_by_language=args.shard_by_language or None,
+            shared_archive=args.shared_archive or None,
+            output_sink=upload_sink,
+            catalog=catalog,
+            journal=journal,
+            jobs=args.jobs,
+        )
+        with open_profiler(args.profile):
+            batch = controller.run()
+        ConsoleOutput.print_batch_summary(batch)
+    finally:
+        events.close()
+        if catalog is not None:
+            catalog.close()
+        if upload_sink is not None:
+            upload_sink.close()
+        if journal is not None:
+            journal.close()
+
+    if args.json:
+        ConsoleOutput.print_json(batch.to_dict())
+
+    if not batch.success:
+        sys.exit(1)
+
+
+def parse_merge_inputs(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> List[MergeInput]:
+    """Build the merge inputs, attaching the per-namespace configs."""
+    inputs = [MergeInput.parse(spec) for spec in args.inputs]
+    by_namespace = {
+        merge_input.namespace: merge_input
+        for merge_input in inputs
+        if merge_input.namespace
+    }
+    for spec in args.input_config:
+        namespace, separator, config_path = spec.partition("=")
+        merge_input = by_namespace.get(namespace.strip("/"))
+        if not separator or merge_input is None:
+            parser.error(f"--input-config {spec} does not name an input namespace")
+        merge_input.config_path = config_path
+    return inputs
+
+
+def run_merge(argv: List[str]):
+    """Run the merge command."""
+    parser = create_merge_parser()
+    args = parser.parse_args(argv)
+    if args.output == "-" and (args.json or args.events == "-"):
+        parser.error("--output - cannot share stdout with --json or --events -")
+    if args.catalog:
+        parser.error("--catalog records single exports and cannot be used here")
+    if args.shard_by_language:
+        parser.error("--shard-by-language cannot be used with merge")
+    inputs = parse_merge_inputs(parser, args)
+    configure_console(args)
+    events = open_event_sink(args.events)
+    metrics = open_metrics(args)
+    upload_sink = open_upload_sink(args)
+
+    try:
+        controller = ProcessorController(
+            str(inputs[0].path),
+            args.config,
+            event_sink=events,
+            conflict_resolution=CONFLICT_POLICIES[args.on_conflict],
+            output_mode=args.output_mode,
+            output=args.output,
+            deterministic=args.deterministic or None,
+            manifest=args.manifest,
+            merge_inputs=inputs,
+            merge_conflicts=args.on_duplicate,
+            output_sink=upload_sink,
+        )
+        with open_profiler(args.profile):
+            result = controller.process()
+        metrics.record_result(result)
+        metrics.export(force=True)
+    finally:
+        events.close()
+        if upload_sink is not None:
+            upload_sink.close()
+
+    if args.json:
+        ConsoleOutput.print_json(result.to_dict())
+    else:
+        ConsoleOutput.print_result(result)
+        ConsoleOutput.print_completion_message(result.success)
+
+    if not result.success:
+        sys.exit(1)
+
+
+def run_catalog(argv: List[str]):
+    """Run the catalog command."""
+    args = create_catalog_parser().parse_args(argv)
+    configure_console(args)
+    if not Path(args.catalog).is_file():
+        ConsoleOutput.print_error(f"Catalog not found: {args.catalog}")
+        sys.exit(1)
+
+    catalog = CatalogService(Path(args.catalog))
+    try:
+        if args.query == "key":
+            matches = catalog.find_key(args.key, args.language, args.first)
+            if not args.json:
+                ConsoleOutput.print_key_occurrences(matches)
+        else:
+            export = Path(args.export)
+            fingerprint = None
+            if export.is_file():
+                fingerprint = ArchiveService.fingerprint(export)
+            matches = catalog.find_jobs(str(export.resolve()), fingerprint)
+            if not args.json:
+                ConsoleOutput.print_catalog_jobs(matches)
+    finally:
+        catalog.close()
+
+    if args.json:
+        ConsoleOutput.print_json([match.to_dict() for match in matches])
+
+
+def run_bench_memory(argv: List[str]):
+    """Run the bench-memory command."""
+    args = create_bench_memory_parser().parse_args(argv)
+    configure_console(args)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        zip_file = args.zip_file
+        if zip_file is None:
+            export = SyntheticExport(
+                languages=tuple(args.languages.split(",")),
+                keys_per_language=args.keys,
+                asset_count=args.assets,
+                asset_size=args.asset_size,
+            )
+            zip_file = str(export.write(temp_path / "synthetic_export.zip"))
+
+        profiler = MemoryProfiler(top_sites=args.top)
+        controller = ProcessorController(
+            zip_file,
+            args.config,
+            conflict_resolution=ConflictResolution.OVERWRITE,
+            output_mode=args.output_mode,
+            output=str(temp_path / "output"),
+            memory_profiler=profiler,
+        )
+        with profiler:
+            result = controller.process()
+
+    report = profiler.report
+    violations = report.check_budgets(dict(args.budget))
+    if args.report:
+        Path(args.report).write_text(
+            json.dumps(report.to_dict(), indent=2) + "\n", encoding="utf-8"
+        )
+
+    if args.json:
+        ConsoleOutput.print_json(
+            {
+                "success": result.success,
+                "error": result.error_message,
+                "memory": report.to_dict(),
+                "budget_violations": violations,
+            }
+        )
+    else:
+        if not result.success:
+            ConsoleOutput.print_result(result)
+        ConsoleOutput.print_memory_report(report)
+        for violation in violations:
+            ConsoleOutput.print_error(f"Memory budget exceeded: {violation}")
+
+    if not result.success or violations:
+        sys.exit(1)
+
+
+COMMANDS = {
+    "inspect": run_inspect,
+    "batch": run_batch,
+    "catalog": run_catalog,
+    "merge": run_merge,
+    "bench-memory": run_bench_memory,
+}
+
+
 def main():
     """Main entry point for the CLI application."""
     parser = create_argument_parser()
@@ -82,15 +875,56 @@ def main():
         return
 
     try:
+        command = COMMANDS.get(sys.argv[1])
+        if command is not None:
+            command(sys.argv[2:])
+            return
+
         args = parser.parse_args()
+        if args.output == "-" and (args.json or args.events == "-"):
+            parser.error("--output - cannot share stdout with --json or --events -")
+        if args.zip_file == "-" and args.on_conflict == "ask":
+            # stdin carries the archive, so there is nobody to prompt
+            args.on_conflict = "counter"
+        configure_console(args)
+        events = open_event_sink(args.events)
+        metrics = open_metrics(args)
+        catalog = open_catalog(args.catalog)
+        upload_sink = open_upload_sink(args)
 
         # Create and run the processor
-        controller = legacy_processor.TexterifyProcessor(args.zip_file, args.config)
-        result = controller.process()
+        try:
+            controller = ProcessorController(
+                args.zip_file,
+                args.config,
+                event_sink=events,
+                conflict_resolution=CONFLICT_POLICIES[args.on_conflict],
+                output_mode=args.output_mode,
+                output=args.output,
+                deterministic=args.deterministic or None,
+                manifest=args.manifest,
+                shard_by_language=args.shard_by_language or None,
+                shared_archive=args.shared_archive or None,
+                output_sink=upload_sink,
+                catalog=catalog,
+            )
+            with open_profiler(args.profile):
+                result = controller.plan() if args.dry_run else controller.process()
+            metrics.record_result(result)
+            metrics.export(force=True)
+        finally:
+            events.close()
+            if catalog is not None:
+                catalog.close()
+            if upload_sink is not None:
+                upload_sink.close()
 
         # Display results
-        ConsoleOutput.print_result(result)
-        ConsoleOutput.print_completion_message(result.success)
+        if args.json:
+            ConsoleOutput.print_json(result.to_dict())
+        else:
+            ConsoleOutput.print_result(result)
+            ConsoleOutput.print_completion_message(result.success)
 
         if not result.success:
             sys.exit(1)
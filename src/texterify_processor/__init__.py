@@ -16,6 +16,8 @@ import importlib.util
 import sys
 from pathlib import Path
 
+from .controllers.async_controller import AsyncProcessorController
+from .controllers.batch_controller import BatchController
 from .controllers.processor_controller import ProcessorController
 from .models.config import ProcessingConfig
 from .models.result import ProcessingResult
@@ -31,4 +33,11 @@ legacy_module = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(legacy_module)
 main = legacy_module.main
 
-__all__ = ["ProcessorController", "ProcessingConfig", "ProcessingResult", "main"]
+__all__ = [
+    "ProcessorController",
+    "BatchController",
+    "AsyncProcessorController",
+    "ProcessingConfig",
+    "ProcessingResult",
+    "main",
+]
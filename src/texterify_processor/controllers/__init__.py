@@ -1,5 +1,12 @@
 """Controller layer for handling application flow."""
 
+from .async_controller import AsyncJob, AsyncProcessorController
+from .batch_controller import BatchController
 from .processor_controller import ProcessorController
 
-__all__ = ["ProcessorController"]
+__all__ = [
+    "ProcessorController",
+    "BatchController",
+    "AsyncProcessorController",
+    "AsyncJob",
+]
@@ -0,0 +1,213 @@
+"""Controller for processing exports from an asyncio event loop."""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set, Union
+
+from ..models.result import ProcessingResult
+from ..services.event_service import EventSink
+from ..utils.user_interaction import ConflictResolution
+from .processor_controller import ProcessorController
+
+# Jobs one AsyncProcessorController runs at the same time
+DEFAULT_ASYNC_CONCURRENCY = 4
+
+# Marks the end of a job's event queue
+_END_OF_EVENTS = object()
+
+
+class LoopEventSink(EventSink):
+    """Hand events emitted on a worker thread to a queue on an event loop.
+
+    Events are records shaped like the NDJSON event stream and are also
+    passed on to forward, if given. Events emitted after the loop has
+    closed are dropped.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue,
+        forward: Optional[EventSink] = None,
+    ):
+        self.loop = loop
+        self.queue = queue
+        self.forward = forward
+
+    def emit(self, event: str, **fields):
+        """Queue an event on the loop."""
+        if self.forward is not None:
+            self.forward.emit(event, **fields)
+        record = {"event": event, "ts": round(time.time(), 6)}
+        record.update(fields)
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, record)
+        except RuntimeError:
+            pass
+
+    def flush(self):
+        """Flush the forwarded sink."""
+        if self.forward is not None:
+            self.forward.flush()
+
+
+class AsyncJob:
+    """One export being processed: await it for the result, iterate its events.
+
+    Cancelling the job, or the task awaiting it, stops the worker at the
+    next member it reads or writes; the job finishes cancelled once the
+    worker has removed its partial outputs.
+    """
+
+    def __init__(self, zip_path: Union[str, Path]):
+        self.zip_path = zip_path
+        self.cancel_event = threading.Event()
+        self.task: Optional["asyncio.Task[ProcessingResult]"] = None
+        self._events: asyncio.Queue = asyncio.Queue()
+
+    def __await__(self):
+        return self.task.__await__()
+
+    def cancel(self) -> bool:
+        """Request cancellation; False if the job has already finished."""
+        return self.task.cancel()
+
+    def done(self) -> bool:
+        """Check if the job has finished, failed or been cancelled."""
+        return self.task.done()
+
+    async def events(self) -> AsyncIterator[Dict]:
+        """Yield the job's events, such as progress, until it finishes."""
+        while True:
+            event = await self._events.get()
+            if event is _END_OF_EVENTS:
+                return
+            yield event
+
+    def _finish(self):
+        self._events.put_nowait(_END_OF_EVENTS)
+
+
+class AsyncProcessorController:
+    """Process exports from asyncio without blocking the event loop.
+
+    Each job runs a ProcessorController on a worker thread, so reading,
+    compression and writing all happen off the loop. At most
+    max_concurrency jobs started from one controller run at a time; give
+    each call site its own controller to limit it separately. Without an
+    executor the controller owns a thread pool sized to max_concurrency,
+    shut down by aclose() or on leaving an async with block.
+    """
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        max_concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+        executor: Optional[Executor] = None,
+        conflict_resolution: ConflictResolution = ConflictResolution.ADD_COUNTER,
+        **controller_options,
+    ):
+        """Initialize the async controller.
+
+        controller_options, such as output_mode, are passed on to every
+        ProcessorController and can be overridden per job. Existing outputs
+        are resolved with conflict_resolution, never by prompting.
+        """
+        self.config_path = config_path
+        self.max_concurrency = max(1, max_concurrency)
+        self.owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="texterify-async"
+        )
+        self.conflict_resolution = conflict_resolution
+        self.controller_options = controller_options
+        self.jobs: Set[AsyncJob] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> "AsyncProcessorController":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def start(self, zip_path: Union[str, Path], **options) -> AsyncJob:
+        """Start processing an export; must be called on the running loop.
+
+        The job waits for a free slot before its worker starts.
+        """
+        loop = asyncio.get_running_loop()
+        job = AsyncJob(zip_path)
+        job.task = loop.create_task(self._run(job, options))
+        self.jobs.add(job)
+        job.task.add_done_callback(lambda _: self.jobs.discard(job))
+        return job
+
+    async def process(self, zip_path: Union[str, Path], **options) -> ProcessingResult:
+        """Process an export and return its result."""
+        return await self.start(zip_path, **options)
+
+    async def process_many(
+        self, zip_paths: List[Union[str, Path]], **options
+    ) -> List[ProcessingResult]:
+        """Process several exports concurrently, results in the order given."""
+        jobs = [self.start(zip_path, **options) for zip_path in zip_paths]
+        return list(await asyncio.gather(*(job.task for job in jobs)))
+
+    async def aclose(self):
+        """Wait for running jobs, then shut down an executor this controller owns."""
+        if self.jobs:
+            await asyncio.wait([job.task for job in self.jobs])
+        if self.owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def _run(self, job: AsyncJob, options: Dict) -> ProcessingResult:
+        """Run a job on the executor once a slot is free."""
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._get_semaphore(loop):
+                future = loop.run_in_executor(
+                    self.executor,
+                    functools.partial(self._process_blocking, job, loop, options),
+                )
+                try:
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    job.cancel_event.set()
+                    # Hold the slot until the worker has cleaned up
+                    while not future.done():
+                        try:
+                            await asyncio.wait([future])
+                        except asyncio.CancelledError:
+                            pass
+                    raise
+        finally:
+            job._finish()
+
+    def _process_blocking(
+        self, job: AsyncJob, loop: asyncio.AbstractEventLoop, options: Dict
+    ) -> ProcessingResult:
+        """Process a job on a worker thread."""
+        controller_options = dict(self.controller_options)
+        controller_options.update(options)
+        controller_options.setdefault("config_path", self.config_path)
+        controller_options.setdefault("conflict_resolution", self.conflict_resolution)
+        controller_options["event_sink"] = LoopEventSink(
+            loop, job._events, controller_options.get("event_sink")
+        )
+        controller = ProcessorController(
+            str(job.zip_path), cancel_event=job.cancel_event, **controller_options
+        )
+        return controller.process()
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        """Get the concurrency limit, created on the loop that first needs it."""
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
@@ -0,0 +1,249 @@
+"""Controller for processing many exports in one run."""
+
+import threading
+import time
+from collections import deque
+
+from pathlib import Path
+from typing import Deque, List, Optional
+
+from console_output import ConsoleOutput
+
+from ..models.journal import JOB_COMPLETED, JOB_FAILED, JOB_STARTED, JOB_WRITING
+from ..models.result import BatchResult, ProcessingResult, WorkerStats
+from ..services.event_service import EventSink
+from ..services.journal_service import BatchJournal
+from ..services.metrics_service import MetricsRegistry
+from ..utils.batch_scheduling import (
+    DEFAULT_PACK_BYTES,
+    DEFAULT_PREFETCH,
+    DEFAULT_SMALL_JOB_BYTES,
+    SizedJob,
+    advise_willneed,
+    job_size,
+    schedule_jobs,
+)
+from ..utils.user_interaction import ConflictResolution
+from .processor_controller import ProcessorController
+
+
+class BatchController:
+    """Process a list of exports on one or more workers without user interaction."""
+
+    def __init__(
+        self,
+        zip_paths: List[str],
+        config_path: Optional[str] = None,
+        event_sink: Optional[EventSink] = None,
+        conflict_resolution: ConflictResolution = ConflictResolution.ADD_COUNTER,
+        metrics: Optional[MetricsRegistry] = None,
+        journal: Optional[BatchJournal] = None,
+        jobs: int = 1,
+        prefetch: int = DEFAULT_PREFETCH,
+        small_job_bytes: int = DEFAULT_SMALL_JOB_BYTES,
+        pack_bytes: int = DEFAULT_PACK_BYTES,
+        **controller_options,
+    ):
+        """Initialize the batch controller.
+
+        controller_options, such as output_mode, are passed on to every
+        ProcessorController. With a journal, jobs a previous run completed
+        are skipped and the files of interrupted jobs are removed first.
+        jobs is the number of workers; the next prefetch inputs in the
+        queue are read ahead while workers are busy. small_job_bytes and
+        pack_bytes control how small exports are packed, see schedule_jobs.
+        """
+        self.zip_paths = list(zip_paths)
+        self.config_path = config_path
+        self.events = event_sink or EventSink()
+        self.conflict_resolution = conflict_resolution
+        self.metrics = metrics or MetricsRegistry()
+        self.journal = journal
+        self.jobs = max(1, jobs)
+        self.prefetch = prefetch
+        self.small_job_bytes = small_job_bytes
+        self.pack_bytes = pack_bytes
+        self.controller_options = controller_options
+        self._queue: Deque[List[SizedJob]] = deque()
+        self._waiting = 0
+        self._advised = set()
+        self._lock = threading.Lock()
+        self._memory_warning_due = self.jobs > 1
+
+    def run(self) -> BatchResult:
+        """Process every export and return the batch summary.
+
+        One worker takes the exports in the order given. Several workers
+        take the largest first, with small exports in packs, so that no big
+        export starts last and keeps the batch running on its own.
+        """
+        batch = BatchResult()
+        self.events.emit("batch_started", jobs=len(self.zip_paths))
+        if self.journal is not None:
+            for path in self.journal.recover():
+                ConsoleOutput.print_notice(f"Removed partial output: {path}")
+
+        if self.jobs > 1:
+            units = schedule_jobs(
+                [(zip_path, job_size(zip_path)) for zip_path in self.zip_paths],
+                self.jobs,
+                self.small_job_bytes,
+                self.pack_bytes,
+            )
+        else:
+            units = [[(zip_path, 0)] for zip_path in self.zip_paths]
+        self._queue = deque(units)
+        self._waiting = len(self.zip_paths)
+        workers = [
+            WorkerStats(name=f"worker-{index}")
+            for index in range(1, min(self.jobs, max(1, len(units))) + 1)
+        ]
+
+        started = time.monotonic()
+        if len(workers) == 1:
+            self._work(batch, workers[0])
+        else:
+            threads = [
+                threading.Thread(
+                    target=self._work,
+                    args=(batch, worker),
+                    name=f"texterify-{worker.name}",
+                )
+                for worker in workers
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        duration = time.monotonic() - started
+        for worker in workers:
+            worker.wall_seconds = duration
+            self.metrics.set_gauge(
+                "texterify_worker_utilization", worker.utilization, worker=worker.name
+            )
+        batch.workers = workers
+
+        self.events.emit(
+            "batch_finished",
+            total=batch.total,
+            succeeded=batch.succeeded,
+            failed=batch.failed,
+        )
+        self.events.flush()
+        if self.journal is not None:
+            self.journal.flush()
+        self.metrics.export(force=True)
+        return batch
+
+    def _work(self, batch: BatchResult, worker: WorkerStats):
+        """Take work units off the queue and process them until it is empty."""
+        while True:
+            with self._lock:
+                if not self._queue:
+                    return
+                unit = self._queue.popleft()
+                self._waiting -= len(unit)
+                self.metrics.set_gauge("texterify_queue_depth", self._waiting)
+                upcoming = self._take_upcoming()
+            for zip_path in upcoming:
+                advise_willneed(zip_path)
+
+            started = time.monotonic()
+            for zip_path, _ in unit:
+                result = self._process_one(zip_path)
+                with self._lock:
+                    worker.jobs += 1
+                    if result is None:
+                        batch.record_skipped()
+                        continue
+                    batch.record(result)
+                    self.metrics.record_result(result)
+                    self.metrics.export()
+                    ConsoleOutput.print_result(result)
+            worker.busy_seconds += time.monotonic() - started
+
+    def _take_upcoming(self) -> List[str]:
+        """Get the next queued inputs not yet read ahead; caller holds the lock."""
+        upcoming = []
+        looked_at = 0
+        for unit in self._queue:
+            for zip_path, _ in unit:
+                if looked_at >= self.prefetch:
+                    return upcoming
+                looked_at += 1
+                if zip_path not in self._advised:
+                    self._advised.add(zip_path)
+                    upcoming.append(zip_path)
+        return upcoming
+
+    def _process_one(self, zip_path: str) -> Optional[ProcessingResult]:
+        """Process a single export; results only keep operation counts.
+
+        Returns None for a job the journal records as completed.
+        """
+        try:
+            controller = ProcessorController(
+                zip_path,
+                self.config_path,
+                event_sink=self.events,
+                conflict_resolution=self.conflict_resolution,
+                **self.controller_options,
+            )
+        except ValueError as e:
+            result = ProcessingResult(
+                success=False,
+                input_file=Path(zip_path).resolve(),
+                error_message=str(e),
+            )
+            self.events.emit(
+                "job_finished",
+                input=str(result.input_file),
+                success=False,
+                error=result.error_message,
+            )
+            return result
+
+        controller.keep_operations = False
+        self._warn_shared_memory_budget(controller.config.limits.max_memory_bytes)
+        if self.journal is None:
+            return controller.process()
+
+        key = self._journal_key(controller)
+        if key is None:
+            return controller.process()
+        if self.journal.is_completed(key):
+            self.events.emit("job_skipped", input=str(controller.zip_path))
+            return None
+
+        journal = self.journal
+        journal.record(key, JOB_STARTED, input=str(controller.zip_path))
+        controller.add_output_hook(
+            lambda path: journal.record(key, JOB_WRITING, path=str(path))
+        )
+        result = controller.process()
+        journal.record(
+            key,
+            JOB_COMPLETED if result.success else JOB_FAILED,
+            output=str(result.output_file) if result.output_file else None,
+        )
+        return result
+
+    def _warn_shared_memory_budget(self, max_memory: Optional[int]):
+        """Warn once that several workers share one process memory budget."""
+        with self._lock:
+            if not self._memory_warning_due or max_memory is None:
+                return
+            self._memory_warning_due = False
+        ConsoleOutput.print_warning(
+            f"max_memory_bytes covers all {self.jobs} jobs together; "
+            "the job that finds the process over it fails"
+        )
+
+    @staticmethod
+    def _journal_key(controller: ProcessorController) -> Optional[str]:
+        """Get a job's journal key; None if its input cannot be read."""
+        try:
+            input_sha256 = controller.input_fingerprint()
+        except OSError:
+            return None
+        return BatchJournal.job_key(input_sha256, controller.config)
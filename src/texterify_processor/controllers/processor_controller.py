@@ -1,38 +1,229 @@
 """Main controller for processing Texterify exports."""
 
+import contextlib
+import functools
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import os
+import sys
 import tempfile
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from console_output import ConsoleOutput
 
-from ..models.archive import ArchiveInfo
-from ..models.result import ProcessingResult
-from ..services.archive_service import ArchiveService
+from ..models.archive import (
+    MANIFEST_SIDECAR_SUFFIX,
+    ArchiveInfo,
+    ArchiveManifest,
+    InspectionReport,
+)
+from ..models.catalog import CatalogJob
+from ..models.config import SHARED_SHARD, ProcessingConfig
+from ..models.merge import MergeInput, MergePlan
+from ..models.result import FileOperation, ProcessingResult, ShardOutput
+from ..services.archive_service import STREAM_NAME, ArchiveService, ArchiveSource
+from ..services.catalog_service import CatalogService, KeyHash
 from ..services.config_service import ConfigService
+from ..services.directory_output_service import DirectoryOutputService
+from ..services.event_service import EventSink
 from ..services.file_service import FileService
 from ..services.output_service import OutputService
+from ..services.output_sinks import OutputSink, TeeStream
+from ..utils.memory_profiler import MemoryProfiler
+from ..utils.progress import ProgressHook, ProgressSnapshot, ProgressTracker
+from ..utils.resource_guard import JobCancelled, ResourceGuard, ResourceLimitExceeded
 from ..utils.user_interaction import ConflictResolution, UserInteraction
 
 
 class ProcessorController:
     """Main controller for orchestrating the processing workflow."""
 
-    def __init__(self, zip_path: str, config_path: Optional[str] = None):
-        """Initialize the processor controller."""
-        self.zip_path = Path(zip_path).resolve()
+    def __init__(
+        self,
+        zip_path: str,
+        config_path: Optional[str] = None,
+        event_sink: Optional[EventSink] = None,
+        conflict_resolution: Optional[ConflictResolution] = None,
+        output_mode: Optional[str] = None,
+        output: Union[str, BinaryIO, None] = None,
+        deterministic: Optional[bool] = None,
+        manifest: Optional[str] = None,
+        catalog: Optional[CatalogService] = None,
+        memory_profiler: Optional[MemoryProfiler] = None,
+        merge_inputs: Optional[List[MergeInput]] = None,
+        merge_conflicts: str = "error",
+        shard_by_language: Optional[bool] = None,
+        shared_archive: Optional[bool] = None,
+        output_sink: Optional[OutputSink] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ):
+        """Initialize the processor controller.
+
+        When conflict_resolution is given it is applied to existing output
+        files instead of prompting the user. output_mode overrides the
+        configured output_format mode. output replaces the generated output
+        name with an explicit path, "-" for stdout, or a binary stream. A
+        zip_path of "-" reads the archive from stdin. deterministic and
+        manifest override the matching output_format settings. Successful
+        jobs are recorded in catalog when one is given. A started
+        memory_profiler records the memory used by every phase.
+
+        With merge_inputs, process() streams the members of all of them into
+        one output instead of processing zip_path, which then only decides
+        where the generated output name is placed. merge_conflicts is one of
+        MERGE_CONFLICT_POLICIES. shard_by_language and shared_archive
+        override the matching output_format settings. Archives written to
+        disk are also delivered to output_sink, such as an object store, as
+        they are produced. Setting cancel_event from another thread stops the
+        job at the next member it reads or writes.
+        """
+        if zip_path == "-":
+            # Outputs of piped input land in the working directory
+            self.zip_path = Path.cwd() / STREAM_NAME
+        else:
+            self.zip_path = Path(zip_path).resolve()
         self.config = ConfigService.load_config(config_path)
-        self.output_service = OutputService(self.config, self.zip_path.parent)
+        if output_mode is not None:
+            self.config.output_format.use_mode(output_mode)
+        if deterministic is not None:
+            self.config.output_format.deterministic = deterministic
+        if manifest is not None:
+            self.config.output_format.manifest = manifest
+        if shard_by_language is not None:
+            self.config.output_format.shard_by_language = shard_by_language
+        if shared_archive is not None:
+            self.config.output_format.shared_archive = shared_archive
+
+        self.output_path: Optional[Path] = None
+        self.output_stream: Optional[BinaryIO] = None
+        if output == "-":
+            self.output_stream = sys.stdout.buffer
+        elif isinstance(output, (str, Path)):
+            self.output_path = Path(output).resolve()
+        elif output is not None:
+            self.output_stream = output
+        if output is not None and self.config.output_format.is_directory:
+            raise ValueError("--output cannot be used with directory output")
+        if self.config.output_format.shard_by_language and (
+            output is not None or self.config.output_format.is_directory
+        ):
+            raise ValueError("Sharded output is only written as generated archives")
+        if output_sink is not None and (
+            self.output_stream is not None or self.config.output_format.is_directory
+        ):
+            raise ValueError("Uploads need archive output written to disk")
+
+        self.merge_inputs = list(merge_inputs or [])
+        self.merge_conflicts = merge_conflicts
+        self.merge_configs: List[ProcessingConfig] = []
+        if self.merge_inputs:
+            if zip_path == "-" or self.config.output_format.is_directory:
+                raise ValueError("Merges need zip inputs on disk and archive output")
+            if self.config.output_format.shard_by_language:
+                raise ValueError("Merges cannot be sharded by language")
+            self.merge_configs = [
+                (
+                    ConfigService.load_config(merge_input.config_path)
+                    if merge_input.config_path
+                    else self.config
+                )
+                for merge_input in self.merge_inputs
+            ]
+
+        self.input_stream: Optional[BinaryIO] = None
+        if zip_path == "-":
+            self.input_stream = self._spool_stdin()
+        self.output_service = OutputService(
+            self.config, self.zip_path.parent, output_sink
+        )
         self.file_service = FileService(self.config)
+        self.events = event_sink or EventSink()
+        self.conflict_resolution = conflict_resolution
+        self.catalog = catalog
+        self.memory_profiler = memory_profiler
+        self.cancel_event = cancel_event
+        self.keep_operations = True
+        self.progress_hooks: List[ProgressHook] = []
+        self.output_hooks: List[Callable[[Path], None]] = []
+        self._claimed_outputs: List[Path] = []
+        self._input_sha256: Optional[str] = None
 
         # Validate configuration
-        if not ConfigService.validate_config(self.config):
-            raise ValueError("Invalid configuration")
+        for config in [self.config, *self.merge_configs]:
+            if not ConfigService.validate_config(config):
+                raise ValueError("Invalid configuration")
+
+    @property
+    def archive_source(self) -> ArchiveSource:
+        """Get the archive to read: the spooled stdin data or the input path."""
+        if self.input_stream is not None:
+            return self.input_stream
+        return self.zip_path
+
+    def input_fingerprint(self) -> str:
+        """Get the SHA-256 of the input archive, hashing it only once."""
+        if self._input_sha256 is None:
+            self._input_sha256 = ArchiveService.fingerprint(self.archive_source)
+        return self._input_sha256
+
+    def _spool_stdin(self) -> BinaryIO:
+        """Read the archive piped to stdin into a seekable spool."""
+        try:
+            return ArchiveService.spool_stream(
+                sys.stdin.buffer, max_bytes=self.config.limits.max_total_bytes
+            )
+        except ResourceLimitExceeded as e:
+            raise ValueError(f"Resource limit exceeded: {str(e)}")
+
+    def add_progress_hook(self, hook: ProgressHook):
+        """Register a callable that receives throttled ProgressSnapshots."""
+        self.progress_hooks.append(hook)
+
+    def add_output_hook(self, hook: Callable[[Path], None]):
+        """Register a callable told of every output file about to be created."""
+        self.output_hooks.append(hook)
 
     def process(self) -> ProcessingResult:
         """Main processing method."""
-        result = ProcessingResult(success=False, input_file=self.zip_path)
+        result = ProcessingResult(
+            success=False,
+            input_file=self.zip_path,
+            keep_operations=self.keep_operations,
+        )
+        guard = ResourceGuard(self.config.limits, self.cancel_event)
+        progress = ProgressTracker(
+            [ConsoleOutput.print_progress, self._emit_progress, *self.progress_hooks]
+        )
 
+        self.events.emit("job_started", input=str(self.zip_path))
+        started = time.perf_counter()
+        try:
+            return self._run(result, guard, progress)
+        finally:
+            for path in self._claimed_outputs:
+                OutputService.release(path)
+            self._claimed_outputs = []
+            self.events.emit(
+                "job_finished",
+                input=str(self.zip_path),
+                success=result.success,
+                output=str(result.output_file) if result.output_file else None,
+                processed_files=result.processed_files_count,
+                unchanged=result.unchanged,
+                error=result.error_message,
+                duration=round(time.perf_counter() - started, 6),
+            )
+
+    def _run(
+        self, result: ProcessingResult, guard: ResourceGuard, progress: ProgressTracker
+    ) -> ProcessingResult:
+        """Run the processing workflow, filling in result."""
         try:
             # Display header and input info
             import sys
@@ -42,30 +233,75 @@ class ProcessorController:
             from version import get_version_string
 
             ConsoleOutput.print_header(get_version_string())
-            ConsoleOutput.print_input_info(
-                self.zip_path, list(self.config.language_mappings.keys())
-            )
+            if self.merge_inputs:
+                for merge_input, config in zip(self.merge_inputs, self.merge_configs):
+                    ConsoleOutput.print_input_info(
+                        merge_input.path, config.configured_languages
+                    )
 
-            # Validate archive
-            archive_info = self._validate_archive()
-            if not archive_info.is_valid:
-                result.error_message = archive_info.error_message
-                return result
+                # Merges are planned from the central directories alone
+                with self._phase(result, "validate", progress):
+                    merge_plan = self._plan_merge(result, guard)
+                if merge_plan is None:
+                    return result
+                result.bytes_in = sum(
+                    merge_input.path.stat().st_size for merge_input in self.merge_inputs
+                )
+            else:
+                ConsoleOutput.print_input_info(
+                    self.zip_path, self.config.configured_languages
+                )
+
+                # Progress totals come from the central directory
+                listing = ArchiveService.inspect_archive(
+                    self.archive_source, self.config
+                )
+
+                # Validate archive
+                with self._phase(
+                    result, "validate", progress, listing.total_size, listing.file_count
+                ):
+                    archive_info = self._validate_archive(guard, progress)
+                if not archive_info.is_valid:
+                    result.error_message = archive_info.error_message
+                    return result
+                result.bytes_in = self._get_input_size()
 
-            # Handle output file conflicts
-            conflict_resolution = self._handle_output_conflicts()
-            if conflict_resolution is None:
-                result.error_message = "Operation cancelled by user"
+            if self.config.output_format.shard_by_language:
+                # Every shard resolves its own name and conflicts
+                result.success = self._process_archive(
+                    result, None, guard, progress, listing
+                )
                 return result
 
-            # Determine output filename
-            output_filename, use_counter = self._get_output_filename(
-                conflict_resolution
-            )
-            output_path = self.output_service.get_output_path(output_filename)
+            if self.output_path is not None or self.output_stream is not None:
+                # An explicit output target is written as given
+                output_filename, use_counter = None, False
+                output_path = self.output_path
+                if output_path is not None:
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._claim_output(output_path)
+            else:
+                # Handle output file conflicts and claim the output filename
+                claimed = self._claim_generated_output()
+                if claimed is None:
+                    if self.conflict_resolution == ConflictResolution.CANCEL:
+                        result.error_message = "Output file already exists; skipped"
+                    else:
+                        result.error_message = "Operation cancelled by user"
+                    return result
+                output_filename, use_counter = claimed
+                output_path = self.output_service.get_output_path(output_filename)
 
             # Process the archive
-            success = self._process_archive(result, output_path)
+            if self.merge_inputs:
+                success = self._merge_archives(
+                    result, merge_plan, output_path, guard, progress
+                )
+            else:
+                success = self._process_archive(
+                    result, output_path, guard, progress, listing
+                )
             if success:
                 result.success = True
                 result.output_file = output_path
@@ -81,70 +317,724 @@ class ProcessorController:
             result.error_message = str(e)
             return result
 
-    def _validate_archive(self) -> ArchiveInfo:
+    def plan(self) -> ProcessingResult:
+        """Compute the full operation plan from the archive namelist alone.
+
+        Nothing is extracted or written. When the standard output file already
+        exists the plan assumes the non-destructive counter resolution.
+        """
+        result = ProcessingResult(success=False, input_file=self.zip_path, dry_run=True)
+
+        archive_info = ArchiveService.inspect_archive(self.archive_source, self.config)
+        if not archive_info.is_valid:
+            result.error_message = archive_info.error_message
+            return result
+
+        member_names = [member.name for member in archive_info.members]
+        result.file_operations = self.file_service.plan_renames(member_names)
+        result.collisions = self.file_service.find_target_collisions(member_names)
+
+        if self.output_path is not None or self.output_stream is not None:
+            result.output_file = self.output_path
+        else:
+            has_conflict, _ = self.output_service.check_output_conflict()
+            resolution = (
+                ConflictResolution.ADD_COUNTER
+                if has_conflict
+                else ConflictResolution.OVERWRITE
+            )
+            output_filename, use_counter = self._get_output_filename(resolution)
+            result.output_file = self.output_service.get_output_path(output_filename)
+            result.used_counter = use_counter
+            if use_counter:
+                result.counter_value = self._extract_counter_from_filename(
+                    output_filename
+                )
+
+        if self.config.output_format.is_directory:
+            result.estimated_output_size = archive_info.total_size
+        else:
+            result.estimated_output_size = ArchiveService.estimate_archive_size(
+                (member.output_name, member.compress_size)
+                for member in archive_info.members
+                if not member.is_dir
+            )
+
+        if not result.file_operations:
+            result.error_message = "No language files found to process"
+        elif result.collisions:
+            result.error_message = (
+                f"{len(result.collisions)} output path(s) would be written by "
+                f"more than one member: {', '.join(result.collisions)}"
+            )
+        else:
+            result.success = True
+
+        return result
+
+    def inspect(self) -> InspectionReport:
+        """Inspect the archive's central directory without processing it."""
+        archive_info = ArchiveService.inspect_archive(self.archive_source, self.config)
+        report = InspectionReport(archive=archive_info)
+        if not archive_info.is_valid:
+            return report
+
+        has_conflict, standard_filename = self.output_service.check_output_conflict()
+        report.output_filename = standard_filename
+        report.output_exists = has_conflict
+        if has_conflict:
+            report.counter_filename = self.output_service.generate_output_filename(
+                use_counter=True
+            )
+
+        return report
+
+    def _validate_archive(
+        self,
+        guard: Optional[ResourceGuard] = None,
+        progress: Optional[ProgressTracker] = None,
+    ) -> ArchiveInfo:
         """Validate the input archive."""
-        archive_info = ArchiveService.validate_archive(self.zip_path)
+        archive_info = ArchiveService.validate_archive(
+            self.archive_source, guard, progress
+        )
         if not archive_info.is_valid:
             ConsoleOutput.print_error(archive_info.error_message)
         return archive_info
 
-    def _handle_output_conflicts(self) -> Optional[ConflictResolution]:
+    def _handle_output_conflicts(
+        self, suffix: Optional[str] = None
+    ) -> Optional[ConflictResolution]:
         """Handle conflicts with existing output files."""
-        has_conflict, existing_filename = self.output_service.check_output_conflict()
+        has_conflict, existing_filename = self.output_service.check_output_conflict(
+            suffix
+        )
 
         if not has_conflict:
             return ConflictResolution.OVERWRITE  # No conflict, proceed normally
 
+        if self.conflict_resolution is not None:
+            return self.conflict_resolution
+
         return UserInteraction.get_conflict_resolution(existing_filename)
 
-    def _get_output_filename(self, resolution: ConflictResolution) -> Tuple[str, bool]:
+    def _claim_generated_output(
+        self, suffix: Optional[str] = None
+    ) -> Optional[Tuple[str, bool]]:
+        """Resolve conflicts for a generated output name, then claim the name.
+
+        Resolving may prompt the user, so it runs without naming_lock; the
+        name is chosen and claimed under the lock, and resolved again if
+        another job took it in between. Returns the filename and whether it
+        has a counter, or None if the output is skipped.
+        """
+        while True:
+            had_conflict, _ = self.output_service.check_output_conflict(suffix)
+            resolution = self._handle_output_conflicts(suffix)
+            if resolution in (None, ConflictResolution.CANCEL):
+                return None
+            with OutputService.naming_lock:
+                has_conflict, _ = self.output_service.check_output_conflict(suffix)
+                if has_conflict and not had_conflict:
+                    continue
+                filename, use_counter = self._get_output_filename(resolution, suffix)
+                self._claim_output(self.output_service.get_output_path(filename))
+                return filename, use_counter
+
+    def _get_output_filename(
+        self, resolution: ConflictResolution, suffix: Optional[str] = None
+    ) -> Tuple[str, bool]:
         """Get output filename based on conflict resolution."""
         if resolution == ConflictResolution.ADD_COUNTER:
-            filename = self.output_service.generate_output_filename(use_counter=True)
+            filename = self.output_service.generate_output_filename(
+                use_counter=True, suffix=suffix
+            )
             return filename, True
         else:
-            filename = self.output_service.generate_output_filename(use_counter=False)
+            filename = self.output_service.generate_output_filename(
+                use_counter=False, suffix=suffix
+            )
             return filename, False
 
-    def _process_archive(self, result: ProcessingResult, output_path: Path) -> bool:
+    def _process_archive(
+        self,
+        result: ProcessingResult,
+        output_path: Optional[Path],
+        guard: Optional[ResourceGuard] = None,
+        progress: Optional[ProgressTracker] = None,
+        listing: Optional[ArchiveInfo] = None,
+    ) -> bool:
         """Process the archive and create output."""
+        if listing is None:
+            listing = ArchiveInfo(path=self.zip_path)
         try:
             with tempfile.TemporaryDirectory() as temp_dir:
                 temp_path = Path(temp_dir)
 
                 # Extract archive
                 ConsoleOutput.print_extraction_start()
-                if not ArchiveService.extract_archive(self.zip_path, temp_path):
+                with self._phase(
+                    result, "extract", progress, listing.total_size, listing.file_count
+                ):
+                    extracted = ArchiveService.extract_archive(
+                        self.archive_source, temp_path, guard, progress
+                    )
+                if not extracted:
                     result.error_message = "Failed to extract archive"
                     return False
 
-                # Find and rename language files
-                file_operations = self.file_service.find_and_rename_files(temp_path)
+                # Find and rename language files, recording each as it happens
+                shard_by_language = self.config.output_format.shard_by_language
+                language_count = len(listing.language_files)
+                renamed: List[FileOperation] = []
+                with self._phase(result, "rename", progress, 0, language_count):
+                    for operation in self.file_service.iter_rename_files(temp_path):
+                        result.record_operation(operation)
+                        if self.catalog is not None or shard_by_language:
+                            renamed.append(operation)
+                        if progress is not None:
+                            progress.advance(members_done=1)
+                        self.events.emit(
+                            "member",
+                            input=str(self.zip_path),
+                            original=operation.original_name,
+                            new=operation.new_name,
+                            operation=operation.operation_type,
+                        )
+                ConsoleOutput.print_rename_summary()
 
-                if not file_operations:
+                if not result.operation_count:
                     ConsoleOutput.print_no_language_files_warning(
-                        list(self.config.language_mappings.keys())
+                        self.config.configured_languages
                     )
                     result.error_message = "No language files found to process"
                     return False
 
-                # Add operations to result
-                result.file_operations = file_operations
+                # Key hashes are read before the tree is archived or moved away
+                key_hashes = []
+                if self.catalog is not None:
+                    key_hashes = self._hash_language_keys(temp_path, renamed)
 
-                # Create output archive
-                if not ArchiveService.create_archive(temp_path, output_path):
-                    result.error_message = "Failed to create output archive"
-                    return False
+                output_format = self.config.output_format
+                manifest = None
+                if output_format.is_directory:
+                    self._publish_directory(
+                        result, temp_path, output_path, guard, progress, listing
+                    )
+                elif shard_by_language:
+                    if not self._write_shards(
+                        result, temp_path, renamed, guard, progress, listing
+                    ):
+                        return False
+                else:
+                    if output_format.manifest or self.catalog is not None:
+                        manifest = ArchiveManifest()
+                    write = functools.partial(
+                        ArchiveService.write_archive,
+                        temp_path,
+                        archive_format=output_format.mode,
+                        compression_level=output_format.compression_level,
+                        parallel_threshold=output_format.parallel_threshold,
+                        guard=guard,
+                        progress=progress,
+                        mtime=self._get_output_mtime(listing.latest_mtime),
+                        manifest=manifest,
+                        embed_manifest=bool(output_format.manifest),
+                    )
+                    file_count = sum(
+                        1 for member in listing.members if not member.is_dir
+                    )
+                    written = self._write_output(
+                        result,
+                        write,
+                        output_path,
+                        progress,
+                        listing.total_size,
+                        file_count,
+                        manifest,
+                    )
+                    if not written:
+                        return False
 
+                if self.catalog is not None:
+                    self._record_in_catalog(result, output_path, manifest, key_hashes)
                 return True
+        except ResourceLimitExceeded as e:
+            ConsoleOutput.print_error(f"Resource limit exceeded: {str(e)}")
+            result.error_message = f"Resource limit exceeded: {str(e)}"
+            return False
         except Exception as e:
             result.error_message = f"Processing error: {str(e)}"
             return False
 
+    def _plan_merge(
+        self, result: ProcessingResult, guard: ResourceGuard
+    ) -> Optional[MergePlan]:
+        """Plan a merge and record its renames; None when it cannot proceed."""
+        for merge_input in self.merge_inputs:
+            if not merge_input.path.is_file():
+                result.error_message = f"Archive file not found: {merge_input.path}"
+                return None
+        try:
+            plan = ArchiveService.plan_merge(
+                self.merge_inputs, self.merge_configs, self.merge_conflicts, guard
+            )
+        except ResourceLimitExceeded as e:
+            result.error_message = f"Resource limit exceeded: {str(e)}"
+            return None
+        except (OSError, zipfile.BadZipFile) as e:
+            result.error_message = f"Invalid zip file: {str(e)}"
+            return None
+
+        result.collisions = plan.collisions
+        if plan.collisions and self.merge_conflicts == "error":
+            result.error_message = (
+                f"{len(plan.collisions)} path(s) are provided by more than one "
+                f"input: {', '.join(plan.collisions)}"
+            )
+            return None
+
+        for entry in plan.entries:
+            if entry.operation is not None:
+                result.record_operation(entry.operation)
+                self.events.emit(
+                    "member",
+                    input=str(self.merge_inputs[entry.input_index].path),
+                    original=entry.operation.original_name,
+                    new=entry.operation.new_name,
+                    operation=entry.operation.operation_type,
+                )
+        if not result.operation_count:
+            result.error_message = "No language files found to process"
+            return None
+        return plan
+
+    def _merge_archives(
+        self,
+        result: ProcessingResult,
+        plan: MergePlan,
+        output_path: Optional[Path],
+        guard: ResourceGuard,
+        progress: Optional[ProgressTracker],
+    ) -> bool:
+        """Stream the planned members of all inputs into the output."""
+        output_format = self.config.output_format
+        manifest = ArchiveManifest() if output_format.manifest else None
+        write = functools.partial(
+            ArchiveService.merge_archives,
+            plan,
+            archive_format=output_format.mode,
+            compression_level=output_format.compression_level,
+            parallel_threshold=output_format.parallel_threshold,
+            guard=guard,
+            progress=progress,
+            mtime=self._get_output_mtime(plan.latest_mtime),
+            manifest=manifest,
+        )
+        try:
+            return self._write_output(
+                result,
+                write,
+                output_path,
+                progress,
+                plan.total_size,
+                len(plan.entries),
+                manifest,
+            )
+        except ResourceLimitExceeded as e:
+            ConsoleOutput.print_error(f"Resource limit exceeded: {str(e)}")
+            result.error_message = f"Resource limit exceeded: {str(e)}"
+            return False
+        except Exception as e:
+            result.error_message = f"Processing error: {str(e)}"
+            return False
+
+    def _write_output(
+        self,
+        result: ProcessingResult,
+        write: Callable[[BinaryIO], int],
+        output_path: Optional[Path],
+        progress: Optional[ProgressTracker],
+        bytes_total: int,
+        file_count: int,
+        manifest: Optional[ArchiveManifest],
+    ) -> bool:
+        """Write the output archive; an existing file is replaced only if changed.
+
+        write streams the archive to the binary stream it is given and
+        returns its size. manifest is the one write fills in, if any.
+        """
+        try:
+            with self._phase(result, "archive", progress, bytes_total, file_count):
+                if self.output_stream is not None:
+                    result.bytes_out = write(self.output_stream)
+                    return True
+                written = self._write_output_file(write, output_path, manifest)
+        except (ResourceLimitExceeded, JobCancelled):
+            raise
+        except Exception:
+            if self.output_stream is not None:
+                raise
+            result.error_message = "Failed to create output archive"
+            return False
+
+        (
+            result.bytes_out,
+            result.unchanged,
+            result.manifest_file,
+            result.uploaded_to,
+        ) = written
+        return True
+
+    def _write_output_file(
+        self,
+        write: Callable[[BinaryIO], int],
+        output_path: Path,
+        manifest: Optional[ArchiveManifest],
+    ) -> Tuple[int, bool, Optional[Path], Optional[str]]:
+        """Write an archive file, keeping an existing one if nothing changed.
+
+        The archive is uploaded to the output sink, if any, while it is
+        written. Returns the bytes written, whether the existing file was
+        kept, the manifest sidecar and the upload location, if any. A
+        partially written file, or upload, is discarded.
+        """
+        output_format = self.config.output_format
+        # An existing output is only replaced once the new one differs
+        replacing = output_path.is_file()
+        partial_output = output_path
+        if replacing:
+            partial_output = OutputService.get_staging_path(output_path)
+        for hook in self.output_hooks:
+            hook(partial_output)
+        upload = self.output_service.open_upload(output_path.name)
+        uploaded_to = None
+        try:
+            with open(partial_output, "wb") as output:
+                write(output if upload is None else TeeStream(output, upload))
+            if upload is not None:
+                uploaded_to = upload.commit()
+        except Exception:
+            if upload is not None:
+                upload.abort()
+            self._remove_partial_output(partial_output)
+            raise
+
+        bytes_out = 0
+        embedded = manifest if output_format.manifest else None
+        unchanged = replacing and self._output_unchanged(
+            partial_output, output_path, embedded
+        )
+        if unchanged:
+            self._remove_partial_output(partial_output)
+        else:
+            if replacing:
+                os.replace(str(partial_output), str(output_path))
+            bytes_out = output_path.stat().st_size
+        sidecar = None
+        if output_format.manifest == "sidecar":
+            sidecar = self._write_manifest_sidecar(output_path, manifest)
+        return bytes_out, unchanged, sidecar, uploaded_to
+
+    def _write_shards(
+        self,
+        result: ProcessingResult,
+        source_dir: Path,
+        operations: List[FileOperation],
+        guard: ResourceGuard,
+        progress: Optional[ProgressTracker],
+        listing: ArchiveInfo,
+    ) -> bool:
+        """Write one archive per language from the renamed tree, in parallel.
+
+        Files that are not language files go to every shard, or to a single
+        SHARED_SHARD archive when output_format.shared_archive is set. Each
+        shard resolves its own name, counter and conflicts.
+        """
+        output_format = self.config.output_format
+        plan: Dict[str, List[Tuple[str, Path]]] = {}
+        language_paths = set()
+        for operation in operations:
+            files = plan.setdefault(self._shard_name(operation), [])
+            files.append((operation.path, source_dir / operation.path))
+            language_paths.add(operation.path)
+        shared_files = [
+            (file_path.relative_to(source_dir).as_posix(), file_path)
+            for file_path in source_dir.rglob("*")
+            if file_path.is_file()
+            and file_path.relative_to(source_dir).as_posix() not in language_paths
+        ]
+        if output_format.shared_archive:
+            if shared_files:
+                plan[SHARED_SHARD] = shared_files
+        else:
+            for files in plan.values():
+                files.extend(shared_files)
+
+        # Names and conflicts are settled first, as they may prompt the user
+        jobs = []
+        for name in sorted(plan):
+            shard = ShardOutput(name=name, file_count=len(plan[name]))
+            result.shards.append(shard)
+            claimed = self._claim_generated_output(name)
+            if claimed is None:
+                shard.skipped = True
+                continue
+            filename, shard.used_counter = claimed
+            shard.output_file = self.output_service.get_output_path(filename)
+            if shard.used_counter:
+                shard.counter_value = self._extract_counter_from_filename(filename)
+            jobs.append((shard, plan[name]))
+
+        bytes_total = sum(
+            file_path.stat().st_size for _, files in jobs for _, file_path in files
+        )
+        file_count = sum(len(files) for _, files in jobs)
+        mtime = self._get_output_mtime(listing.latest_mtime)
+        with self._phase(result, "archive", progress, bytes_total, file_count):
+            if jobs:
+                with ThreadPoolExecutor(
+                    max_workers=min(len(jobs), os.cpu_count() or 1)
+                ) as executor:
+                    futures = [
+                        executor.submit(
+                            self._write_shard,
+                            shard,
+                            source_dir,
+                            files,
+                            guard,
+                            progress,
+                            mtime,
+                        )
+                        for shard, files in jobs
+                    ]
+                    for future in futures:
+                        future.result()
+
+        result.bytes_out = sum(shard.bytes_out for shard in result.shards)
+        result.unchanged = bool(jobs) and all(shard.unchanged for shard, _ in jobs)
+        failed = [shard.name for shard in result.shards if shard.error_message]
+        if failed:
+            result.error_message = "Failed to create shards: " + ", ".join(failed)
+            return False
+        if not jobs:
+            result.error_message = "Output files already exist; skipped"
+            return False
+        return True
+
+    def _write_shard(
+        self,
+        shard: ShardOutput,
+        source_dir: Path,
+        files: List[Tuple[str, Path]],
+        guard: ResourceGuard,
+        progress: Optional[ProgressTracker],
+        mtime: Optional[int],
+    ):
+        """Write one shard's archive, recording the outcome on shard."""
+        output_format = self.config.output_format
+        manifest = ArchiveManifest() if output_format.manifest else None
+        write = functools.partial(
+            ArchiveService.write_archive,
+            source_dir,
+            archive_format=output_format.mode,
+            compression_level=output_format.compression_level,
+            parallel_threshold=output_format.parallel_threshold,
+            guard=guard,
+            progress=progress,
+            mtime=mtime,
+            manifest=manifest,
+            files=files,
+        )
+        try:
+            (
+                shard.bytes_out,
+                shard.unchanged,
+                shard.manifest_file,
+                shard.uploaded_to,
+            ) = self._write_output_file(write, shard.output_file, manifest)
+        except (ResourceLimitExceeded, JobCancelled):
+            raise
+        except Exception as e:
+            shard.error_message = str(e)
+
+    @staticmethod
+    def _shard_name(operation: FileOperation) -> str:
+        """Get the shard of a renamed file: its language, made safe for names."""
+        name = operation.language or Path(operation.new_name).stem
+        return re.sub(r"[^A-Za-z0-9_-]+", "-", name).strip("-") or "unknown"
+
+    def _publish_directory(
+        self,
+        result: ProcessingResult,
+        source_dir: Path,
+        output_path: Path,
+        guard: Optional[ResourceGuard],
+        progress: Optional[ProgressTracker],
+        listing: ArchiveInfo,
+    ) -> bool:
+        """Publish the renamed tree as a directory version behind a symlink."""
+        publisher = DirectoryOutputService(output_path.parent)
+        file_count = sum(1 for member in listing.members if not member.is_dir)
+        with self._phase(result, "publish", progress, listing.total_size, file_count):
+            stats = publisher.publish(source_dir, output_path.name, guard, progress)
+
+        result.bytes_out = stats.bytes_written
+        result.linked_files = stats.files_linked
+        return True
+
+    def _output_unchanged(
+        self, new_output: Path, output_path: Path, manifest: Optional[ArchiveManifest]
+    ) -> bool:
+        """Check if a new archive matches the existing output.
+
+        Archives match when their bytes are identical, or when both embed the
+        same manifest, i.e. every member has the same path, size and hash.
+        """
+        if OutputService.files_identical(new_output, output_path):
+            return True
+        if manifest is None:
+            return False
+        existing = ArchiveService.read_manifest(
+            output_path, self.config.output_format.mode
+        )
+        return existing == manifest
+
+    @staticmethod
+    def _hash_language_keys(
+        directory: Path, operations: List[FileOperation]
+    ) -> List[KeyHash]:
+        """Hash every key of the renamed language files under directory."""
+        key_hashes = []
+        for operation in sorted(operations, key=lambda op: op.path):
+            file_path = directory.joinpath(*operation.path.split("/"))
+            for key, value_hash in CatalogService.hash_keys(file_path):
+                key_hashes.append((operation.language, operation.path, key, value_hash))
+        return key_hashes
+
+    def _record_in_catalog(
+        self,
+        result: ProcessingResult,
+        output_path: Optional[Path],
+        manifest: Optional[ArchiveManifest],
+        key_hashes: List[KeyHash],
+    ):
+        """Record a finished job in the catalog; failures only warn."""
+        output_file = None
+        if output_path is not None and output_path.is_file():
+            output_file = output_path
+        try:
+            job = CatalogJob(
+                processed_at=result.timestamp.isoformat(timespec="seconds"),
+                input_path=str(self.zip_path),
+                input_sha256=self.input_fingerprint(),
+                input_size=result.bytes_in,
+                output_path=str(output_path) if output_path is not None else None,
+                output_sha256=(
+                    ArchiveService.fingerprint(output_file) if output_file else None
+                ),
+                output_size=output_file.stat().st_size if output_file else None,
+                unchanged=result.unchanged,
+            )
+            members = manifest.entries if manifest is not None else []
+            self.catalog.record_job(job, members, key_hashes)
+        except (OSError, sqlite3.Error) as e:
+            ConsoleOutput.print_warning(f"Catalog not updated: {str(e)}")
+
+    @staticmethod
+    def _write_manifest_sidecar(output_path: Path, manifest: ArchiveManifest) -> Path:
+        """Write the manifest next to the output archive unless already there."""
+        sidecar = output_path.with_name(output_path.name + MANIFEST_SIDECAR_SUFFIX)
+        content = manifest.to_json()
+        if not sidecar.is_file() or sidecar.read_text(encoding="utf-8") != content:
+            sidecar.write_text(content, encoding="utf-8")
+        return sidecar
+
+    def _get_output_mtime(self, latest_mtime: Optional[int]) -> Optional[int]:
+        """Get the member timestamp of deterministic output, None otherwise.
+
+        SOURCE_DATE_EPOCH wins over the configured mtime, which wins over
+        latest_mtime, the newest timestamp in the input.
+        """
+        output_format = self.config.output_format
+        if not output_format.deterministic:
+            return None
+
+        source_date_epoch = os.environ.get("SOURCE_DATE_EPOCH")
+        if source_date_epoch:
+            if not source_date_epoch.isdigit():
+                raise ValueError(
+                    f"SOURCE_DATE_EPOCH must be a Unix timestamp: {source_date_epoch}"
+                )
+            return int(source_date_epoch)
+        if output_format.mtime is not None:
+            return output_format.mtime
+        return latest_mtime or 0
+
+    @contextlib.contextmanager
+    def _phase(
+        self,
+        result: ProcessingResult,
+        name: str,
+        progress: Optional[ProgressTracker] = None,
+        bytes_total: int = 0,
+        members_total: int = 0,
+    ) -> Iterator[None]:
+        """Time a processing phase, emit its events and track its progress."""
+        self.events.emit("phase_started", input=str(self.zip_path), phase=name)
+        if progress is not None:
+            progress.start_phase(name, bytes_total, members_total)
+        memory = contextlib.nullcontext()
+        if self.memory_profiler is not None:
+            memory = self.memory_profiler.phase(name)
+        started = time.perf_counter()
+        try:
+            with memory:
+                yield
+        finally:
+            if progress is not None:
+                progress.finish_phase()
+            duration = round(time.perf_counter() - started, 6)
+            result.phase_timings[name] = duration
+            self.events.emit(
+                "phase_finished",
+                input=str(self.zip_path),
+                phase=name,
+                duration=duration,
+            )
+
+    def _emit_progress(self, snapshot: ProgressSnapshot):
+        """Forward a progress snapshot to the event sink."""
+        self.events.emit("progress", input=str(self.zip_path), **snapshot.to_dict())
+
+    def _get_input_size(self) -> int:
+        """Get the size of the input archive in bytes."""
+        if self.input_stream is None:
+            return self.zip_path.stat().st_size
+        position = self.input_stream.tell()
+        size = self.input_stream.seek(0, 2)
+        self.input_stream.seek(position)
+        return size
+
+    def _claim_output(self, output_path: Path):
+        """Claim an output path until this job finishes."""
+        OutputService.claim(output_path)
+        self._claimed_outputs.append(output_path)
+
+    @staticmethod
+    def _remove_partial_output(output_path: Path):
+        """Remove an output archive left incomplete by an aborted job."""
+        try:
+            if output_path.exists():
+                output_path.unlink()
+        except OSError:
+            pass
+
     def _extract_counter_from_filename(self, filename: str) -> Optional[int]:
         """Extract counter value from filename."""
+        extension = self.config.output_format.output_extension
+        stem = filename[: -len(extension)] if extension else filename
         try:
-            stem = Path(filename).stem
             parts = stem.split("_")
             if len(parts) >= 4:
                 return int(parts[-1])
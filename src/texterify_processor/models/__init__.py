@@ -1,13 +1,43 @@
 """Domain models for the Texterify Language Processor."""
 
-from .archive import ArchiveInfo
-from .config import OutputFormat, ProcessingConfig
-from .result import FileOperation, ProcessingResult
+from .archive import (
+    ArchiveInfo,
+    ArchiveManifest,
+    ArchiveMember,
+    InspectionReport,
+    ManifestEntry,
+)
+from .catalog import CatalogJob, KeyOccurrence
+from .config import OutputFormat, ProcessingConfig, ResourceLimits
+from .journal import JournalJob
+from .merge import MergeInput, MergePlan
+from .result import (
+    BatchResult,
+    FileOperation,
+    ProcessingResult,
+    PublishStats,
+    ShardOutput,
+    WorkerStats,
+)
 
 __all__ = [
     "ProcessingConfig",
     "OutputFormat",
+    "ResourceLimits",
     "ProcessingResult",
     "FileOperation",
+    "BatchResult",
+    "PublishStats",
+    "ShardOutput",
+    "WorkerStats",
     "ArchiveInfo",
+    "ArchiveMember",
+    "InspectionReport",
+    "ArchiveManifest",
+    "ManifestEntry",
+    "CatalogJob",
+    "KeyOccurrence",
+    "JournalJob",
+    "MergeInput",
+    "MergePlan",
 ]
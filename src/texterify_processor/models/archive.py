@@ -1,9 +1,103 @@
 """Archive-related models."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+import json
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+# Name of the manifest member embedded at the root of output archives
+MANIFEST_NAME = "manifest.json"
+
+# Appended to an output archive's name for the optional sidecar manifest
+MANIFEST_SIDECAR_SUFFIX = ".manifest.json"
+
+
+@dataclass
+class ArchiveMember:
+    """A single entry read from an archive's central directory."""
+
+    name: str
+    file_size: int = 0
+    compress_size: int = 0
+    is_dir: bool = False
+    target_name: Optional[str] = None
+
+    @property
+    def compression_ratio(self) -> float:
+        """Get the uncompressed-to-compressed size ratio."""
+        if not self.compress_size:
+            return 0.0
+        return self.file_size / self.compress_size
+
+    @property
+    def output_name(self) -> str:
+        """Get the member's path in the processed output."""
+        if self.target_name is None:
+            return self.name
+        return (Path(self.name).parent / self.target_name).as_posix()
+
+    @property
+    def will_rename(self) -> bool:
+        """Check if the current configuration would rename this member."""
+        return self.target_name is not None
+
+    def to_dict(self) -> dict:
+        """Convert member to dictionary for serialization."""
+        return {
+            "name": self.name,
+            "file_size": self.file_size,
+            "compress_size": self.compress_size,
+            "compression_ratio": round(self.compression_ratio, 2),
+            "is_dir": self.is_dir,
+            "target_name": self.target_name,
+        }
+
+
+@dataclass
+class ManifestEntry:
+    """Size and content hash of one file in an output archive."""
+
+    path: str
+    size: int
+    sha256: str
+
+    def to_dict(self) -> dict:
+        """Convert entry to dictionary for serialization."""
+        return {"path": self.path, "size": self.size, "sha256": self.sha256}
+
+
+@dataclass
+class ArchiveManifest:
+    """Paths, sizes and SHA-256 hashes of the files in an output archive."""
+
+    VERSION = 1
+
+    entries: List[ManifestEntry] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ArchiveManifest":
+        """Create ArchiveManifest from its serialized form."""
+        return cls(
+            entries=[
+                ManifestEntry(
+                    path=entry["path"], size=entry["size"], sha256=entry["sha256"]
+                )
+                for entry in data.get("files", [])
+            ]
+        )
+
+    def to_dict(self) -> dict:
+        """Convert manifest to dictionary for serialization."""
+        return {
+            "version": self.VERSION,
+            "algorithm": "sha256",
+            "files": [entry.to_dict() for entry in self.entries],
+        }
+
+    def to_json(self) -> str:
+        """Serialize the manifest; equal manifests give equal text."""
+        return json.dumps(self.to_dict(), indent=2, sort_keys=True) + "\n"
 
 
 @dataclass
@@ -15,10 +109,15 @@ class ArchiveInfo:
     file_count: int = 0
     language_files: List[str] = None
     error_message: Optional[str] = None
+    members: List[ArchiveMember] = None
+    # Newest member timestamp, reading the zone-less zip times as UTC
+    latest_mtime: Optional[int] = None
 
     def __post_init__(self):
         if self.language_files is None:
             self.language_files = []
+        if self.members is None:
+            self.members = []
 
     @property
     def name(self) -> str:
@@ -30,6 +129,48 @@ class ArchiveInfo:
         """Get archive parent directory."""
         return self.path.parent
 
+    @property
+    def total_size(self) -> int:
+        """Get total uncompressed size of all members."""
+        return sum(member.file_size for member in self.members)
+
+    @property
+    def total_compressed_size(self) -> int:
+        """Get total compressed size of all members."""
+        return sum(member.compress_size for member in self.members)
+
     def has_language_files(self) -> bool:
         """Check if archive contains any language files."""
         return len(self.language_files) > 0
+
+    def to_dict(self) -> dict:
+        """Convert archive information to dictionary for serialization."""
+        return {
+            "path": str(self.path),
+            "is_valid": self.is_valid,
+            "file_count": self.file_count,
+            "total_size": self.total_size,
+            "total_compressed_size": self.total_compressed_size,
+            "language_files": self.language_files,
+            "members": [member.to_dict() for member in self.members],
+            "error_message": self.error_message,
+        }
+
+
+@dataclass
+class InspectionReport:
+    """Result of inspecting an archive without processing it."""
+
+    archive: ArchiveInfo
+    output_filename: Optional[str] = None
+    output_exists: bool = False
+    counter_filename: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert report to dictionary for serialization."""
+        return {
+            "archive": self.archive.to_dict(),
+            "output_filename": self.output_filename,
+            "output_exists": self.output_exists,
+            "counter_filename": self.counter_filename,
+        }
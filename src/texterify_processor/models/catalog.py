@@ -0,0 +1,61 @@
+"""Models for the catalog of processed exports."""
+
+from dataclasses import dataclass
+
+from typing import Optional
+
+
+@dataclass
+class CatalogJob:
+    """A successful processing job as recorded in the catalog."""
+
+    processed_at: str
+    input_path: str
+    input_sha256: str
+    input_size: int = 0
+    output_path: Optional[str] = None
+    output_sha256: Optional[str] = None
+    output_size: Optional[int] = None
+    unchanged: bool = False
+    id: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        """Convert job to dictionary for serialization."""
+        return {
+            "id": self.id,
+            "processed_at": self.processed_at,
+            "input_path": self.input_path,
+            "input_sha256": self.input_sha256,
+            "input_size": self.input_size,
+            "output_path": self.output_path,
+            "output_sha256": self.output_sha256,
+            "output_size": self.output_size,
+            "unchanged": self.unchanged,
+        }
+
+
+@dataclass
+class KeyOccurrence:
+    """A translation key found in a language file of a catalogued job."""
+
+    job_id: int
+    processed_at: str
+    language: str
+    path: str
+    key: str
+    value_sha256: str
+    input_path: str
+    output_path: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert occurrence to dictionary for serialization."""
+        return {
+            "job_id": self.job_id,
+            "processed_at": self.processed_at,
+            "language": self.language,
+            "path": self.path,
+            "key": self.key,
+            "value_sha256": self.value_sha256,
+            "input_path": self.input_path,
+            "output_path": self.output_path,
+        }
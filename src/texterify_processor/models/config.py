@@ -2,7 +2,38 @@
 
 from dataclasses import dataclass, field
 
-from typing import Dict
+from typing import Dict, List, Optional
+
+from .mapping import MappingRule
+
+# Default file extension of each archive output mode
+ARCHIVE_EXTENSIONS = {
+    "zip": ".zip",
+    "tar": ".tar",
+    "tar.gz": ".tar.gz",
+    "tar.xz": ".tar.xz",
+}
+
+OUTPUT_MODES = (*ARCHIVE_EXTENSIONS, "directory")
+
+# Embed manifest.json in archives, or embed it and also write a sidecar file
+MANIFEST_MODES = ("embed", "sidecar")
+
+# Name suffix of the archive holding the files shared by all language shards
+SHARED_SHARD = "shared"
+
+# Zip members at least this large are deflated on several threads
+PARALLEL_DEFLATE_THRESHOLD = 16 * 1024 * 1024
+
+# Archive mode implied by a configured extension when no mode is given
+EXTENSION_MODES = {
+    ".zip": "zip",
+    ".tar": "tar",
+    ".tar.gz": "tar.gz",
+    ".tgz": "tar.gz",
+    ".tar.xz": "tar.xz",
+    ".txz": "tar.xz",
+}
 
 
 @dataclass
@@ -12,6 +43,94 @@ class OutputFormat:
     date_format: str = "%d_%m"
     base_filename: str = "lang_files"
     extension: str = ".zip"
+    # One of OUTPUT_MODES: an archive format, or "directory" for a versioned tree
+    mode: str = "zip"
+    compression_level: Optional[int] = None
+    # Reproducible archives: sorted members, fixed timestamps and permissions
+    deterministic: bool = False
+    # Member timestamp for deterministic archives; None derives it from input
+    mtime: Optional[int] = None
+    # One of MANIFEST_MODES to record member hashes, None for no manifest
+    manifest: Optional[str] = None
+    # Write one archive per language instead of a single archive
+    shard_by_language: bool = False
+    # With shards, put non-language files in a SHARED_SHARD archive rather
+    # than in every language's archive
+    shared_archive: bool = False
+    # Smallest member deflated in parallel blocks, None to always use one thread
+    parallel_threshold: Optional[int] = PARALLEL_DEFLATE_THRESHOLD
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "OutputFormat":
+        """Create OutputFormat from dictionary, inferring mode and extension."""
+        extension = data.get("extension")
+        mode = data.get("mode")
+        if mode is None:
+            mode = EXTENSION_MODES.get((extension or ".zip").lower(), "zip")
+        if extension is None:
+            extension = ARCHIVE_EXTENSIONS.get(mode, ".zip")
+
+        return cls(
+            date_format=data.get("date_format", "%d_%m"),
+            base_filename=data.get("base_filename", "lang_files"),
+            extension=extension,
+            mode=mode,
+            compression_level=data.get("compression_level"),
+            deterministic=data.get("deterministic", False),
+            mtime=data.get("mtime"),
+            manifest=data.get("manifest"),
+            shard_by_language=data.get("shard_by_language", False),
+            shared_archive=data.get("shared_archive", False),
+            parallel_threshold=data.get(
+                "parallel_threshold", PARALLEL_DEFLATE_THRESHOLD
+            ),
+        )
+
+    def use_mode(self, mode: str):
+        """Switch output mode, moving to its extension if the current one differs."""
+        self.mode = mode
+        if mode in ARCHIVE_EXTENSIONS:
+            if EXTENSION_MODES.get(self.extension.lower()) != mode:
+                self.extension = ARCHIVE_EXTENSIONS[mode]
+
+    @property
+    def is_directory(self) -> bool:
+        """Check if output is published as a directory tree."""
+        return self.mode == "directory"
+
+    @property
+    def output_extension(self) -> str:
+        """Get the extension of output names; directories have none."""
+        return "" if self.is_directory else self.extension
+
+
+@dataclass
+class ResourceLimits:
+    """Resource limits enforced while reading and processing an archive."""
+
+    max_total_bytes: Optional[int] = 8 * 1024**3
+    max_member_count: Optional[int] = 100000
+    max_compression_ratio: Optional[float] = 200.0
+    max_path_depth: Optional[int] = 32
+    allow_symlinks: bool = False
+    max_job_seconds: Optional[float] = None
+    max_memory_bytes: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ResourceLimits":
+        """Create ResourceLimits from dictionary, keeping defaults for gaps."""
+        defaults = cls()
+        return cls(
+            max_total_bytes=data.get("max_total_bytes", defaults.max_total_bytes),
+            max_member_count=data.get("max_member_count", defaults.max_member_count),
+            max_compression_ratio=data.get(
+                "max_compression_ratio", defaults.max_compression_ratio
+            ),
+            max_path_depth=data.get("max_path_depth", defaults.max_path_depth),
+            allow_symlinks=data.get("allow_symlinks", defaults.allow_symlinks),
+            max_job_seconds=data.get("max_job_seconds", defaults.max_job_seconds),
+            max_memory_bytes=data.get("max_memory_bytes", defaults.max_memory_bytes),
+        )
 
 
 @dataclass
@@ -19,31 +138,42 @@ class ProcessingConfig:
     """Configuration for processing Texterify exports."""
 
     language_mappings: Dict[str, str] = field(default_factory=dict)
+    # Pattern rules tried after the exact language_mappings
+    mapping_rules: List[MappingRule] = field(default_factory=list)
     case_sensitive: bool = False
     preserve_extensions: bool = False
     backup_original: bool = False
     output_format: OutputFormat = field(default_factory=OutputFormat)
+    limits: ResourceLimits = field(default_factory=ResourceLimits)
 
     @classmethod
     def from_dict(cls, data: Dict) -> "ProcessingConfig":
         """Create ProcessingConfig from dictionary."""
         output_format_data = data.get("settings", {}).get("output_format", {})
-        output_format = OutputFormat(
-            date_format=output_format_data.get("date_format", "%d_%m"),
-            base_filename=output_format_data.get("base_filename", "lang_files"),
-            extension=output_format_data.get("extension", ".zip"),
-        )
+        output_format = OutputFormat.from_dict(output_format_data)
 
         settings = data.get("settings", {})
 
         return cls(
             language_mappings=data.get("language_mappings", {}),
+            mapping_rules=[
+                MappingRule.from_dict(rule) for rule in data.get("mapping_rules", [])
+            ],
             case_sensitive=settings.get("case_sensitive", False),
             preserve_extensions=settings.get("preserve_extensions", False),
             backup_original=settings.get("backup_original", False),
             output_format=output_format,
+            limits=ResourceLimits.from_dict(settings.get("limits", {})),
         )
 
+    @property
+    def configured_languages(self) -> List[str]:
+        """Get the mapped languages, or the patterns of rules without one."""
+        languages = list(self.language_mappings)
+        for rule in self.mapping_rules:
+            languages.append(rule.language or rule.pattern)
+        return languages
+
     @classmethod
     def get_default(cls) -> "ProcessingConfig":
         """Get default configuration."""
@@ -56,4 +186,5 @@ class ProcessingConfig:
             preserve_extensions=False,
             backup_original=False,
             output_format=OutputFormat(),
+            limits=ResourceLimits(),
         )
@@ -0,0 +1,37 @@
+"""Models for the journal that lets interrupted batches resume."""
+
+from dataclasses import dataclass, field
+
+from typing import List, Optional
+
+# States a job moves through in the journal. A job is "writing" once its
+# first output file is about to be created and "cleaned" after a later run
+# removed the files an interrupted attempt left behind.
+JOB_STARTED = "started"
+JOB_WRITING = "writing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CLEANED = "cleaned"
+
+
+@dataclass
+class JournalJob:
+    """The latest journal state of one job, replayed from its records."""
+
+    key: str
+    state: str
+    input_path: Optional[str] = None
+    # Files the current attempt created, removed if it never completes
+    partial_outputs: List[str] = field(default_factory=list)
+
+    @property
+    def completed(self) -> bool:
+        """Check if the job finished successfully."""
+        return self.state == JOB_COMPLETED
+
+    @property
+    def interrupted(self) -> bool:
+        """Check if an attempt may have left partial outputs behind."""
+        return self.state not in (JOB_COMPLETED, JOB_CLEANED) and bool(
+            self.partial_outputs
+        )
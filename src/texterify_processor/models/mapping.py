@@ -0,0 +1,63 @@
+"""Models for rules that map archive members to target file names."""
+
+from dataclasses import dataclass
+
+from typing import Dict, Optional
+
+RULE_KINDS = ("exact", "glob", "regex")
+
+
+@dataclass(frozen=True)
+class MappingRule:
+    """Map members whose file stem matches a pattern to a target name.
+
+    exact rules compare the stem, glob rules use fnmatch patterns and regex
+    rules must match the whole stem; their target and language may use
+    backreferences such as \\1 or \\g<lang>. A directory limits the rule to
+    members below that path inside the archive.
+    """
+
+    kind: str
+    pattern: str
+    target: str
+    directory: Optional[str] = None
+    language: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MappingRule":
+        """Create MappingRule from a dict holding one of exact, glob or regex."""
+        kinds = [kind for kind in RULE_KINDS if kind in data]
+        if len(kinds) != 1:
+            raise ValueError(
+                f"Mapping rule needs exactly one of {', '.join(RULE_KINDS)}: {data}"
+            )
+        if not data.get("target"):
+            raise ValueError(f"Mapping rule has no target: {data}")
+
+        directory = data.get("directory")
+        if directory is not None:
+            directory = directory.replace("\\", "/").strip("/")
+        return cls(
+            kind=kinds[0],
+            pattern=data[kinds[0]],
+            target=data["target"],
+            directory=directory or None,
+            language=data.get("language"),
+        )
+
+    def to_dict(self) -> dict:
+        """Convert rule to the dictionary form used in configuration files."""
+        data = {self.kind: self.pattern, "target": self.target}
+        if self.directory is not None:
+            data["directory"] = self.directory
+        if self.language is not None:
+            data["language"] = self.language
+        return data
+
+
+@dataclass(frozen=True)
+class MappingMatch:
+    """The target name and language a member was mapped to."""
+
+    target: str
+    language: str
@@ -0,0 +1,62 @@
+"""Models for merging several exports into one output."""
+
+import zipfile
+from dataclasses import dataclass, field
+
+from pathlib import Path
+from typing import List, Optional
+
+from .result import FileOperation
+
+# How a path provided by more than one input is resolved: fail the merge,
+# keep the earliest input's file, or keep the latest input's file
+MERGE_CONFLICT_POLICIES = ("error", "first", "last")
+
+
+@dataclass
+class MergeInput:
+    """One export taking part in a merge.
+
+    Its files are placed under namespace, a directory in the output, and
+    renamed with its own config when one is given.
+    """
+
+    path: Path
+    namespace: str = ""
+    config_path: Optional[str] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "MergeInput":
+        """Parse PATH, or NAMESPACE=PATH, as given on the command line."""
+        namespace, separator, path = spec.partition("=")
+        if not separator:
+            namespace, path = "", spec
+        return cls(path=Path(path).resolve(), namespace=namespace.strip("/"))
+
+
+@dataclass
+class MergeEntry:
+    """A member of one input and where it goes in the merged output."""
+
+    input_index: int
+    member: zipfile.ZipInfo
+    output_name: str
+    operation: Optional[FileOperation] = None
+
+
+@dataclass
+class MergePlan:
+    """Members of the merged output, read from the inputs' central directories.
+
+    collisions lists output paths that more than one input provided.
+    """
+
+    inputs: List[MergeInput]
+    entries: List[MergeEntry] = field(default_factory=list)
+    collisions: List[str] = field(default_factory=list)
+    latest_mtime: Optional[int] = None
+
+    @property
+    def total_size(self) -> int:
+        """Get the uncompressed size of all members in the output."""
+        return sum(entry.member.file_size for entry in self.entries)
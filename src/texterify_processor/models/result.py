@@ -4,16 +4,57 @@ from dataclasses import dataclass
 from datetime import datetime
 
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
-@dataclass
 class FileOperation:
-    """Represents a file operation (rename, etc.)."""
+    """Represents a file operation (rename, etc.).
+
+    Uses __slots__ because large exports produce one instance per member.
+    language and path (the file's new path inside the output) are
+    informational and not compared.
+    """
+
+    __slots__ = ("original_name", "new_name", "operation_type", "language", "path")
+
+    def __init__(
+        self,
+        original_name: str,
+        new_name: str,
+        operation_type: str = "rename",
+        language: Optional[str] = None,
+        path: Optional[str] = None,
+    ):
+        self.original_name = original_name
+        self.new_name = new_name
+        self.operation_type = operation_type
+        self.language = language
+        self.path = path
 
-    original_name: str
-    new_name: str
-    operation_type: str = "rename"
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FileOperation):
+            return NotImplemented
+        return (self.original_name, self.new_name, self.operation_type) == (
+            other.original_name,
+            other.new_name,
+            other.operation_type,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"FileOperation(original_name={self.original_name!r}, "
+            f"new_name={self.new_name!r}, operation_type={self.operation_type!r})"
+        )
+
+    def to_dict(self) -> dict:
+        """Convert operation to dictionary for serialization."""
+        return {
+            "original": self.original_name,
+            "new": self.new_name,
+            "type": self.operation_type,
+            "language": self.language,
+            "path": self.path,
+        }
 
 
 @dataclass
@@ -28,21 +69,49 @@ class ProcessingResult:
     counter_value: Optional[int] = None
     timestamp: datetime = None
     error_message: Optional[str] = None
+    dry_run: bool = False
+    collisions: List[str] = None
+    estimated_output_size: Optional[int] = None
+    keep_operations: bool = True
+    operation_count: int = 0
+    phase_timings: Dict[str, float] = None
+    bytes_in: int = 0
+    bytes_out: int = 0
+    linked_files: int = 0
+    manifest_file: Optional[Path] = None
+    unchanged: bool = False
+    shards: List["ShardOutput"] = None
+    # Location the output was uploaded to, when an output sink is used
+    uploaded_to: Optional[str] = None
 
     def __post_init__(self):
         if self.file_operations is None:
             self.file_operations = []
+        if self.collisions is None:
+            self.collisions = []
+        if self.shards is None:
+            self.shards = []
+        if self.phase_timings is None:
+            self.phase_timings = {}
         if self.timestamp is None:
             self.timestamp = datetime.now()
 
     @property
     def processed_files_count(self) -> int:
         """Get the number of processed files."""
-        return len(self.file_operations)
+        if self.keep_operations:
+            return len(self.file_operations)
+        return self.operation_count
 
     def add_file_operation(self, original: str, new: str, operation: str = "rename"):
         """Add a file operation to the result."""
-        self.file_operations.append(FileOperation(original, new, operation))
+        self.record_operation(FileOperation(original, new, operation))
+
+    def record_operation(self, operation: FileOperation):
+        """Record an operation, keeping only a count when operations are streamed."""
+        self.operation_count += 1
+        if self.keep_operations:
+            self.file_operations.append(operation)
 
     def to_dict(self) -> dict:
         """Convert result to dictionary for serialization."""
@@ -52,15 +121,138 @@ class ProcessingResult:
             "input_file": str(self.input_file),
             "output_file": str(self.output_file) if self.output_file else None,
             "processed_files": self.processed_files_count,
-            "file_operations": [
-                {
-                    "original": op.original_name,
-                    "new": op.new_name,
-                    "type": op.operation_type,
-                }
-                for op in self.file_operations
-            ],
+            "file_operations": [op.to_dict() for op in self.file_operations],
+            "used_counter": self.used_counter,
+            "counter_value": self.counter_value,
+            "error_message": self.error_message,
+            "dry_run": self.dry_run,
+            "collisions": self.collisions,
+            "estimated_output_size": self.estimated_output_size,
+            "phase_timings": self.phase_timings,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "linked_files": self.linked_files,
+            "manifest_file": str(self.manifest_file) if self.manifest_file else None,
+            "unchanged": self.unchanged,
+            "shards": [shard.to_dict() for shard in self.shards],
+            "uploaded_to": self.uploaded_to,
+        }
+
+
+@dataclass
+class ShardOutput:
+    """One archive of an output sharded by language."""
+
+    name: str
+    output_file: Optional[Path] = None
+    file_count: int = 0
+    bytes_out: int = 0
+    used_counter: bool = False
+    counter_value: Optional[int] = None
+    unchanged: bool = False
+    manifest_file: Optional[Path] = None
+    skipped: bool = False
+    error_message: Optional[str] = None
+    uploaded_to: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert shard to dictionary for serialization."""
+        return {
+            "name": self.name,
+            "output_file": str(self.output_file) if self.output_file else None,
+            "file_count": self.file_count,
+            "bytes_out": self.bytes_out,
             "used_counter": self.used_counter,
             "counter_value": self.counter_value,
+            "unchanged": self.unchanged,
+            "manifest_file": str(self.manifest_file) if self.manifest_file else None,
+            "skipped": self.skipped,
             "error_message": self.error_message,
+            "uploaded_to": self.uploaded_to,
+        }
+
+
+@dataclass
+class PublishStats:
+    """What publishing a directory version wrote and what it reused."""
+
+    files_written: int = 0
+    files_linked: int = 0
+    bytes_written: int = 0
+
+
+@dataclass
+class WorkerStats:
+    """How much of a batch run one worker spent processing jobs."""
+
+    name: str
+    jobs: int = 0
+    busy_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Get the share of the run the worker was busy, from 0 to 1."""
+        if not self.wall_seconds:
+            return 0.0
+        return min(1.0, self.busy_seconds / self.wall_seconds)
+
+    def to_dict(self) -> dict:
+        """Convert worker stats to dictionary for serialization."""
+        return {
+            "name": self.name,
+            "jobs": self.jobs,
+            "busy_seconds": round(self.busy_seconds, 6),
+            "wall_seconds": round(self.wall_seconds, 6),
+            "utilization": round(self.utilization, 4),
+        }
+
+
+@dataclass
+class BatchResult:
+    """Summary of a batch run; keeps counts rather than every job result."""
+
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    # Jobs a previous run completed, according to the batch journal
+    skipped: int = 0
+    failed_inputs: List[Path] = None
+    workers: List[WorkerStats] = None
+
+    def __post_init__(self):
+        if self.failed_inputs is None:
+            self.failed_inputs = []
+        if self.workers is None:
+            self.workers = []
+
+    @property
+    def success(self) -> bool:
+        """Check if every job in the batch succeeded."""
+        return self.failed == 0
+
+    def record(self, result: ProcessingResult):
+        """Count a finished job."""
+        self.total += 1
+        if result.success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+            self.failed_inputs.append(result.input_file)
+
+    def record_skipped(self):
+        """Count a job that was already done."""
+        self.total += 1
+        self.skipped += 1
+
+    def to_dict(self) -> dict:
+        """Convert batch result to dictionary for serialization."""
+        return {
+            "success": self.success,
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "failed_inputs": [str(path) for path in self.failed_inputs],
+            "workers": [worker.to_dict() for worker in self.workers],
         }
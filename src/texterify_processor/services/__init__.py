@@ -1,8 +1,32 @@
 """Service layer for business logic."""
 
 from .archive_service import ArchiveService
+from .archive_writers import ArchiveWriter, get_archive_writer
+from .catalog_service import CatalogService
 from .config_service import ConfigService
+from .directory_output_service import DirectoryOutputService
+from .event_service import EventSink, NdjsonEventSink
 from .file_service import FileService
+from .journal_service import BatchJournal
+from .metrics_service import MetricsRegistry
 from .output_service import OutputService
+from .output_sinks import LocalSink, OutputSink, S3Sink, open_output_sink
 
-__all__ = ["ConfigService", "ArchiveService", "FileService", "OutputService"]
+__all__ = [
+    "ConfigService",
+    "ArchiveService",
+    "ArchiveWriter",
+    "get_archive_writer",
+    "FileService",
+    "OutputService",
+    "OutputSink",
+    "LocalSink",
+    "S3Sink",
+    "open_output_sink",
+    "DirectoryOutputService",
+    "EventSink",
+    "NdjsonEventSink",
+    "MetricsRegistry",
+    "CatalogService",
+    "BatchJournal",
+]
@@ -1,34 +1,60 @@
 """Service for handling archive operations."""
 
+import calendar
+import contextlib
+import hashlib
+import io
+import tarfile
 import zipfile
 
-from pathlib import Path
-from typing import List
+import json
+import tempfile
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
 
-from ..models.archive import ArchiveInfo
-from ..models.config import ProcessingConfig
+from ..models.archive import MANIFEST_NAME, ArchiveInfo, ArchiveManifest, ArchiveMember
+from ..models.config import PARALLEL_DEFLATE_THRESHOLD, ProcessingConfig
+from ..models.merge import MergeEntry, MergeInput, MergePlan
+from ..models.result import FileOperation
+from ..utils.mapping_matcher import MappingMatcher
+from ..utils.progress import ProgressTracker
+from ..utils.resource_guard import ResourceGuard, ResourceLimitExceeded
+from .archive_writers import get_archive_writer
+from .zip_reader import ZipReader, open_zip_reader
+
+CHUNK_SIZE = 64 * 1024
+
+# Archives read from a pipe stay in memory up to this size, then spill to disk
+SPOOL_MEMORY_LIMIT = 64 * 1024 * 1024
+
+# Display name of archives given as streams rather than paths
+STREAM_NAME = "<stdin>"
+
+# An archive on disk, or a seekable binary stream holding one
+ArchiveSource = Union[Path, BinaryIO]
 
 
 class ArchiveService:
     """Service for archive validation and extraction."""
 
     @staticmethod
-    def validate_archive(archive_path: Path) -> ArchiveInfo:
+    def validate_archive(
+        archive_path: ArchiveSource,
+        guard: Optional[ResourceGuard] = None,
+        progress: Optional[ProgressTracker] = None,
+    ) -> ArchiveInfo:
         """Validate and get information about an archive."""
-        archive_info = ArchiveInfo(path=archive_path)
-
-        if not archive_path.exists():
-            archive_info.error_message = f"Archive file not found: {archive_path}"
-            return archive_info
-
-        if not archive_path.suffix.lower() == ".zip":
-            archive_info.error_message = "File must be a .zip archive"
+        archive_info = ArchiveService._new_archive_info(archive_path)
+        if archive_info.error_message:
             return archive_info
 
         try:
-            with zipfile.ZipFile(archive_path, "r") as zf:
+            with open_zip_reader(archive_path) as zf:
+                if guard is not None:
+                    guard.check_archive(zf.infolist())
+
                 # Test zip integrity
-                if zf.testzip() is not None:
+                if ArchiveService._test_members(zf, guard, progress) is not None:
                     archive_info.error_message = "Archive is corrupted"
                     return archive_info
 
@@ -42,58 +68,454 @@ class ArchiveService:
 
         except zipfile.BadZipFile:
             archive_info.error_message = "Invalid zip file format"
+        except ResourceLimitExceeded as e:
+            archive_info.error_message = f"Resource limit exceeded: {str(e)}"
         except Exception as e:
             archive_info.error_message = f"Error validating archive: {str(e)}"
 
         return archive_info
 
     @staticmethod
-    def extract_archive(archive_path: Path, destination: Path) -> bool:
-        """Extract archive to destination directory."""
+    def inspect_archive(
+        archive_path: ArchiveSource, config: ProcessingConfig
+    ) -> ArchiveInfo:
+        """Read archive members from the central directory without decompressing."""
+        archive_info = ArchiveService._new_archive_info(archive_path)
+        if archive_info.error_message:
+            return archive_info
+
+        try:
+            # Opening the archive only parses the central directory
+            matcher = MappingMatcher.for_config(config)
+            with open_zip_reader(archive_path) as zf:
+                for zinfo in zf.infolist():
+                    is_dir = zinfo.is_dir()
+                    target_name = None
+                    if not is_dir:
+                        target_name = matcher.get_target_name(zinfo.filename)
+                    archive_info.members.append(
+                        ArchiveMember(
+                            name=zinfo.filename,
+                            file_size=zinfo.file_size,
+                            compress_size=zinfo.compress_size,
+                            is_dir=is_dir,
+                            target_name=target_name,
+                        )
+                    )
+                    if target_name:
+                        archive_info.language_files.append(Path(zinfo.filename).name)
+                    mtime = calendar.timegm(zinfo.date_time + (0, 0, 0))
+                    latest = archive_info.latest_mtime
+                    if latest is None or mtime > latest:
+                        archive_info.latest_mtime = mtime
+
+            archive_info.file_count = len(archive_info.members)
+            archive_info.is_valid = True
+
+        except zipfile.BadZipFile:
+            archive_info.error_message = "Invalid zip file format"
+        except Exception as e:
+            archive_info.error_message = f"Error inspecting archive: {str(e)}"
+
+        return archive_info
+
+    @staticmethod
+    def extract_archive(
+        archive_path: ArchiveSource,
+        destination: Path,
+        guard: Optional[ResourceGuard] = None,
+        progress: Optional[ProgressTracker] = None,
+    ) -> bool:
+        """Extract archive to destination directory, enforcing resource limits.
+
+        Raises ResourceLimitExceeded as soon as a limit is hit.
+        """
+        if guard is None:
+            guard = ResourceGuard(ProcessingConfig.get_default().limits)
+
         try:
-            with zipfile.ZipFile(archive_path, "r") as zf:
-                zf.extractall(destination)
+            with open_zip_reader(archive_path) as zf:
+                members = zf.infolist()
+                guard.check_archive(members)
+                for zinfo in members:
+                    ArchiveService._extract_member(
+                        zf, zinfo, destination, guard, progress
+                    )
             return True
+        except ResourceLimitExceeded:
+            raise
         except Exception:
             return False
 
+    @staticmethod
+    def spool_stream(
+        stream: BinaryIO,
+        memory_limit: int = SPOOL_MEMORY_LIMIT,
+        max_bytes: Optional[int] = None,
+    ) -> BinaryIO:
+        """Copy a pipe into a seekable spool, since zip needs random access.
+
+        The spool lives in memory up to memory_limit and in a temporary file
+        beyond it. Raises ResourceLimitExceeded past max_bytes.
+        """
+        # SpooledTemporaryFile is not seekable() for zipfile before Python 3.11
+        spool: BinaryIO = io.BytesIO()
+        total = 0
+        try:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if max_bytes is not None and total > max_bytes:
+                    raise ResourceLimitExceeded(
+                        f"input stream exceeds the {max_bytes} byte limit"
+                    )
+                if total > memory_limit and isinstance(spool, io.BytesIO):
+                    spilled = tempfile.TemporaryFile()
+                    spilled.write(spool.getbuffer())
+                    spool.close()
+                    spool = spilled
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+
+        spool.seek(0)
+        return spool
+
+    @staticmethod
+    def _new_archive_info(archive_path: ArchiveSource) -> ArchiveInfo:
+        """Create archive info, recording an error if a path cannot be a zip."""
+        if not isinstance(archive_path, Path):
+            return ArchiveInfo(path=Path(STREAM_NAME))
+
+        archive_info = ArchiveInfo(path=archive_path)
+        if not archive_path.exists():
+            archive_info.error_message = f"Archive file not found: {archive_path}"
+        elif not archive_path.suffix.lower() == ".zip":
+            archive_info.error_message = "File must be a .zip archive"
+        return archive_info
+
     @staticmethod
     def create_archive(
-        source_dir: Path, output_path: Path, compression_level: int = 6
+        source_dir: Path,
+        output_path: Path,
+        compression_level: int = 6,
+        guard: Optional[ResourceGuard] = None,
+        progress: Optional[ProgressTracker] = None,
+        archive_format: str = "zip",
+        mtime: Optional[int] = None,
+        manifest: Optional[ArchiveManifest] = None,
+        embed_manifest: bool = True,
     ) -> bool:
-        """Create a zip archive from a directory."""
+        """Create an archive of the given format from a directory."""
         try:
-            with zipfile.ZipFile(
-                output_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compression_level
-            ) as zf:
-                for file_path in source_dir.rglob("*"):
-                    if file_path.is_file():
-                        arcname = file_path.relative_to(source_dir)
-                        zf.write(file_path, arcname)
+            with open(output_path, "wb") as output:
+                ArchiveService.write_archive(
+                    source_dir,
+                    output,
+                    archive_format,
+                    compression_level,
+                    guard=guard,
+                    progress=progress,
+                    mtime=mtime,
+                    manifest=manifest,
+                    embed_manifest=embed_manifest,
+                )
             return True
+        except ResourceLimitExceeded:
+            raise
         except Exception:
             return False
 
+    @staticmethod
+    def write_archive(
+        source_dir: Path,
+        output: BinaryIO,
+        archive_format: str = "zip",
+        compression_level: Optional[int] = None,
+        guard: Optional[ResourceGuard] = None,
+        progress: Optional[ProgressTracker] = None,
+        mtime: Optional[int] = None,
+        manifest: Optional[ArchiveManifest] = None,
+        embed_manifest: bool = True,
+        files: Optional[Iterable[Tuple[str, Path]]] = None,
+        parallel_threshold: Optional[int] = PARALLEL_DEFLATE_THRESHOLD,
+    ) -> int:
+        """Stream an archive of a directory to a binary stream.
+
+        The stream does not need to be seekable. Members are written sorted
+        by name; with mtime the archive is byte-for-byte reproducible. When
+        manifest is given, each member's hash is recorded in it as the data
+        is written and, unless embed_manifest is false, it is embedded as
+        manifest.json. files, (archive name, path) pairs, limits the archive
+        to part of source_dir. Zip members of at least parallel_threshold
+        bytes are deflated on several threads. Returns the archive size.
+        """
+        if files is None:
+            files = (
+                (file_path.relative_to(source_dir).as_posix(), file_path)
+                for file_path in source_dir.rglob("*")
+                if file_path.is_file()
+            )
+        files = sorted(files)
+        embed_manifest = manifest is not None and embed_manifest
+        if embed_manifest and any(name == MANIFEST_NAME for name, _ in files):
+            raise ValueError(f"Export already contains {MANIFEST_NAME}")
+        writer_class = get_archive_writer(archive_format)
+        with writer_class(
+            output, compression_level, mtime, parallel_threshold
+        ) as writer:
+            for arcname, file_path in files:
+                if guard is not None:
+                    guard.check_budgets()
+                entry = writer.add_file(file_path, arcname)
+                if manifest is not None:
+                    manifest.entries.append(entry)
+                if progress is not None:
+                    progress.advance(entry.size, 1)
+            if embed_manifest:
+                writer.add_bytes(MANIFEST_NAME, manifest.to_json().encode("utf-8"))
+        return writer.bytes_written
+
+    @staticmethod
+    def plan_merge(
+        inputs: List[MergeInput],
+        configs: List[ProcessingConfig],
+        conflict_policy: str = "error",
+        guard: Optional[ResourceGuard] = None,
+    ) -> MergePlan:
+        """Plan a merge from the central directories of the inputs.
+
+        Each input is renamed with its config and placed under its
+        namespace. When several inputs provide the same output path,
+        conflict_policy "first" keeps the earliest and "last" the latest;
+        with "error" every input's entry is kept and the caller is expected
+        to fail on plan.collisions. Entries are sorted by output path.
+        """
+        plan = MergePlan(inputs=list(inputs))
+        chosen: Dict[str, MergeEntry] = {}
+        collisions = set()
+        for index, (merge_input, config) in enumerate(zip(inputs, configs)):
+            matcher = MappingMatcher.for_config(config)
+            with open_zip_reader(merge_input.path) as zf:
+                members = zf.infolist()
+            if guard is not None:
+                guard.check_archive(members)
+
+            for zinfo in members:
+                if zinfo.is_dir():
+                    continue
+                mtime = calendar.timegm(zinfo.date_time + (0, 0, 0))
+                if plan.latest_mtime is None or mtime > plan.latest_mtime:
+                    plan.latest_mtime = mtime
+
+                member_path = PurePosixPath(zinfo.filename)
+                output_path = member_path
+                operation = None
+                found = matcher.match(zinfo.filename)
+                if found:
+                    output_path = member_path.parent / found.target
+                if merge_input.namespace:
+                    output_path = PurePosixPath(merge_input.namespace) / output_path
+                if found:
+                    operation = FileOperation(
+                        original_name=member_path.name,
+                        new_name=found.target,
+                        operation_type="rename",
+                        language=found.language,
+                        path=output_path.as_posix(),
+                    )
+
+                entry = MergeEntry(index, zinfo, output_path.as_posix(), operation)
+                if entry.output_name in chosen:
+                    collisions.add(entry.output_name)
+                    if conflict_policy == "first":
+                        continue
+                    if conflict_policy == "error":
+                        plan.entries.append(chosen[entry.output_name])
+                chosen[entry.output_name] = entry
+
+        plan.entries.extend(chosen.values())
+        plan.entries.sort(key=lambda entry: (entry.output_name, entry.input_index))
+        plan.collisions = sorted(collisions)
+        return plan
+
+    @staticmethod
+    def merge_archives(
+        plan: MergePlan,
+        output: BinaryIO,
+        archive_format: str = "zip",
+        compression_level: Optional[int] = None,
+        guard: Optional[ResourceGuard] = None,
+        progress: Optional[ProgressTracker] = None,
+        mtime: Optional[int] = None,
+        manifest: Optional[ArchiveManifest] = None,
+        embed_manifest: bool = True,
+        parallel_threshold: Optional[int] = PARALLEL_DEFLATE_THRESHOLD,
+    ) -> int:
+        """Stream the planned members of several exports into one archive.
+
+        Every input member is read once, from a memory map of its input. Zip
+        output copies compressed data as slices of the map, without
+        recompressing it, wherever the method allows; other formats
+        decompress while writing. manifest, mtime and parallel_threshold
+        work as in write_archive. Returns the archive size.
+        """
+        names = [entry.output_name for entry in plan.entries]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate output paths: {', '.join(plan.collisions)}")
+        embed_manifest = manifest is not None and embed_manifest
+        if embed_manifest and MANIFEST_NAME in names:
+            raise ValueError(f"Export already contains {MANIFEST_NAME}")
+
+        writer_class = get_archive_writer(archive_format)
+        with contextlib.ExitStack() as stack:
+            sources = [
+                stack.enter_context(open_zip_reader(merge_input.path))
+                for merge_input in plan.inputs
+            ]
+            writer = stack.enter_context(
+                writer_class(output, compression_level, mtime, parallel_threshold)
+            )
+            for entry in plan.entries:
+                if guard is not None:
+                    guard.check_budgets()
+                manifest_entry = writer.add_zip_member(
+                    sources[entry.input_index],
+                    entry.member,
+                    entry.output_name,
+                    hash_content=manifest is not None,
+                )
+                if manifest is not None:
+                    manifest.entries.append(manifest_entry)
+                if progress is not None:
+                    progress.advance(entry.member.file_size, 1)
+            if embed_manifest:
+                writer.add_bytes(MANIFEST_NAME, manifest.to_json().encode("utf-8"))
+        return writer.bytes_written
+
+    @staticmethod
+    def fingerprint(source: ArchiveSource) -> str:
+        """Get the SHA-256 of a file, or of a seekable stream's whole content."""
+        digest = hashlib.sha256()
+        if isinstance(source, Path):
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            return digest.hexdigest()
+
+        position = source.tell()
+        source.seek(0)
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+        source.seek(position)
+        return digest.hexdigest()
+
+    @staticmethod
+    def read_manifest(
+        archive_path: Path, archive_format: str = "zip"
+    ) -> Optional[ArchiveManifest]:
+        """Read the manifest embedded in an output archive, if it has one."""
+        try:
+            if archive_format == "zip":
+                with zipfile.ZipFile(archive_path) as zf:
+                    data = zf.read(MANIFEST_NAME)
+            else:
+                with tarfile.open(str(archive_path), "r:*") as tf:
+                    data = tf.extractfile(MANIFEST_NAME).read()
+            return ArchiveManifest.from_dict(json.loads(data.decode("utf-8")))
+        except (KeyError, OSError, ValueError, zipfile.BadZipFile, tarfile.TarError):
+            return None
+
+    @staticmethod
+    def _extract_member(
+        zf: ZipReader,
+        zinfo: zipfile.ZipInfo,
+        destination: Path,
+        guard: ResourceGuard,
+        progress: Optional[ProgressTracker] = None,
+    ):
+        """Stream a single member to disk, checking limits chunk by chunk."""
+        guard.check_member_path(zinfo)
+        guard.check_budgets()
+
+        name = zinfo.filename.replace("\\", "/")
+        target = destination.joinpath(*[part for part in name.split("/") if part])
+        if zinfo.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+            if progress is not None:
+                progress.advance(members_done=1)
+            return
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        member_bytes = 0
+        with zf.open(zinfo) as source, open(target, "wb") as dest:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                member_bytes += len(chunk)
+                guard.check_member_bytes(zinfo, member_bytes)
+                guard.add_bytes(len(chunk))
+                guard.check_budgets()
+                dest.write(chunk)
+                if progress is not None:
+                    progress.advance(len(chunk))
+        if progress is not None:
+            progress.advance(members_done=1)
+
+    @staticmethod
+    def _test_members(
+        zf: ZipReader,
+        guard: Optional[ResourceGuard] = None,
+        progress: Optional[ProgressTracker] = None,
+    ) -> Optional[str]:
+        """Read every member to verify CRCs; return the first bad member name."""
+        if guard is None:
+            return zf.testzip()
+
+        for zinfo in zf.infolist():
+            member_bytes = 0
+            try:
+                with zf.open(zinfo) as source:
+                    while True:
+                        chunk = source.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        member_bytes += len(chunk)
+                        guard.check_member_bytes(zinfo, member_bytes)
+                        guard.check_budgets()
+                        if progress is not None:
+                            progress.advance(len(chunk))
+            except zipfile.BadZipFile:
+                return zinfo.filename
+            if progress is not None:
+                progress.advance(members_done=1)
+        return None
+
+    @staticmethod
+    def estimate_archive_size(entries: Iterable[Tuple[str, int]]) -> int:
+        """Estimate zip size from (arcname, compressed size) pairs."""
+        # Local header (30) and central directory entry (46) per member,
+        # each carrying the name, plus the end of central directory record (22)
+        total = 22
+        for arcname, compress_size in entries:
+            name_length = len(arcname.encode("utf-8"))
+            total += compress_size + 76 + 2 * name_length
+        return total
+
     @staticmethod
     def _identify_language_files(
         file_list: List[str], config: ProcessingConfig
     ) -> List[str]:
         """Identify language files in the archive based on configuration."""
         language_files = []
+        matcher = MappingMatcher.for_config(config)
 
         for file_path in file_list:
-            file_name = Path(file_path).name
-            file_stem = Path(file_path).stem
-
-            # Check if this file matches any language mapping
-            for lang_key in config.language_mappings.keys():
-                if config.case_sensitive:
-                    if file_stem == lang_key:
-                        language_files.append(file_name)
-                        break
-                else:
-                    if file_stem.lower() == lang_key.lower():
-                        language_files.append(file_name)
-                        break
+            if matcher.get_target_name(file_path):
+                language_files.append(Path(file_path).name)
 
         return language_files
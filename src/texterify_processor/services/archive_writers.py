@@ -0,0 +1,512 @@
+"""Streaming archive writers for the supported output formats."""
+
+import gzip
+import hashlib
+import io
+import lzma
+import stat
+import struct
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Type, Union
+
+from ..models.archive import ManifestEntry
+from ..models.config import PARALLEL_DEFLATE_THRESHOLD
+from ..utils.parallel_deflate import crc32_combine, deflate_blocks
+from .zip_reader import MappedZipFile, ZipReader
+
+DEFAULT_COMPRESSION_LEVEL = 6
+
+COPY_CHUNK_SIZE = 64 * 1024
+
+# Zip timestamps cannot predate the DOS epoch, 1980-01-01 00:00:00 UTC
+ZIP_EPOCH = 315532800
+
+# Permissions given to every member of a deterministic archive
+NORMALIZED_MODE = 0o644
+
+# Compression methods whose data can be copied between zips unchanged
+RAW_COPY_METHODS = (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+
+# Zip general purpose flags marking an encrypted member, and a member whose
+# CRC and sizes follow its data in a data descriptor
+ZIP_FLAG_ENCRYPTED = 0x01
+ZIP_FLAG_DATA_DESCRIPTOR = 0x08
+
+DATA_DESCRIPTOR_SIGNATURE = 0x08074B50
+
+
+class TrackedStream:
+    """Wrap an output stream and track how many bytes the archive occupies.
+
+    Seeks are passed through only when the wrapped stream supports them, so
+    writers fall back to their streaming layouts on pipes and sockets.
+    """
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        try:
+            self._seekable = raw.seekable()
+        except (AttributeError, ValueError):
+            self._seekable = False
+        self.start = raw.tell() if self._seekable else 0
+        self.position = self.start
+        self.end = self.start
+
+    @property
+    def size(self) -> int:
+        """Get the number of bytes written from the starting position."""
+        return self.end - self.start
+
+    def write(self, data) -> int:
+        written = self.raw.write(data)
+        count = len(data) if written is None else written
+        self.position += count
+        self.end = max(self.end, self.position)
+        return count
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if not self._seekable:
+            raise io.UnsupportedOperation("seek")
+        self.position = self.raw.seek(offset, whence)
+        return self.position
+
+    def seekable(self) -> bool:
+        return self._seekable
+
+    def flush(self):
+        self.raw.flush()
+
+
+class HashingReader:
+    """Read a binary stream while computing the SHA-256 of what was read."""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self._hash.update(data)
+        self.size += len(data)
+        return data
+
+    def hexdigest(self) -> str:
+        """Get the hex SHA-256 of the bytes read so far."""
+        return self._hash.hexdigest()
+
+
+class ArchiveWriter:
+    """Write files into an archive on a binary stream, one member at a time.
+
+    Member data is hashed as it is copied into the archive, and every add
+    returns the member's ManifestEntry. When mtime is given the archive is
+    deterministic: every member gets that timestamp, fixed permissions and
+    no owner, so its bytes depend only on the member names, their order and
+    their content. Where the format allows, members of at least
+    parallel_threshold bytes are compressed on threads, as many as there
+    are CPUs unless threads says otherwise.
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        compression_level: Optional[int] = None,
+        mtime: Optional[int] = None,
+        parallel_threshold: Optional[int] = PARALLEL_DEFLATE_THRESHOLD,
+        threads: Optional[int] = None,
+    ):
+        if compression_level is None:
+            compression_level = DEFAULT_COMPRESSION_LEVEL
+        self.stream = TrackedStream(fileobj)
+        self.compression_level = compression_level
+        self.mtime = mtime
+        self.parallel_threshold = parallel_threshold
+        self.threads = threads or os.cpu_count() or 1
+
+    @property
+    def bytes_written(self) -> int:
+        """Get the size of the archive written so far."""
+        return self.stream.size
+
+    def add_file(self, path: Path, arcname: str) -> ManifestEntry:
+        """Add a file from disk under the given archive name."""
+        with open(path, "rb") as source:
+            file_stat = os.fstat(source.fileno())
+            return self._add(
+                arcname,
+                source,
+                file_stat.st_size,
+                file_stat.st_mtime,
+                stat.S_IMODE(file_stat.st_mode),
+            )
+
+    def add_bytes(self, arcname: str, data: bytes) -> ManifestEntry:
+        """Add an in-memory member under the given archive name."""
+        return self._add(
+            arcname, io.BytesIO(data), len(data), time.time(), NORMALIZED_MODE
+        )
+
+    def add_zip_member(
+        self,
+        source: ZipReader,
+        member: zipfile.ZipInfo,
+        arcname: str,
+        hash_content: bool = True,
+    ) -> Optional[ManifestEntry]:
+        """Copy a member of an open zip under the given archive name.
+
+        The member is decompressed and written like any other file. The
+        ManifestEntry is always returned here; writers that can copy
+        without decompressing only return it when hash_content is true.
+        """
+        mtime = time.mktime(member.date_time + (0, 0, -1))
+        with source.open(member) as data:
+            return self._add(
+                arcname, data, member.file_size, mtime, zip_member_mode(member)
+            )
+
+    def _add(
+        self, arcname: str, source: BinaryIO, size: int, mtime: float, mode: int
+    ) -> ManifestEntry:
+        """Copy one member into the archive through a hashing reader."""
+        if self.mtime is not None:
+            mtime, mode = self.mtime, NORMALIZED_MODE
+        reader = HashingReader(source)
+        self._write_member(arcname, reader, size, mtime, mode)
+        return ManifestEntry(path=arcname, size=reader.size, sha256=reader.hexdigest())
+
+    def _write_member(
+        self, arcname: str, source: BinaryIO, size: int, mtime: float, mode: int
+    ):
+        """Write a regular file member, reading its data from source."""
+        raise NotImplementedError
+
+    def close(self):
+        """Finish the archive and flush the stream."""
+        raise NotImplementedError
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ZipArchiveWriter(ArchiveWriter):
+    """Deflated zip; uses data descriptors when the stream cannot seek.
+
+    Large members are split into blocks deflated in parallel, which still
+    make up a single deflate stream any zip reader can inflate.
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        compression_level: Optional[int] = None,
+        mtime: Optional[int] = None,
+        parallel_threshold: Optional[int] = PARALLEL_DEFLATE_THRESHOLD,
+        threads: Optional[int] = None,
+    ):
+        super().__init__(fileobj, compression_level, mtime, parallel_threshold, threads)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._zip = zipfile.ZipFile(
+            self.stream,
+            "w",
+            zipfile.ZIP_DEFLATED,
+            compresslevel=self.compression_level,
+        )
+
+    def _write_member(
+        self, arcname: str, source: BinaryIO, size: int, mtime: float, mode: int
+    ):
+        zinfo = self._new_zinfo(arcname, mtime, mode)
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        # ZipFile.write sets the size and level the same way before streaming
+        zinfo.file_size = size
+        zinfo._compresslevel = self.compression_level
+        if self._deflates_in_parallel(size):
+            self._write_parallel(zinfo, source)
+            return
+        with self._zip.open(zinfo, "w") as dest:
+            shutil.copyfileobj(source, dest, COPY_CHUNK_SIZE)
+
+    def _deflates_in_parallel(self, size: int) -> bool:
+        """Check if a member of this size is deflated on several threads."""
+        return (
+            self.parallel_threshold is not None
+            and size >= self.parallel_threshold
+            and self.threads > 1
+            and self.compression_level > 0
+        )
+
+    def _write_parallel(self, zinfo: zipfile.ZipInfo, source: BinaryIO):
+        """Write a member deflated in blocks on several threads.
+
+        The CRC and compressed size are only known once every block is
+        written, so the local header is rewritten afterwards or, when the
+        stream cannot seek, followed by a data descriptor.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.threads, thread_name_prefix="texterify-deflate"
+            )
+        zf = self._zip
+        # zipfile decides the same way whether a member needs zip64 fields
+        zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+        zinfo.CRC = 0
+        zinfo.compress_size = 0
+        if not zf._seekable:
+            zinfo.flag_bits |= ZIP_FLAG_DATA_DESCRIPTOR
+        with zf._lock:
+            self._begin_entry(zinfo, zip64)
+            crc = compress_size = file_size = 0
+            for compressed, block_crc, length in deflate_blocks(
+                source, self._executor, self.compression_level, self.threads
+            ):
+                zf.fp.write(compressed)
+                crc = crc32_combine(crc, block_crc, length)
+                compress_size += len(compressed)
+                file_size += length
+            zinfo.CRC = crc
+            zinfo.compress_size = compress_size
+            zinfo.file_size = file_size
+            if not zip64 and max(file_size, compress_size) > zipfile.ZIP64_LIMIT:
+                raise RuntimeError(f"Member unexpectedly needs zip64: {zinfo.filename}")
+
+            if zinfo.flag_bits & ZIP_FLAG_DATA_DESCRIPTOR:
+                zf.fp.write(
+                    struct.pack(
+                        "<LLQQ" if zip64 else "<LLLL",
+                        DATA_DESCRIPTOR_SIGNATURE,
+                        crc,
+                        compress_size,
+                        file_size,
+                    )
+                )
+            else:
+                end = zf.fp.tell()
+                zf.fp.seek(zinfo.header_offset)
+                zf.fp.write(zinfo.FileHeader(zip64))
+                zf.fp.seek(end)
+            self._end_entry(zinfo)
+
+    def add_zip_member(
+        self,
+        source: ZipReader,
+        member: zipfile.ZipInfo,
+        arcname: str,
+        hash_content: bool = True,
+    ) -> Optional[ManifestEntry]:
+        """Copy a zip member's compressed bytes as they are, when possible.
+
+        Stored and deflated members are not recompressed; the CRC and sizes
+        of the source entry are reused. Hashing them for the manifest still
+        needs one decompressing read of the source member.
+        """
+        if (
+            member.compress_type not in RAW_COPY_METHODS
+            or member.flag_bits & ZIP_FLAG_ENCRYPTED
+        ):
+            return super().add_zip_member(source, member, arcname, hash_content)
+
+        entry = None
+        if hash_content:
+            with source.open(member) as data:
+                reader = HashingReader(data)
+                for _ in iter(lambda: reader.read(COPY_CHUNK_SIZE), b""):
+                    pass
+            entry = ManifestEntry(
+                path=arcname, size=reader.size, sha256=reader.hexdigest()
+            )
+
+        if self.mtime is None:
+            zinfo = zipfile.ZipInfo(arcname, member.date_time)
+            zinfo.create_system = 3
+            zinfo.external_attr = (stat.S_IFREG | zip_member_mode(member)) << 16
+        else:
+            zinfo = self._new_zinfo(arcname, self.mtime, NORMALIZED_MODE)
+        zinfo.compress_type = member.compress_type
+        zinfo.CRC = member.CRC
+        zinfo.compress_size = member.compress_size
+        zinfo.file_size = member.file_size
+        self._write_raw(zinfo, source, member)
+        return entry
+
+    def _new_zinfo(self, arcname: str, mtime: float, mode: int) -> zipfile.ZipInfo:
+        """Create the entry of a regular file member."""
+        # Deterministic times must not depend on the local timezone
+        to_struct = time.localtime if self.mtime is None else time.gmtime
+        zinfo = zipfile.ZipInfo(arcname, to_struct(max(mtime, ZIP_EPOCH))[:6])
+        zinfo.create_system = 3
+        zinfo.external_attr = (stat.S_IFREG | mode) << 16
+        return zinfo
+
+    def _write_raw(
+        self, zinfo: zipfile.ZipInfo, source: ZipReader, member: zipfile.ZipInfo
+    ):
+        """Write a local header for zinfo followed by member's raw data.
+
+        This mirrors what ZipFile.open(..., "w") does around its compressor;
+        zipfile has no public API for adding already-compressed data.
+        """
+        zf = self._zip
+        with zf._lock:
+            self._begin_entry(zinfo)
+            remaining = member.compress_size
+            for chunk in iter_raw_member(source, member):
+                zf.fp.write(chunk)
+                remaining -= len(chunk)
+            if remaining:
+                raise zipfile.BadZipFile(f"Truncated member data: {member.filename}")
+            self._end_entry(zinfo)
+
+    def _begin_entry(self, zinfo: zipfile.ZipInfo, zip64: Optional[bool] = None):
+        """Write zinfo's local header where the next member starts.
+
+        The caller holds the archive's lock until _end_entry.
+        """
+        zf = self._zip
+        if zf._writing:
+            raise ValueError("Another member of the archive is being written")
+        if zf._seekable:
+            zf.fp.seek(zf.start_dir)
+        zinfo.header_offset = zf.fp.tell()
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zf.fp.write(zinfo.FileHeader(zip64))
+
+    def _end_entry(self, zinfo: zipfile.ZipInfo):
+        """Record zinfo in the central directory after its data is written."""
+        zf = self._zip
+        zf.start_dir = zf.fp.tell()
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+        self._zip.close()
+        self.stream.flush()
+
+
+class TarArchiveWriter(ArchiveWriter):
+    """Uncompressed tar written in stream mode; members carry no owner."""
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        compression_level: Optional[int] = None,
+        mtime: Optional[int] = None,
+        parallel_threshold: Optional[int] = PARALLEL_DEFLATE_THRESHOLD,
+        threads: Optional[int] = None,
+    ):
+        super().__init__(fileobj, compression_level, mtime, parallel_threshold, threads)
+        self._compressor = self._open_compressor()
+        self._tar = tarfile.open(
+            fileobj=self._compressor or self.stream,
+            mode="w|",
+            format=tarfile.PAX_FORMAT,
+        )
+
+    def _open_compressor(self) -> Optional[BinaryIO]:
+        """Open the compression layer between tar and the stream, if any."""
+        return None
+
+    def _write_member(
+        self, arcname: str, source: BinaryIO, size: int, mtime: float, mode: int
+    ):
+        tarinfo = tarfile.TarInfo(arcname)
+        tarinfo.size = size
+        tarinfo.mtime = int(mtime)
+        tarinfo.mode = mode
+        self._tar.addfile(tarinfo, source)
+
+    def close(self):
+        self._tar.close()
+        if self._compressor is not None:
+            self._compressor.close()
+        self.stream.flush()
+
+
+class GzipTarArchiveWriter(TarArchiveWriter):
+    """Gzip-compressed tar; the level is passed to gzip (0-9)."""
+
+    def _open_compressor(self) -> Optional[BinaryIO]:
+        # The gzip header records a timestamp too; None means now
+        return gzip.GzipFile(
+            fileobj=self.stream,
+            mode="wb",
+            compresslevel=self.compression_level,
+            mtime=self.mtime,
+        )
+
+
+class XzTarArchiveWriter(TarArchiveWriter):
+    """XZ-compressed tar; the level is used as the xz preset (0-9)."""
+
+    def _open_compressor(self) -> Optional[BinaryIO]:
+        return lzma.LZMAFile(self.stream, "wb", preset=self.compression_level)
+
+
+def zip_member_mode(member: zipfile.ZipInfo) -> int:
+    """Get a zip member's Unix permissions, or the normalized ones if unset."""
+    mode = stat.S_IMODE(member.external_attr >> 16)
+    return mode if member.create_system == 3 and mode else NORMALIZED_MODE
+
+
+def iter_raw_member(
+    source: ZipReader, member: zipfile.ZipInfo
+) -> Iterator[Union[bytes, memoryview]]:
+    """Read a member's compressed bytes, skipping its local file header.
+
+    Mapped archives hand out slices of their map instead of reading.
+    """
+    if isinstance(source, MappedZipFile):
+        yield from source.iter_raw(member)
+        return
+
+    raw = source.fp
+    raw.seek(member.header_offset)
+    header = raw.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader:
+        raise zipfile.BadZipFile(f"Truncated file header: {member.filename}")
+    fields = struct.unpack(zipfile.structFileHeader, header)
+    if fields[0] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad file header magic: {member.filename}")
+    # The name and extra field lengths are the last two header fields
+    raw.seek(fields[-2] + fields[-1], io.SEEK_CUR)
+
+    remaining = member.compress_size
+    while remaining > 0:
+        chunk = raw.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            return
+        remaining -= len(chunk)
+        yield chunk
+
+
+ARCHIVE_WRITERS: Dict[str, Type[ArchiveWriter]] = {
+    "zip": ZipArchiveWriter,
+    "tar": TarArchiveWriter,
+    "tar.gz": GzipTarArchiveWriter,
+    "tar.xz": XzTarArchiveWriter,
+}
+
+
+def get_archive_writer(archive_format: str) -> Type[ArchiveWriter]:
+    """Get the writer class for an archive format name."""
+    try:
+        return ARCHIVE_WRITERS[archive_format]
+    except KeyError:
+        raise ValueError(f"Unsupported archive format: {archive_format}")
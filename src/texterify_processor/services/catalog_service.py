@@ -0,0 +1,206 @@
+"""SQLite catalog of processed exports, their outputs and translation keys."""
+
+import hashlib
+import sqlite3
+import threading
+
+import json
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from ..models.archive import ManifestEntry
+from ..models.catalog import CatalogJob, KeyOccurrence
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    processed_at TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    input_sha256 TEXT NOT NULL,
+    input_size INTEGER NOT NULL,
+    output_path TEXT,
+    output_sha256 TEXT,
+    output_size INTEGER,
+    unchanged INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS members (
+    job_id INTEGER NOT NULL REFERENCES jobs (id),
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS language_keys (
+    job_id INTEGER NOT NULL REFERENCES jobs (id),
+    language TEXT NOT NULL,
+    path TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value_sha256 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_input_sha256 ON jobs (input_sha256);
+CREATE INDEX IF NOT EXISTS jobs_input_path ON jobs (input_path);
+CREATE INDEX IF NOT EXISTS jobs_output_path ON jobs (output_path);
+CREATE INDEX IF NOT EXISTS members_job ON members (job_id);
+CREATE INDEX IF NOT EXISTS members_sha256 ON members (sha256);
+CREATE INDEX IF NOT EXISTS language_keys_key ON language_keys (key, language, job_id);
+"""
+
+JOB_COLUMNS = (
+    "id, processed_at, input_path, input_sha256, input_size, "
+    "output_path, output_sha256, output_size, unchanged"
+)
+
+# (language, path inside the output, flattened key, SHA-256 of the value)
+KeyHash = Tuple[str, str, str, str]
+
+
+class CatalogService:
+    """Record processed jobs in a local SQLite database and query them.
+
+    Each job is written in a single transaction: the job row, the hash of
+    every output member and the hash of every key of every language file.
+    Job ids grow with time, so the lowest id is the earliest occurrence.
+    The connection is shared by the jobs of a batch, whatever thread they
+    run on, and used by one of them at a time.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self.connection.close()
+
+    def record_job(
+        self,
+        job: CatalogJob,
+        members: Iterable[ManifestEntry] = (),
+        keys: Iterable[KeyHash] = (),
+    ) -> int:
+        """Insert a job with its member and key hashes; returns the job id."""
+        with self._lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO jobs (processed_at, input_path, input_sha256, "
+                "input_size, output_path, output_sha256, output_size, unchanged) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.processed_at,
+                    job.input_path,
+                    job.input_sha256,
+                    job.input_size,
+                    job.output_path,
+                    job.output_sha256,
+                    job.output_size,
+                    int(job.unchanged),
+                ),
+            )
+            job.id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO members (job_id, path, size, sha256) VALUES (?, ?, ?, ?)",
+                ((job.id, entry.path, entry.size, entry.sha256) for entry in members),
+            )
+            self.connection.executemany(
+                "INSERT INTO language_keys "
+                "(job_id, language, path, key, value_sha256) VALUES (?, ?, ?, ?, ?)",
+                ((job.id, *key_hash) for key_hash in keys),
+            )
+        return job.id
+
+    def find_key(
+        self, key: str, language: Optional[str] = None, first_only: bool = False
+    ) -> List[KeyOccurrence]:
+        """Find the jobs whose language files contain key, oldest first.
+
+        With first_only, only the earliest occurrence per language is kept.
+        """
+        query = (
+            "SELECT j.id, j.processed_at, k.language, k.path, k.key, "
+            "k.value_sha256, j.input_path, j.output_path{extra} "
+            "FROM language_keys k JOIN jobs j ON j.id = k.job_id WHERE k.key = ?"
+        )
+        params: list = [key]
+        if language is not None:
+            query += " AND k.language = ?"
+            params.append(language)
+        if first_only:
+            # SQLite takes the bare columns from the row holding the minimum
+            query = query.format(extra=", MIN(j.id)") + " GROUP BY k.language"
+        else:
+            query = query.format(extra="")
+        query += " ORDER BY j.id, k.language"
+
+        with self._lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return [KeyOccurrence(*row[:8]) for row in rows]
+
+    def find_jobs(
+        self, input_path: Optional[str] = None, input_sha256: Optional[str] = None
+    ) -> List[CatalogJob]:
+        """Find the jobs that processed an export, by path or fingerprint."""
+        conditions, params = [], []
+        if input_path is not None:
+            conditions.append("input_path = ?")
+            params.append(input_path)
+        if input_sha256 is not None:
+            conditions.append("input_sha256 = ?")
+            params.append(input_sha256)
+        if not conditions:
+            return []
+
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs WHERE {' OR '.join(conditions)} "
+                "ORDER BY id",
+                params,
+            ).fetchall()
+        return [self._job_from_row(row) for row in rows]
+
+    @staticmethod
+    def _job_from_row(row: tuple) -> CatalogJob:
+        """Build a CatalogJob from a row selected with JOB_COLUMNS."""
+        job_id, processed_at, input_path, input_sha256, input_size = row[:5]
+        output_path, output_sha256, output_size, unchanged = row[5:]
+        return CatalogJob(
+            processed_at=processed_at,
+            input_path=input_path,
+            input_sha256=input_sha256,
+            input_size=input_size,
+            output_path=output_path,
+            output_sha256=output_sha256,
+            output_size=output_size,
+            unchanged=bool(unchanged),
+            id=job_id,
+        )
+
+    @staticmethod
+    def hash_keys(path: Path) -> Iterator[Tuple[str, str]]:
+        """Yield (key, value SHA-256) for a JSON language file.
+
+        Nested objects are flattened into dotted keys. Files that are not
+        JSON objects yield nothing.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, UnicodeDecodeError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+
+        pending = [("", data)]
+        while pending:
+            prefix, node = pending.pop()
+            for name, value in node.items():
+                key = f"{prefix}{name}"
+                if isinstance(value, dict) and value:
+                    pending.append((f"{key}.", value))
+                    continue
+                encoded = json.dumps(value, ensure_ascii=False, sort_keys=True)
+                yield key, hashlib.sha256(encoded.encode("utf-8")).hexdigest()
@@ -1,12 +1,15 @@
 """Service for handling configuration loading and management."""
 
+import re
+
 import json
 from pathlib import Path
 from typing import Optional
 
 from console_output import ConsoleOutput
 
-from ..models.config import ProcessingConfig
+from ..models.config import MANIFEST_MODES, OUTPUT_MODES, ProcessingConfig
+from ..utils.mapping_matcher import MappingMatcher
 
 
 class ConfigService:
@@ -52,7 +55,22 @@ class ConfigService:
     @staticmethod
     def validate_config(config: ProcessingConfig) -> bool:
         """Validate configuration object."""
-        if not config.language_mappings:
+        if not config.language_mappings and not config.mapping_rules:
+            return False
+
+        output_format = config.output_format
+        if output_format.mode not in OUTPUT_MODES:
+            return False
+        level = output_format.compression_level
+        if level is not None and (not isinstance(level, int) or not 0 <= level <= 9):
+            return False
+        mtime = output_format.mtime
+        if mtime is not None and (not isinstance(mtime, int) or mtime < 0):
+            return False
+        threshold = output_format.parallel_threshold
+        if threshold is not None and (not isinstance(threshold, int) or threshold < 0):
+            return False
+        if output_format.manifest not in (None, *MANIFEST_MODES):
             return False
 
         # Validate that all mappings have non-empty strings
@@ -62,4 +80,10 @@ class ConfigService:
             if not key.strip() or not value.strip():
                 return False
 
+        # Patterns must compile
+        try:
+            MappingMatcher.for_config(config)
+        except re.error:
+            return False
+
         return True
@@ -0,0 +1,126 @@
+"""Service for publishing output as versioned directory trees."""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from ..models.result import PublishStats
+from ..utils.progress import ProgressTracker
+from ..utils.resource_guard import ResourceGuard
+from .output_service import OutputService
+
+
+class DirectoryOutputService:
+    """Publish renamed trees as versions behind an atomically swapped symlink.
+
+    Files identical to the ones in the version the link points at are
+    hardlinked instead of written, and the link is replaced with a rename,
+    so readers never see a half-published tree.
+    """
+
+    LINK_NAME = "current"
+
+    def __init__(self, output_dir: Path, link_name: str = LINK_NAME):
+        self.output_dir = output_dir
+        self.link_path = output_dir / link_name
+
+    def get_current_version(self) -> Optional[Path]:
+        """Get the version directory the link points at, if any."""
+        if not self.link_path.is_symlink():
+            return None
+        target = self.output_dir / os.readlink(str(self.link_path))
+        return target if target.is_dir() else None
+
+    def publish(
+        self,
+        source_dir: Path,
+        version_name: str,
+        guard: Optional[ResourceGuard] = None,
+        progress: Optional[ProgressTracker] = None,
+    ) -> PublishStats:
+        """Move source_dir's files into a new version and point the link at it.
+
+        Files are moved out of source_dir, which is expected to be temporary.
+        """
+        stats = PublishStats()
+        previous = self.get_current_version()
+        version_path = self.output_dir / version_name
+
+        # Build next to the final location so the renames stay atomic
+        staging = Path(
+            tempfile.mkdtemp(prefix=f".{version_name}.", dir=str(self.output_dir))
+        )
+        os.chmod(str(staging), 0o755)
+        retired = None
+        try:
+            for source in sorted(source_dir.rglob("*")):
+                relative = source.relative_to(source_dir)
+                target = staging / relative
+                if source.is_dir():
+                    target.mkdir(parents=True, exist_ok=True)
+                    continue
+
+                if guard is not None:
+                    guard.check_budgets()
+                size = source.stat().st_size
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if previous is not None and self._link_if_unchanged(
+                    source, previous / relative, target
+                ):
+                    stats.files_linked += 1
+                else:
+                    shutil.move(str(source), str(target))
+                    stats.files_written += 1
+                    stats.bytes_written += size
+                if progress is not None:
+                    progress.advance(size, 1)
+
+            if version_path.exists():
+                if previous == version_path:
+                    # Keep the link valid while the old tree is moved away
+                    self._swap_link(staging.name)
+                retired = staging.with_name(staging.name + ".old")
+                os.rename(str(version_path), str(retired))
+            os.rename(str(staging), str(version_path))
+            self._swap_link(version_name)
+        except BaseException:
+            if retired is not None and not version_path.exists():
+                os.rename(str(retired), str(version_path))
+                retired = None
+                if previous == version_path:
+                    self._swap_link(version_name)
+            shutil.rmtree(str(staging), ignore_errors=True)
+            raise
+
+        if retired is not None:
+            shutil.rmtree(str(retired), ignore_errors=True)
+        return stats
+
+    def _swap_link(self, target_name: str):
+        """Point the link at target_name in a single atomic rename."""
+        temp_link = self.output_dir / f".{self.link_path.name}.{os.getpid()}.tmp"
+        if temp_link.is_symlink() or temp_link.exists():
+            temp_link.unlink()
+        # Relative targets keep the output directory relocatable
+        os.symlink(target_name, str(temp_link), target_is_directory=True)
+        try:
+            os.replace(str(temp_link), str(self.link_path))
+        except OSError:
+            temp_link.unlink()
+            raise
+
+    @staticmethod
+    def _link_if_unchanged(source: Path, previous_file: Path, target: Path) -> bool:
+        """Hardlink previous_file to target if it matches source byte for byte."""
+        try:
+            if not previous_file.is_file():
+                return False
+            if not OutputService.files_identical(source, previous_file):
+                return False
+            os.link(str(previous_file), str(target))
+            return True
+        except OSError:
+            # Hardlinks are unsupported here or cross devices; write instead
+            return False
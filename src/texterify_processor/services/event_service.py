@@ -0,0 +1,83 @@
+"""Service for streaming structured processing events."""
+
+import threading
+import time
+
+import json
+import sys
+from typing import TextIO
+
+
+class EventSink:
+    """Receives processing events as they happen; the default discards them."""
+
+    def emit(self, event: str, **fields):
+        """Record a single event."""
+
+    def flush(self):
+        """Write out any buffered events."""
+
+    def close(self):
+        """Flush and release the sink."""
+        self.flush()
+
+
+class NdjsonEventSink(EventSink):
+    """Write events as newline-delimited JSON, flushed in buffered batches."""
+
+    def __init__(
+        self,
+        stream: TextIO,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        close_stream: bool = False,
+    ):
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.close_stream = close_stream
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, target: str, **kwargs) -> "NdjsonEventSink":
+        """Open a sink on a file path, or on stdout when target is '-'."""
+        if target == "-":
+            return cls(sys.stdout, **kwargs)
+        stream = open(target, "a", encoding="utf-8")
+        return cls(stream, close_stream=True, **kwargs)
+
+    def emit(self, event: str, **fields):
+        """Buffer an event and flush when the batch is full or stale."""
+        record = {"event": event, "ts": round(time.time(), 6)}
+        record.update(fields)
+        line = json.dumps(record, separators=(",", ":"), default=str)
+
+        with self._lock:
+            self._buffer.append(line)
+            now = time.monotonic()
+            if (
+                len(self._buffer) >= self.batch_size
+                or now - self._last_flush >= self.flush_interval
+            ):
+                self._flush_locked(now)
+
+    def flush(self):
+        """Write out buffered events."""
+        with self._lock:
+            self._flush_locked(time.monotonic())
+
+    def close(self):
+        """Flush and close the underlying stream if the sink opened it."""
+        self.flush()
+        if self.close_stream:
+            self.stream.close()
+
+    def _flush_locked(self, now: float):
+        """Write the buffer; caller must hold the lock."""
+        if self._buffer:
+            self.stream.write("\n".join(self._buffer) + "\n")
+            self.stream.flush()
+            self._buffer = []
+        self._last_flush = now
@@ -1,13 +1,17 @@
 """Service for file operations and transformations."""
 
+from collections import Counter
+
 import os
-from pathlib import Path
-from typing import List
+from pathlib import Path, PurePosixPath
+from typing import Iterator, List, Optional, Tuple
 
 from console_output import ConsoleOutput
 
 from ..models.config import ProcessingConfig
+from ..models.mapping import MappingMatch
 from ..models.result import FileOperation
+from ..utils.mapping_matcher import MappingMatcher
 
 
 class FileService:
@@ -18,26 +22,70 @@ class FileService:
 
     def find_and_rename_files(self, directory: Path) -> List[FileOperation]:
         """Find language files and rename them according to configuration."""
-        operations = []
+        return list(self.iter_rename_files(directory))
 
+    def iter_rename_files(self, directory: Path) -> Iterator[FileOperation]:
+        """Rename language files one at a time, yielding each operation."""
+        matcher = MappingMatcher.for_config(self.config)
         for root, dirs, files in os.walk(directory):
             for file in files:
                 file_path = Path(root) / file
-                operation = self._try_rename_file(file_path)
+                member_path = file_path.relative_to(directory).as_posix()
+                operation = self._try_rename_file(file_path, member_path, matcher)
                 if operation:
-                    operations.append(operation)
+                    yield operation
+
+    def plan_renames(self, member_names: List[str]) -> List[FileOperation]:
+        """Build the rename operations for archive members without touching disk."""
+        operations = []
+
+        for member_name, output_path, found in self._plan_member_paths(member_names):
+            if found:
+                operations.append(
+                    FileOperation(
+                        original_name=Path(member_name).name,
+                        new_name=found.target,
+                        operation_type="rename",
+                        language=found.language,
+                        path=output_path,
+                    )
+                )
 
         return operations
 
-    def _try_rename_file(self, file_path: Path) -> FileOperation:
-        """Try to rename a single file based on configuration."""
-        file_stem = file_path.stem
+    def find_target_collisions(self, member_names: List[str]) -> List[str]:
+        """Find output paths that more than one archive member would occupy."""
+        counts = Counter(
+            output_path for _, output_path, _ in self._plan_member_paths(member_names)
+        )
+        return sorted(path for path, count in counts.items() if count > 1)
+
+    def _plan_member_paths(
+        self, member_names: List[str]
+    ) -> Iterator[Tuple[str, str, Optional[MappingMatch]]]:
+        """Yield (member, output path, mapping match) for each file member."""
+        matcher = MappingMatcher.for_config(self.config)
+        for member_name in member_names:
+            if member_name.endswith("/"):
+                continue
+
+            member_path = Path(member_name)
+            found = matcher.match(member_name)
+            if found:
+                output_path = (member_path.parent / found.target).as_posix()
+            else:
+                output_path = member_path.as_posix()
+            yield member_name, output_path, found
 
-        # Check for language mapping
-        target_name = self._get_target_name(file_stem)
-        if not target_name:
+    def _try_rename_file(
+        self, file_path: Path, member_path: str, matcher: MappingMatcher
+    ) -> Optional[FileOperation]:
+        """Try to rename a single file based on configuration."""
+        found = matcher.match(member_path)
+        if not found:
             return None
 
+        target_name = found.target
         try:
             new_path = file_path.parent / target_name
             file_path.rename(new_path)
@@ -47,30 +95,22 @@ class FileService:
                 original_name=file_path.name,
                 new_name=target_name,
                 operation_type="rename",
+                language=found.language,
+                path=(PurePosixPath(member_path).parent / target_name).as_posix(),
             )
         except Exception as e:
             ConsoleOutput.print_error(f"Failed to rename {file_path.name}: {e}")
             return None
 
-    def _get_target_name(self, file_stem: str) -> str:
-        """Get target name for a file stem based on language mappings."""
-        for lang_key, lang_target in self.config.language_mappings.items():
-            if self.config.case_sensitive:
-                if file_stem == lang_key:
-                    return lang_target
-            else:
-                if file_stem.lower() == lang_key.lower():
-                    return lang_target
-        return None
-
     def get_language_files_in_directory(self, directory: Path) -> List[str]:
         """Get list of language files in directory that match configuration."""
         language_files = []
+        matcher = MappingMatcher.for_config(self.config)
 
         for root, dirs, files in os.walk(directory):
             for file in files:
-                file_stem = Path(file).stem
-                if self._get_target_name(file_stem):
+                member_path = (Path(root) / file).relative_to(directory).as_posix()
+                if matcher.get_target_name(member_path):
                     language_files.append(file)
 
         return language_files
@@ -0,0 +1,156 @@
+"""Append-only journal of batch job states, used to resume batches."""
+
+import dataclasses
+import hashlib
+import threading
+import time
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List
+
+from ..models.config import ProcessingConfig
+from ..models.journal import (
+    JOB_CLEANED,
+    JOB_STARTED,
+    JOB_WRITING,
+    JournalJob,
+)
+
+
+class BatchJournal:
+    """Record job states as newline-delimited JSON and replay them on open.
+
+    Jobs are keyed by the SHA-256 of their input and a hash of the effective
+    config, so a rerun skips a job only if it would produce the same output.
+    Records are buffered and written in batches, like events, and the file
+    is synced when a batch is written. A "writing" record names a file that
+    is about to be created and is written through at once, so a crash never
+    leaves an output behind that the journal does not know about.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 64, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.jobs: Dict[str, JournalJob] = {}
+        if path.is_file():
+            self._replay()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._stream = open(path, "a", encoding="utf-8")
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def job_key(input_sha256: str, config: ProcessingConfig) -> str:
+        """Key a job by its input's hash and a hash of its effective config."""
+        config_json = json.dumps(
+            dataclasses.asdict(config), sort_keys=True, default=str
+        )
+        config_hash = hashlib.sha256(config_json.encode()).hexdigest()
+        return f"{input_sha256}:{config_hash[:16]}"
+
+    def is_completed(self, key: str) -> bool:
+        """Check if a previous run completed the job."""
+        job = self.jobs.get(key)
+        return job is not None and job.completed
+
+    def recover(self) -> List[Path]:
+        """Remove the files left by interrupted jobs and return them.
+
+        Call before any job runs, so nothing a new run writes is removed.
+        Files a completed job wrote, for example by overwriting the same
+        name, are kept.
+        """
+        completed_outputs = {
+            output
+            for job in self.jobs.values()
+            if job.completed
+            for output in job.partial_outputs
+        }
+        removed = []
+        for job in list(self.jobs.values()):
+            if not job.interrupted:
+                continue
+            for output in job.partial_outputs:
+                if output in completed_outputs:
+                    continue
+                path = Path(output)
+                try:
+                    if path.is_file():
+                        path.unlink()
+                        removed.append(path)
+                except OSError:
+                    pass
+            self.record(job.key, JOB_CLEANED)
+        return removed
+
+    def record(self, key: str, state: str, **fields):
+        """Append a state record, flushing when the batch is full or stale.
+
+        A "writing" record is written through before returning.
+        """
+        record = {"key": key, "state": state, "ts": round(time.time(), 6)}
+        record.update(fields)
+        line = json.dumps(record, separators=(",", ":"), default=str)
+
+        with self._lock:
+            self._apply(record)
+            self._buffer.append(line)
+            now = time.monotonic()
+            if state == JOB_WRITING:
+                self._write_locked(now)
+            elif (
+                len(self._buffer) >= self.batch_size
+                or now - self._last_flush >= self.flush_interval
+            ):
+                self._write_locked(now)
+                os.fsync(self._stream.fileno())
+
+    def flush(self):
+        """Write out and sync buffered records."""
+        with self._lock:
+            self._write_locked(time.monotonic())
+            os.fsync(self._stream.fileno())
+
+    def close(self):
+        """Flush and close the journal file."""
+        self.flush()
+        self._stream.close()
+
+    def _replay(self):
+        """Rebuild the latest state of every job from the journal file."""
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line of a crashed run may be cut short
+                    continue
+                if isinstance(record, dict) and "key" in record:
+                    self._apply(record)
+
+    def _apply(self, record: dict):
+        """Update a job's state from one record."""
+        key, state = record["key"], record.get("state")
+        job = self.jobs.get(key)
+        if job is None:
+            job = self.jobs[key] = JournalJob(key=key, state=state)
+        if state == JOB_STARTED:
+            job.partial_outputs = []
+            job.input_path = record.get("input", job.input_path)
+        elif state == JOB_WRITING:
+            job.partial_outputs.append(record["path"])
+        elif state == JOB_CLEANED:
+            job.partial_outputs = []
+        job.state = state
+
+    def _write_locked(self, now: float):
+        """Write the buffer; caller must hold the lock."""
+        if self._buffer:
+            self._stream.write("\n".join(self._buffer) + "\n")
+            self._buffer = []
+        self._stream.flush()
+        self._last_flush = now
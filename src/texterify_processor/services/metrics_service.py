@@ -0,0 +1,214 @@
+"""In-process metrics with Prometheus text exposition."""
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..models.result import ProcessingResult
+
+# Upper bounds in seconds for phase latency buckets
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Metric name -> (type, help text), in exposition order
+METRICS = {
+    "texterify_jobs_total": ("counter", "Processing jobs by outcome."),
+    "texterify_bytes_in_total": ("counter", "Bytes of input archives processed."),
+    "texterify_bytes_out_total": ("counter", "Bytes of output archives written."),
+    "texterify_files_renamed_total": ("counter", "Language files renamed."),
+    "texterify_unchanged_outputs_total": (
+        "counter",
+        "Outputs left untouched because their content had not changed.",
+    ),
+    "texterify_phase_duration_seconds": (
+        "histogram",
+        "Time spent in each processing phase.",
+    ),
+    "texterify_queue_depth": ("gauge", "Jobs waiting to be processed."),
+    "texterify_worker_utilization": (
+        "gauge",
+        "Share of the last batch's wall time each worker spent processing.",
+    ),
+    "texterify_last_success_timestamp_seconds": (
+        "gauge",
+        "Unix time of the last successful job.",
+    ),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms for one process.
+
+    Updates are dictionary operations under a lock, so metrics can stay on
+    in production. When a textfile path is set, export() atomically rewrites
+    it for the node exporter's textfile collector.
+    """
+
+    # Minimum seconds between textfile rewrites unless forced
+    EXPORT_INTERVAL = 5.0
+
+    def __init__(self, textfile: Optional[Path] = None):
+        self.textfile = Path(textfile) if textfile is not None else None
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, Labels], float] = defaultdict(float)
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self._last_export = 0.0
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        """Increase a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] += value
+
+    def set_gauge(self, name: str, value: float, **labels: str):
+        """Set a gauge to a value."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Record a histogram observation."""
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect.bisect_left(LATENCY_BUCKETS, value)
+        with self._lock:
+            # Per-bucket counts, then +Inf, sum and count
+            state = self._histograms.get(key)
+            if state is None:
+                state = self._histograms[key] = [0.0] * (len(LATENCY_BUCKETS) + 3)
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def record_result(self, result: ProcessingResult):
+        """Derive job, byte, file and latency metrics from a processing result."""
+        if result.dry_run:
+            return
+
+        status = "succeeded" if result.success else "failed"
+        self.inc("texterify_jobs_total", status=status)
+        self.inc("texterify_bytes_in_total", result.bytes_in)
+        self.inc("texterify_bytes_out_total", result.bytes_out)
+        self.inc("texterify_files_renamed_total", result.processed_files_count)
+        if result.unchanged:
+            self.inc("texterify_unchanged_outputs_total")
+        for phase, duration in result.phase_timings.items():
+            self.observe("texterify_phase_duration_seconds", duration, phase=phase)
+        if result.success:
+            self.set_gauge("texterify_last_success_timestamp_seconds", time.time())
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            values = sorted(self._values.items())
+            histograms = sorted(
+                (key, list(state)) for key, state in self._histograms.items()
+            )
+
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (sample_name, labels), value in values:
+                if sample_name == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format(value)}")
+            for (sample_name, labels), state in histograms:
+                if sample_name == name:
+                    lines.extend(_render_histogram(name, labels, state))
+        return "\n".join(lines) + "\n"
+
+    def export(self, force: bool = False):
+        """Atomically rewrite the textfile, at most once per EXPORT_INTERVAL."""
+        if self.textfile is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_export < self.EXPORT_INTERVAL:
+            return
+        self._last_export = now
+
+        # Write next to the target so the rename stays on one filesystem
+        fd, temp_name = tempfile.mkstemp(
+            prefix=f".{self.textfile.name}.", dir=str(self.textfile.parent)
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            # mkstemp creates private files; collectors often run as another user
+            os.chmod(temp_name, 0o644)
+            os.replace(temp_name, str(self.textfile))
+        except BaseException:
+            try:
+                os.unlink(temp_name)
+            except OSError:
+                pass
+            raise
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve /metrics over HTTP from a daemon thread; returns the server."""
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        server.daemon_threads = True
+        server.registry = self
+        thread = threading.Thread(
+            target=server.serve_forever, name="metrics-http", daemon=True
+        )
+        thread.start()
+        return server
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Answer scrapes with the registry's current metrics."""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep scrapes out of the console output."""
+
+
+def _render_histogram(name: str, labels: Labels, state: List[float]) -> List[str]:
+    """Render cumulative buckets, sum and count of one histogram series."""
+    lines = []
+    cumulative = 0.0
+    for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), state):
+        cumulative += count
+        bucket_labels = _format_labels(labels + (("le", _format(bound)),))
+        lines.append(f"{name}_bucket{bucket_labels} {_format(cumulative)}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {_format(state[-2])}")
+    lines.append(f"{name}_count{_format_labels(labels)} {_format(state[-1])}")
+    return lines
+
+
+def _format_labels(labels: Labels) -> str:
+    """Format a label set, escaping values as the exposition format requires."""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        value = value.replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format(value) -> str:
+    """Format a sample value, dropping the fraction of whole numbers."""
+    if isinstance(value, str):
+        return value
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -1,24 +1,57 @@
 """Service for managing output files and naming."""
 
+import fnmatch
+import threading
 from datetime import datetime
 
+import os
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Set, Tuple
 
 from ..models.config import ProcessingConfig
+from .output_sinks import OutputSink, SinkWriter
 
+COMPARE_CHUNK_SIZE = 1024 * 1024
 
-class OutputService:
-    """Service for output file management and naming."""
 
-    def __init__(self, config: ProcessingConfig, output_dir: Path):
+class OutputService:
+    """Service for output file management and naming.
+
+    Jobs running side by side claim their output paths: a claimed path
+    counts as existing when names are chosen, and claiming a path another
+    job holds waits until that job releases it. Choose and claim a name
+    while holding naming_lock so no other job can take it in between.
+    """
+
+    naming_lock = threading.Condition()
+    _claimed: Set[Path] = set()
+
+    def __init__(
+        self,
+        config: ProcessingConfig,
+        output_dir: Path,
+        sink: Optional[OutputSink] = None,
+    ):
         self.config = config
         self.output_dir = output_dir
+        self.sink = sink
+
+    def open_upload(self, filename: str) -> Optional[SinkWriter]:
+        """Start delivering an output file to the sink, if there is one."""
+        if self.sink is None:
+            return None
+        return self.sink.open(filename)
 
-    def generate_output_filename(self, use_counter: bool = False) -> str:
-        """Generate output filename with optional counter."""
-        base_filename = self._generate_base_filename()
-        extension = self.config.output_format.extension
+    def generate_output_filename(
+        self, use_counter: bool = False, suffix: Optional[str] = None
+    ) -> str:
+        """Generate output filename with optional counter.
+
+        A suffix, such as a language shard's name, is added after the date,
+        and shards with different suffixes count up separately.
+        """
+        base_filename = self._generate_base_filename(suffix)
+        extension = self.config.output_format.output_extension
 
         if use_counter:
             counter = self._get_next_counter(base_filename)
@@ -26,43 +59,90 @@ class OutputService:
 
         return f"{base_filename}{extension}"
 
-    def _generate_base_filename(self) -> str:
+    def _generate_base_filename(self, suffix: Optional[str] = None) -> str:
         """Generate base filename with current date."""
         now = datetime.now()
         date_part = now.strftime(self.config.output_format.date_format)
-        return f"{self.config.output_format.base_filename}_{date_part}"
+        base_filename = f"{self.config.output_format.base_filename}_{date_part}"
+        return f"{base_filename}_{suffix}" if suffix else base_filename
 
     def _get_next_counter(self, base_filename: str) -> int:
         """Auto-detect the next counter value for the current day."""
-        pattern = f"{base_filename}_*.zip"
+        extension = self.config.output_format.output_extension
+        pattern = f"{base_filename}_*{extension}"
         existing_files = list(self.output_dir.glob(pattern))
+        with self.naming_lock:
+            existing_files.extend(
+                path
+                for path in self._claimed
+                if path.parent == self.output_dir
+                and fnmatch.fnmatchcase(path.name, pattern)
+            )
 
         if not existing_files:
             return 1
 
         counters = []
         for file in existing_files:
-            try:
-                # Extract counter from filename like "lang_files_16_09_3.zip"
-                parts = file.stem.split("_")
-                if len(parts) >= 4:
-                    counter = int(parts[-1])
-                    counters.append(counter)
-            except (ValueError, IndexError):
-                continue
+            # Extract counter from a name like "lang_files_16_09_3.zip"
+            counter = file.name[len(base_filename) + 1 :]
+            if extension:
+                counter = counter[: -len(extension)]
+            if counter.isdigit():
+                counters.append(int(counter))
 
         return max(counters) + 1 if counters else 1
 
-    def check_output_conflict(self) -> Tuple[bool, str]:
+    def check_output_conflict(self, suffix: Optional[str] = None) -> Tuple[bool, str]:
         """Check if output file would conflict with existing files."""
-        base_filename = self._generate_base_filename()
-        standard_filename = f"{base_filename}{self.config.output_format.extension}"
+        base_filename = self._generate_base_filename(suffix)
+        extension = self.config.output_format.output_extension
+        standard_filename = f"{base_filename}{extension}"
         standard_path = self.output_dir / standard_filename
 
-        if standard_path.exists():
+        if standard_path.exists() or self.is_claimed(standard_path):
             return True, standard_filename
         return False, standard_filename
 
     def get_output_path(self, filename: str) -> Path:
         """Get full output path for a filename."""
         return self.output_dir / filename
+
+    @classmethod
+    def is_claimed(cls, path: Path) -> bool:
+        """Check if a running job has claimed an output path."""
+        with cls.naming_lock:
+            return path in cls._claimed
+
+    @classmethod
+    def claim(cls, path: Path):
+        """Claim an output path, waiting while another job holds it."""
+        with cls.naming_lock:
+            while path in cls._claimed:
+                cls.naming_lock.wait()
+            cls._claimed.add(path)
+
+    @classmethod
+    def release(cls, path: Path):
+        """Release a claimed output path."""
+        with cls.naming_lock:
+            cls._claimed.discard(path)
+            cls.naming_lock.notify_all()
+
+    @staticmethod
+    def get_staging_path(output_path: Path) -> Path:
+        """Get a hidden path next to output_path to write a replacement to."""
+        return output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+
+    @staticmethod
+    def files_identical(first: Path, second: Path) -> bool:
+        """Compare two files by size, then chunk by chunk."""
+        if first.stat().st_size != second.stat().st_size:
+            return False
+        with open(first, "rb") as a, open(second, "rb") as b:
+            while True:
+                chunk = a.read(COMPARE_CHUNK_SIZE)
+                if chunk != b.read(COMPARE_CHUNK_SIZE):
+                    return False
+                if not chunk:
+                    return True
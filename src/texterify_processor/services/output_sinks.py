@@ -0,0 +1,517 @@
+"""Output sinks that receive archives while they are being written."""
+
+import hashlib
+import hmac
+import http.client
+import threading
+import time
+import urllib.parse
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from xml.sax.saxutils import escape
+
+import os
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Mapping, Optional, Tuple
+
+# Size of each part of a multipart upload
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+# Parts uploaded at once, across all uploads of a sink
+DEFAULT_UPLOAD_CONCURRENCY = 4
+
+# Part data buffered across all uploads of a sink, including the part that
+# is being filled
+DEFAULT_UPLOAD_MEMORY = 64 * 1024 * 1024
+
+# Attempts after the first for requests that fail on the network or with 5xx
+DEFAULT_UPLOAD_RETRIES = 3
+
+# Seconds before the first retry; doubles with every further attempt
+RETRY_BACKOFF = 0.5
+
+UPLOAD_TIMEOUT = 60.0
+
+# Statuses worth retrying: throttling and server-side failures
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+S3_SCHEME = "s3://"
+
+
+class UploadError(Exception):
+    """Raised when an object store rejects an upload or keeps failing it."""
+
+
+class SinkWriter:
+    """A stream that delivers one archive to a sink.
+
+    Archive bytes are written in order; commit() publishes them and returns
+    where they went, abort() discards them. Writers cannot seek, so archive
+    writers fall back to their streaming layouts.
+    """
+
+    def write(self, data) -> int:
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def seekable(self) -> bool:
+        return False
+
+    def commit(self) -> str:
+        """Publish the archive and return its location."""
+        raise NotImplementedError
+
+    def abort(self):
+        """Discard everything written so far."""
+        raise NotImplementedError
+
+
+class OutputSink:
+    """A destination that archives are delivered to by name."""
+
+    def open(self, name: str) -> SinkWriter:
+        """Start delivering an archive called name."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release what the sink's writers share; waits for pending uploads."""
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class LocalSink(OutputSink):
+    """Copy archives into a local directory, such as a mounted share."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def open(self, name: str) -> SinkWriter:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return LocalSinkWriter(self.directory / name)
+
+
+class LocalSinkWriter(SinkWriter):
+    """Write to a hidden file next to the target, moved in place on commit."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.partial = path.with_name(
+            f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        self._file = open(self.partial, "wb")
+
+    def write(self, data) -> int:
+        return self._file.write(data)
+
+    def commit(self) -> str:
+        self._file.close()
+        os.replace(str(self.partial), str(self.path))
+        return str(self.path)
+
+    def abort(self):
+        self._file.close()
+        try:
+            self.partial.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class S3Credentials:
+    """Keys and region used to sign object store requests."""
+
+    access_key: str
+    secret_key: str
+    session_token: Optional[str] = None
+    region: str = "us-east-1"
+
+    @classmethod
+    def from_environ(
+        cls, environ: Optional[Mapping[str, str]] = None
+    ) -> "S3Credentials":
+        """Read the standard AWS_* variables."""
+        environ = os.environ if environ is None else environ
+        access_key = environ.get("AWS_ACCESS_KEY_ID")
+        secret_key = environ.get("AWS_SECRET_ACCESS_KEY")
+        if not access_key or not secret_key:
+            raise ValueError(
+                "Set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY to upload to S3"
+            )
+        return cls(
+            access_key=access_key,
+            secret_key=secret_key,
+            session_token=environ.get("AWS_SESSION_TOKEN"),
+            region=(
+                environ.get("AWS_REGION")
+                or environ.get("AWS_DEFAULT_REGION")
+                or "us-east-1"
+            ),
+        )
+
+
+class S3Sink(OutputSink):
+    """Upload archives to an S3-compatible object store while they are written.
+
+    Archives are cut into part_size parts, which a thread pool uploads while
+    the rest of the archive is still being produced; an archive smaller than
+    a part is sent with a single PUT instead. Parts waiting to be uploaded
+    are limited to max_memory bytes across all uploads, so writers block
+    when the store falls behind. Requests that fail on the network or with
+    a 5xx status are retried with backoff. Buckets are addressed by path,
+    which works with AWS and with stand-ins such as MinIO.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint: Optional[str] = None,
+        credentials: Optional[S3Credentials] = None,
+        part_size: int = DEFAULT_PART_SIZE,
+        concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+        max_memory: int = DEFAULT_UPLOAD_MEMORY,
+        retries: int = DEFAULT_UPLOAD_RETRIES,
+        timeout: float = UPLOAD_TIMEOUT,
+    ):
+        if part_size < 1 or concurrency < 1:
+            raise ValueError("Upload part size and concurrency must be positive")
+        self.credentials = credentials or S3Credentials.from_environ()
+        endpoint = (
+            endpoint
+            or os.environ.get("AWS_ENDPOINT_URL")
+            or f"https://s3.{self.credentials.region}.amazonaws.com"
+        )
+        parsed = urllib.parse.urlsplit(endpoint)
+        if parsed.scheme not in ("http", "https") or not parsed.netloc:
+            raise ValueError(f"Invalid S3 endpoint: {endpoint}")
+        self.scheme = parsed.scheme
+        self.host = parsed.netloc
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.part_size = part_size
+        self.retries = retries
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="texterify-upload"
+        )
+        # One part is always being filled; the rest of the budget queues
+        self.slots = threading.BoundedSemaphore(max(1, max_memory // part_size - 1))
+        self._local = threading.local()
+
+    def open(self, name: str) -> SinkWriter:
+        key = f"{self.prefix}/{name}" if self.prefix else name
+        return S3Upload(self, key)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def url(self, key: str) -> str:
+        """Get the s3:// URL of an object."""
+        return f"{S3_SCHEME}{self.bucket}/{key}"
+
+    def put_object(self, key: str, data: bytes):
+        """Upload a whole object with one request."""
+        self.request("PUT", key, body=data)
+
+    def create_multipart_upload(self, key: str) -> str:
+        """Start a multipart upload and return its ID."""
+        _, _, body = self.request("POST", key, {"uploads": ""})
+        upload_id = _xml_text(body, "UploadId")
+        if not upload_id:
+            raise UploadError(f"No upload ID returned for {key}")
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, number: int, data: bytes) -> str:
+        """Upload one part and return its ETag."""
+        query = {"partNumber": str(number), "uploadId": upload_id}
+        _, headers, _ = self.request("PUT", key, query, data)
+        return headers.get("etag", "")
+
+    def complete_multipart_upload(self, key: str, upload_id: str, etags: List[str]):
+        """Join the uploaded parts, in order, into the object."""
+        parts = "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{escape(etag)}</ETag></Part>"
+            for number, etag in enumerate(etags, 1)
+        )
+        body = f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>"
+        _, _, data = self.request("POST", key, {"uploadId": upload_id}, body.encode())
+        # A completion can fail after the 200 status has been sent
+        if _xml_text(data, "Code") is not None:
+            raise UploadError(f"Completing {key} failed: {_xml_text(data, 'Code')}")
+
+    def abort_multipart_upload(self, key: str, upload_id: str):
+        """Discard a multipart upload and the parts stored for it."""
+        self.request("DELETE", key, {"uploadId": upload_id})
+
+    def request(
+        self,
+        method: str,
+        key: str,
+        query: Optional[Dict[str, str]] = None,
+        body: bytes = b"",
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Send a signed request and return its status, headers and body."""
+        query = query or {}
+        path = urllib.parse.quote(f"/{self.bucket}/{key}", safe="/~")
+        target = path
+        if query:
+            target += "?" + canonical_query(query)
+        payload_hash = hashlib.sha256(body).hexdigest()
+
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            headers = sign_request(
+                self.credentials, method, self.host, path, query, payload_hash
+            )
+            headers["content-length"] = str(len(body))
+            try:
+                connection = self._connection()
+                connection.request(method, target, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                self._drop_connection()
+                error = UploadError(f"{method} {key} failed: {e}")
+                continue
+
+            if response.status in RETRY_STATUSES:
+                error = UploadError(f"{method} {key} failed: HTTP {response.status}")
+                continue
+            if response.status >= 300:
+                code = _xml_text(data, "Code") or response.reason
+                raise UploadError(
+                    f"{method} {key} was rejected: HTTP {response.status} {code}"
+                )
+            response_headers = {
+                name.lower(): value for name, value in response.getheaders()
+            }
+            return response.status, response_headers, data
+        raise error
+
+    def _connection(self) -> http.client.HTTPConnection:
+        """Get this thread's connection to the endpoint, kept alive between calls."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection_class = (
+                http.client.HTTPSConnection
+                if self.scheme == "https"
+                else http.client.HTTPConnection
+            )
+            connection = connection_class(self.host, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _drop_connection(self):
+        """Close this thread's connection after a failure."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class S3Upload(SinkWriter):
+    """One archive being uploaded to an S3Sink, part by part."""
+
+    def __init__(self, sink: S3Sink, key: str):
+        self.sink = sink
+        self.key = key
+        self.size = 0
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Future] = []
+
+    def write(self, data) -> int:
+        self._raise_failed_part()
+        self._buffer += data
+        count = len(data)
+        self.size += count
+        part_size = self.sink.part_size
+        while len(self._buffer) >= part_size:
+            part = bytes(self._buffer[:part_size])
+            del self._buffer[:part_size]
+            self._submit(part)
+        return count
+
+    def commit(self) -> str:
+        if self._upload_id is None:
+            self.sink.put_object(self.key, bytes(self._buffer))
+        else:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+            etags = [future.result() for future in self._parts]
+            self.sink.complete_multipart_upload(self.key, self._upload_id, etags)
+        self._buffer = bytearray()
+        return self.sink.url(self.key)
+
+    def abort(self):
+        """Stop the upload; parts already stored are discarded if possible.
+
+        A multipart upload that cannot be aborted is left for the bucket's
+        lifecycle rules to expire.
+        """
+        for future in self._parts:
+            future.cancel()
+        wait(self._parts)
+        self._buffer = bytearray()
+        if self._upload_id is not None:
+            try:
+                self.sink.abort_multipart_upload(self.key, self._upload_id)
+            except UploadError:
+                pass
+
+    def _submit(self, part: bytes):
+        """Queue a part for upload, waiting while the memory budget is used up."""
+        if self._upload_id is None:
+            self._upload_id = self.sink.create_multipart_upload(self.key)
+        self.sink.slots.acquire()
+        try:
+            future = self.sink.executor.submit(
+                self.sink.upload_part,
+                self.key,
+                self._upload_id,
+                len(self._parts) + 1,
+                part,
+            )
+        except BaseException:
+            self.sink.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.sink.slots.release())
+        self._parts.append(future)
+
+    def _raise_failed_part(self):
+        """Fail the write as soon as any part has failed for good."""
+        for future in self._parts:
+            if future.done() and not future.cancelled():
+                error = future.exception()
+                if error is not None:
+                    raise error
+
+
+class TeeStream:
+    """Write a stream's bytes to a second stream as well.
+
+    Seeking is not offered, since the copy cannot be rewritten, so archive
+    writers use their streaming layouts for both.
+    """
+
+    def __init__(self, primary: BinaryIO, secondary: BinaryIO):
+        self.primary = primary
+        self.secondary = secondary
+
+    def write(self, data) -> int:
+        written = self.primary.write(data)
+        self.secondary.write(data)
+        return len(data) if written is None else written
+
+    def flush(self):
+        self.primary.flush()
+        self.secondary.flush()
+
+    def seekable(self) -> bool:
+        return False
+
+
+def open_output_sink(
+    target: str,
+    endpoint: Optional[str] = None,
+    part_size: int = DEFAULT_PART_SIZE,
+    concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+    max_memory: int = DEFAULT_UPLOAD_MEMORY,
+) -> OutputSink:
+    """Open the sink for an s3://BUCKET/PREFIX URL or a local directory."""
+    if target.startswith(S3_SCHEME):
+        bucket, _, prefix = target[len(S3_SCHEME) :].partition("/")
+        if not bucket:
+            raise ValueError(f"No bucket in {target}")
+        return S3Sink(
+            bucket,
+            prefix,
+            endpoint=endpoint,
+            part_size=part_size,
+            concurrency=concurrency,
+            max_memory=max_memory,
+        )
+    return LocalSink(Path(target).resolve())
+
+
+def canonical_query(query: Mapping[str, str]) -> str:
+    """Encode query parameters sorted, as Signature Version 4 requires."""
+    return "&".join(
+        f"{urllib.parse.quote(name, safe='~')}={urllib.parse.quote(value, safe='~')}"
+        for name, value in sorted(query.items())
+    )
+
+
+def sign_request(
+    credentials: S3Credentials,
+    method: str,
+    host: str,
+    path: str,
+    query: Mapping[str, str],
+    payload_hash: str,
+    now: Optional[time.struct_time] = None,
+) -> Dict[str, str]:
+    """Get the headers that sign an S3 request with AWS Signature Version 4.
+
+    path must already be URI-encoded; payload_hash is the hex SHA-256 of
+    the body.
+    """
+    amz_date = time.strftime("%Y%m%dT%H%M%SZ", now or time.gmtime())
+    date = amz_date[:8]
+    headers = {
+        "host": host,
+        "x-amz-content-sha256": payload_hash,
+        "x-amz-date": amz_date,
+    }
+    if credentials.session_token:
+        headers["x-amz-security-token"] = credentials.session_token
+    signed_headers = ";".join(sorted(headers))
+    canonical_request = "\n".join(
+        [
+            method,
+            path,
+            canonical_query(query),
+            "".join(f"{name}:{headers[name]}\n" for name in sorted(headers)),
+            signed_headers,
+            payload_hash,
+        ]
+    )
+    scope = f"{date}/{credentials.region}/s3/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+    key = ("AWS4" + credentials.secret_key).encode()
+    for part in (date, credentials.region, "s3", "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+    headers["authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={credentials.access_key}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+    return headers
+
+
+def _xml_text(data: bytes, name: str) -> Optional[str]:
+    """Get the text of the first element called name, ignoring namespaces."""
+    try:
+        root = ElementTree.fromstring(data)
+    except ElementTree.ParseError:
+        return None
+    for element in root.iter():
+        if element.tag == name or element.tag.endswith("}" + name):
+            return element.text
+    return None
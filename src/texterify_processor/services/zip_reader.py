@@ -0,0 +1,364 @@
+"""Zip reading straight from a memory map of the archive."""
+
+import io
+import mmap
+import struct
+import zipfile
+import zlib
+
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+
+# Compressed bytes handed out per slice of a member's raw data
+MAPPED_CHUNK_SIZE = 1024 * 1024
+
+# Bytes produced per step when a member is decompressed from the map
+READ_CHUNK_SIZE = 64 * 1024
+
+# Sizes and offsets saturated to this are stored in the zip64 extra field
+ZIP64_MARKER = 0xFFFFFFFF
+
+# Extra field holding a member's zip64 sizes and offset
+ZIP64_EXTRA_ID = 0x0001
+
+# General purpose flags: encrypted member, and UTF-8 names
+ZIP_FLAG_ENCRYPTED = 0x01
+ZIP_FLAG_UTF8 = 0x800
+
+# Methods decompressed from the map; others are read through zipfile
+MAPPED_METHODS = (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+
+# An open zip, read through the map or through zipfile
+ZipReader = Union[zipfile.ZipFile, "MappedZipFile"]
+
+
+class MappedZipFile:
+    """Read a zip through a memory map of the whole file.
+
+    The end records and central directory are parsed from the map into the
+    same ZipInfo objects zipfile builds, so callers can use either reader.
+    Compressed member data is handed out as memoryview slices of the map,
+    which writers and upload streams consume without it ever being read
+    into Python buffers. Where madvise exists, pages are dropped from the
+    process once their slice has been consumed, so resident memory stays
+    flat however large the archive is.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._zip: Optional[zipfile.ZipFile] = None
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        self.filelist: List[zipfile.ZipInfo] = []
+        self.NameToInfo: Dict[str, zipfile.ZipInfo] = {}
+        try:
+            self._read_central_directory()
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "MappedZipFile":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def infolist(self) -> List[zipfile.ZipInfo]:
+        """Get the members in central directory order."""
+        return self.filelist
+
+    def namelist(self) -> List[str]:
+        """Get the member names in central directory order."""
+        return [zinfo.filename for zinfo in self.filelist]
+
+    def getinfo(self, name: str) -> zipfile.ZipInfo:
+        """Get a member by name; raises KeyError if there is none."""
+        try:
+            return self.NameToInfo[name]
+        except KeyError:
+            raise KeyError(f"There is no item named {name!r} in the archive")
+
+    def raw_data(self, member: zipfile.ZipInfo) -> memoryview:
+        """Get a member's compressed bytes as one slice of the map."""
+        start, end = self._data_range(member)
+        with memoryview(self._map) as view:
+            return view[start:end]
+
+    def iter_raw(
+        self, member: zipfile.ZipInfo, chunk_size: int = MAPPED_CHUNK_SIZE
+    ) -> Iterator[memoryview]:
+        """Yield a member's compressed bytes as slices of the map.
+
+        Each slice's pages are released once the next one is asked for.
+        """
+        start, end = self._data_range(member)
+        with memoryview(self._map) as view:
+            for offset in range(start, end, chunk_size):
+                chunk_end = min(offset + chunk_size, end)
+                yield view[offset:chunk_end]
+                self.release_pages(offset, chunk_end)
+
+    def open(self, member: Union[str, zipfile.ZipInfo]) -> BinaryIO:
+        """Open a member for reading its decompressed data, checking the CRC."""
+        if isinstance(member, str):
+            member = self.getinfo(member)
+        if member.compress_type in MAPPED_METHODS and not (
+            member.flag_bits & ZIP_FLAG_ENCRYPTED
+        ):
+            return MappedMemberReader(self, member)
+        if self._zip is None:
+            self._zip = zipfile.ZipFile(self._file)
+        return self._zip.open(member)
+
+    def read(self, name: str) -> bytes:
+        """Read a member's decompressed data."""
+        with self.open(name) as member:
+            return member.read()
+
+    def testzip(self) -> Optional[str]:
+        """Read every member to verify CRCs; return the first bad member name."""
+        for zinfo in self.filelist:
+            try:
+                with self.open(zinfo) as member:
+                    while member.read(READ_CHUNK_SIZE):
+                        pass
+            except zipfile.BadZipFile:
+                return zinfo.filename
+        return None
+
+    def release_pages(self, start: int, end: int):
+        """Drop the map's pages between two offsets from resident memory."""
+        if not hasattr(self._map, "madvise") or not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        aligned = start - start % mmap.PAGESIZE
+        try:
+            self._map.madvise(mmap.MADV_DONTNEED, aligned, end - aligned)
+        except (OSError, ValueError):
+            pass
+
+    def close(self):
+        """Close the archive; slices still in use keep the map alive."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def _read_central_directory(self):
+        """Parse the end records and every central directory entry."""
+        data = self._map
+        eocd = data.rfind(
+            zipfile.stringEndArchive,
+            max(0, len(data) - zipfile.sizeEndCentDir - 0xFFFF),
+        )
+        if eocd < 0 or eocd + zipfile.sizeEndCentDir > len(data):
+            raise zipfile.BadZipFile("File is not a zip file")
+        fields = struct.unpack(
+            zipfile.structEndArchive, data[eocd : eocd + zipfile.sizeEndCentDir]
+        )
+        if fields[1] != 0 or fields[2] != 0:
+            raise zipfile.BadZipFile(
+                "zipfiles that span multiple disks are not supported"
+            )
+        directory_size, directory_offset = fields[5], fields[6]
+
+        directory_end = eocd
+        locator = eocd - zipfile.sizeEndCentDir64Locator
+        if locator >= 0 and data[locator : locator + 4] == (
+            zipfile.stringEndArchive64Locator
+        ):
+            record = locator - zipfile.sizeEndCentDir64
+            if record < 0 or data[record : record + 4] != zipfile.stringEndArchive64:
+                raise zipfile.BadZipFile("Corrupt zip64 end of central directory")
+            fields = struct.unpack(zipfile.structEndArchive64, data[record:locator])
+            directory_size, directory_offset = fields[8], fields[9]
+            directory_end = record
+
+        # Data prepended to the archive shifts every offset it records
+        concat = directory_end - directory_size - directory_offset
+        if concat < 0:
+            raise zipfile.BadZipFile("Bad offset for central directory")
+        position = directory_offset + concat
+        while position < directory_end:
+            zinfo, position = self._read_directory_entry(position, concat)
+            self.filelist.append(zinfo)
+            self.NameToInfo[zinfo.filename] = zinfo
+
+    def _read_directory_entry(self, position: int, concat: int):
+        """Parse the central directory entry at position; returns the next one."""
+        data = self._map
+        header = data[position : position + zipfile.sizeCentralDir]
+        if len(header) != zipfile.sizeCentralDir:
+            raise zipfile.BadZipFile("Truncated central directory")
+        fields = struct.unpack(zipfile.structCentralDir, header)
+        if fields[0] != zipfile.stringCentralDir:
+            raise zipfile.BadZipFile("Bad magic number for central directory")
+
+        name_start = position + zipfile.sizeCentralDir
+        extra_start = name_start + fields[12]
+        comment_start = extra_start + fields[13]
+        next_position = comment_start + fields[14]
+        flags = fields[5]
+        name = data[name_start:extra_start].decode(
+            "utf-8" if flags & ZIP_FLAG_UTF8 else "cp437"
+        )
+
+        zinfo = zipfile.ZipInfo(name)
+        zinfo.extra = data[extra_start:comment_start]
+        zinfo.comment = data[comment_start:next_position]
+        (
+            zinfo.create_version,
+            zinfo.create_system,
+            zinfo.extract_version,
+            zinfo.reserved,
+            zinfo.flag_bits,
+            zinfo.compress_type,
+            raw_time,
+            raw_date,
+            zinfo.CRC,
+            zinfo.compress_size,
+            zinfo.file_size,
+        ) = fields[1:12]
+        zinfo.volume, zinfo.internal_attr, zinfo.external_attr = fields[15:18]
+        zinfo.header_offset = fields[18]
+        # zipfile keeps the DOS time for checking encrypted members
+        zinfo._raw_time = raw_time
+        zinfo.date_time = (
+            (raw_date >> 9) + 1980,
+            (raw_date >> 5) & 0xF,
+            raw_date & 0x1F,
+            raw_time >> 11,
+            (raw_time >> 5) & 0x3F,
+            (raw_time & 0x1F) * 2,
+        )
+        apply_zip64_extra(zinfo)
+        zinfo.header_offset += concat
+        return zinfo, next_position
+
+    def _data_range(self, member: zipfile.ZipInfo):
+        """Get the start and end offsets of a member's compressed bytes."""
+        start = member.header_offset
+        header = self._map[start : start + zipfile.sizeFileHeader]
+        if len(header) != zipfile.sizeFileHeader:
+            raise zipfile.BadZipFile(f"Truncated file header: {member.filename}")
+        fields = struct.unpack(zipfile.structFileHeader, header)
+        if fields[0] != zipfile.stringFileHeader:
+            raise zipfile.BadZipFile(f"Bad file header magic: {member.filename}")
+        # The name and extra field lengths are the last two header fields
+        data_start = start + zipfile.sizeFileHeader + fields[-2] + fields[-1]
+        data_end = data_start + member.compress_size
+        if data_end > len(self._map):
+            raise zipfile.BadZipFile(f"Truncated member data: {member.filename}")
+        return data_start, data_end
+
+
+class MappedMemberReader(io.RawIOBase):
+    """Decompress a stored or deflated member from the map, checking its CRC.
+
+    read() returns exactly the bytes asked for until the member ends, as
+    tarfile expects of the streams it copies.
+    """
+
+    def __init__(self, archive: MappedZipFile, member: zipfile.ZipInfo):
+        super().__init__()
+        self.member = member
+        self._archive = archive
+        self._offset, self._end = archive._data_range(member)
+        self._view = memoryview(archive._map)
+        self._decompressor = None
+        if member.compress_type == zipfile.ZIP_DEFLATED:
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._pending = bytearray()
+        self._crc = 0
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if size is None or size < 0:
+            while not self._eof:
+                self._fill()
+            size = len(self._pending)
+        else:
+            while len(self._pending) < size and not self._eof:
+                self._fill()
+        data = bytes(self._pending[:size])
+        del self._pending[:size]
+        return data
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+    def _fill(self):
+        """Decompress the next piece of the member into the pending buffer."""
+        start = self._offset
+        if self._decompressor is None:
+            self._offset = min(start + READ_CHUNK_SIZE, self._end)
+            data = self._view[start : self._offset].tobytes()
+            finished = self._offset >= self._end
+        else:
+            compressed = self._decompressor.unconsumed_tail
+            if not compressed and start < self._end:
+                self._offset = min(start + READ_CHUNK_SIZE, self._end)
+                compressed = self._view[start : self._offset]
+            data = self._decompressor.decompress(compressed, READ_CHUNK_SIZE)
+            finished = self._decompressor.eof
+            if not (finished or data or self._decompressor.unconsumed_tail):
+                raise zipfile.BadZipFile(
+                    f"Truncated member data: {self.member.filename}"
+                )
+        if self._offset > start:
+            self._archive.release_pages(start, self._offset)
+
+        self._crc = zlib.crc32(data, self._crc)
+        self._pending += data
+        if finished:
+            self._eof = True
+            if self._crc != self.member.CRC:
+                raise zipfile.BadZipFile(
+                    f"Bad CRC-32 for file {self.member.filename!r}"
+                )
+
+
+def apply_zip64_extra(zinfo: zipfile.ZipInfo):
+    """Replace saturated sizes and offset with those in the zip64 extra field."""
+    extra = zinfo.extra
+    position = 0
+    while position + 4 <= len(extra):
+        tag, size = struct.unpack("<HH", extra[position : position + 4])
+        body = extra[position + 4 : position + 4 + size]
+        position += 4 + size
+        if tag != ZIP64_EXTRA_ID:
+            continue
+        values = list(struct.unpack(f"<{len(body) // 8}Q", body[: len(body) // 8 * 8]))
+        for attribute in ("file_size", "compress_size", "header_offset"):
+            if getattr(zinfo, attribute) == ZIP64_MARKER:
+                if not values:
+                    raise zipfile.BadZipFile(
+                        f"Corrupt zip64 extra field: {zinfo.filename}"
+                    )
+                setattr(zinfo, attribute, values.pop(0))
+        return
+
+
+def open_zip_reader(source: Union[Path, BinaryIO]) -> ZipReader:
+    """Open a zip for reading, memory-mapped when it is a file on disk.
+
+    Streams, and files the platform cannot map such as empty ones, are
+    read through zipfile.
+    """
+    if isinstance(source, Path):
+        try:
+            return MappedZipFile(source)
+        except (OSError, ValueError, OverflowError):
+            pass
+    return zipfile.ZipFile(source, "r")
@@ -0,0 +1,183 @@
+"""CPU profiling: cProfile runs, stack sampling and on-demand dumps."""
+
+import cProfile
+import signal
+import threading
+import time
+import traceback
+from collections import Counter
+
+import os
+import sys
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# Stacks of all threads are sampled this often
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Length of the profile written when a dump is requested by signal
+DEFAULT_DUMP_SECONDS = 10.0
+
+# Suffix of the collapsed-stack file written next to pstats output
+COLLAPSED_SUFFIX = ".collapsed"
+
+
+class StackSampler:
+    """Sample the stacks of all other threads and count identical stacks.
+
+    Counts are written in the collapsed format read by flamegraph.pl,
+    speedscope and similar tools: one "thread;outer;...;inner count" line
+    per distinct stack. Samples are taken on wall-clock time, so threads
+    waiting on I/O show up as well as busy ones.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start sampling in the background."""
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="texterify-stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def sample(self):
+        """Record the current stack of every thread but the calling one."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident != own:
+                thread_name = names.get(ident, f"thread-{ident}")
+                self.stacks[collapse_stack(thread_name, frame)] += 1
+
+    def write_collapsed(self, path: Path):
+        """Write the sampled stacks in collapsed format."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+
+class CpuProfiler:
+    """Profile a block with cProfile and write pstats and collapsed stacks.
+
+    cProfile only sees the thread that entered the block, so a stack
+    sampler runs alongside it to cover every thread in the flame graph.
+    """
+
+    def __init__(self, path: Path, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.path = path
+        self.collapsed_path = path.with_name(path.name + COLLAPSED_SUFFIX)
+        self._profile = cProfile.Profile()
+        self._sampler = StackSampler(interval)
+
+    def __enter__(self) -> "CpuProfiler":
+        self._sampler.start()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profile.disable()
+        self._sampler.stop()
+        self._profile.dump_stats(str(self.path))
+        self._sampler.write_collapsed(self.collapsed_path)
+
+
+class SignalDumper:
+    """Dump thread stacks and a time-boxed profile when SIGUSR1 arrives.
+
+    The handler only starts a background thread, so the job keeps running
+    while it is sampled. Signals received while a dump is running are
+    ignored.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        duration: float = DEFAULT_DUMP_SECONDS,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        on_dump: Optional[Callable[[List[Path]], None]] = None,
+    ):
+        self.directory = directory
+        self.duration = duration
+        self.interval = interval
+        self.on_dump = on_dump
+        self._running = threading.Lock()
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Check if the platform has SIGUSR1."""
+        return hasattr(signal, "SIGUSR1")
+
+    def install(self) -> bool:
+        """Handle SIGUSR1 from now on; returns False where it does not exist."""
+        if not self.is_supported():
+            return False
+        signal.signal(signal.SIGUSR1, self._handle)
+        return True
+
+    def dump(self) -> List[Path]:
+        """Write all thread stacks now, then a profile of the next seconds."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        base = f"texterify-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}"
+        stacks_path = self.directory / f"{base}.stacks.txt"
+        stacks_path.write_text(format_thread_stacks(), encoding="utf-8")
+
+        sampler = StackSampler(self.interval)
+        sampler.start()
+        time.sleep(self.duration)
+        sampler.stop()
+        collapsed_path = self.directory / f"{base}{COLLAPSED_SUFFIX}"
+        sampler.write_collapsed(collapsed_path)
+        return [stacks_path, collapsed_path]
+
+    def _handle(self, signum, frame):
+        if not self._running.acquire(blocking=False):
+            return
+        threading.Thread(
+            target=self._dump_in_background, name="texterify-dump", daemon=True
+        ).start()
+
+    def _dump_in_background(self):
+        try:
+            paths = self.dump()
+            if self.on_dump is not None:
+                self.on_dump(paths)
+        finally:
+            self._running.release()
+
+
+def collapse_stack(thread_name: str, frame) -> str:
+    """Join a frame's call stack, outermost first, in collapsed format."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        names.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names))
+
+
+def format_thread_stacks() -> str:
+    """Format the current stack of every thread, like a crash traceback."""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    sections = []
+    for ident, frame in sys._current_frames().items():
+        header = f'Thread "{names.get(ident, ident)}" ({ident}):\n'
+        sections.append(header + "".join(traceback.format_stack(frame)))
+    return "\n".join(sections)
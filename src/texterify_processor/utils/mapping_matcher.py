@@ -0,0 +1,182 @@
+"""Compiled matcher for language mappings and mapping rules."""
+
+import fnmatch
+import functools
+import re
+import warnings
+
+from pathlib import PurePosixPath
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+from ..models.config import ProcessingConfig
+from ..models.mapping import MappingMatch, MappingRule
+
+# Numbered backreferences break once a regex is embedded in an alternation
+NUMBERED_BACKREFERENCE = re.compile(r"\\[1-9]")
+
+
+class _RuleSet:
+    """The rules scoped to one directory, compiled for matching in one pass.
+
+    Exact rules live in a dict. Glob and regex rules are combined into one
+    alternation where each rule is a named group, so a single fullmatch
+    finds the earliest matching rule. Regexes that cannot be combined, such
+    as those with numbered backreferences or global inline flags, are tried
+    one by one.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[int, MappingRule]], flags: int):
+        self.case_sensitive = not flags & re.IGNORECASE
+        self.exact: Dict[str, MappingRule] = {}
+        self.patterns: Dict[int, Tuple[MappingRule, Pattern]] = {}
+        self.separate: List[int] = []
+
+        alternatives = []
+        for index, rule in rules:
+            if rule.kind == "exact":
+                self.exact.setdefault(self._fold(rule.pattern), rule)
+                continue
+
+            source = rule.pattern
+            if rule.kind == "glob":
+                source = fnmatch.translate(rule.pattern)
+            self.patterns[index] = (rule, re.compile(source, flags))
+            if rule.kind == "regex" and NUMBERED_BACKREFERENCE.search(source):
+                self.separate.append(index)
+                continue
+            # Prefix group names so rules cannot clash with each other
+            source = source.replace("(?P<", f"(?P<r{index}_")
+            source = source.replace("(?P=", f"(?P=r{index}_")
+            grouped = f"(?P<rule{index}>{source})"
+            if rule.kind == "regex" and not self._combinable(grouped, flags):
+                self.separate.append(index)
+                continue
+            alternatives.append(grouped)
+
+        self.combined: Optional[Pattern] = None
+        if alternatives:
+            self.combined = re.compile("|".join(alternatives), flags)
+
+    @staticmethod
+    def _combinable(grouped: str, flags: int) -> bool:
+        """Check if a rule's group still compiles after another alternative."""
+        with warnings.catch_warnings():
+            # Before Python 3.11 a misplaced global flag only warns, and then
+            # applies to every rule in the alternation
+            warnings.simplefilter("error", DeprecationWarning)
+            try:
+                re.compile(f"(?!)|{grouped}", flags)
+            except (re.error, DeprecationWarning):
+                return False
+        return True
+
+    def _fold(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def match(self, stem: str) -> Optional[MappingMatch]:
+        """Match a file stem; exact rules win, then the earliest pattern."""
+        rule = self.exact.get(self._fold(stem))
+        if rule is not None:
+            return MappingMatch(rule.target, rule.language or rule.pattern)
+
+        found = None
+        if self.combined is not None:
+            combined_match = self.combined.fullmatch(stem)
+            if combined_match is not None:
+                # The rule's own group closes last, so it is the lastgroup
+                found = int(combined_match.lastgroup[len("rule") :])
+        for index in self.separate:
+            if found is not None and index > found:
+                break
+            if self.patterns[index][1].fullmatch(stem):
+                found = index
+                break
+        if found is None:
+            return None
+
+        rule, pattern = self.patterns[found]
+        rule_match = pattern.fullmatch(stem)
+        if rule.kind == "glob":
+            return MappingMatch(rule.target, rule.language or stem)
+        language = rule_match.expand(rule.language) if rule.language else stem
+        return MappingMatch(rule_match.expand(rule.target), language)
+
+
+class _PathNode:
+    """A directory in the rule trie, with the rules scoped to it."""
+
+    def __init__(self):
+        self.children: Dict[str, "_PathNode"] = {}
+        self.rules: List[Tuple[int, MappingRule]] = []
+        self.rule_set: Optional[_RuleSet] = None
+
+
+class MappingMatcher:
+    """Map archive member paths to target names with precompiled rules.
+
+    Rules are stored in a trie of the directories they are scoped to, and
+    each directory's rules are compiled into a _RuleSet, so matching a
+    member costs one dict lookup and one regex match per directory level
+    that has rules, however many rules there are. Rules in a deeper
+    directory win over rules in its parents.
+    """
+
+    def __init__(self, rules: Sequence[MappingRule], case_sensitive: bool = False):
+        self.case_sensitive = case_sensitive
+        self.root = _PathNode()
+        for index, rule in enumerate(rules):
+            node = self.root
+            for part in self._directory_parts(rule.directory or ""):
+                node = node.children.setdefault(part, _PathNode())
+            node.rules.append((index, rule))
+
+        flags = 0 if case_sensitive else re.IGNORECASE
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            if node.rules:
+                node.rule_set = _RuleSet(node.rules, flags)
+            pending.extend(node.children.values())
+
+    @classmethod
+    def for_config(cls, config: ProcessingConfig) -> "MappingMatcher":
+        """Get the matcher for a configuration, compiling it at most once."""
+        legacy = tuple(
+            MappingRule("exact", language, target, language=language)
+            for language, target in config.language_mappings.items()
+        )
+        return _compile(legacy + tuple(config.mapping_rules), config.case_sensitive)
+
+    def _directory_parts(self, directory: str) -> List[str]:
+        parts = [part for part in directory.split("/") if part not in ("", ".")]
+        if not self.case_sensitive:
+            parts = [part.lower() for part in parts]
+        return parts
+
+    def match(self, member_path: str) -> Optional[MappingMatch]:
+        """Get the mapping for a member path inside the archive, if any."""
+        path = PurePosixPath(member_path.replace("\\", "/"))
+        nodes = [self.root]
+        for part in self._directory_parts(str(path.parent)):
+            node = nodes[-1].children.get(part)
+            if node is None:
+                break
+            nodes.append(node)
+
+        for node in reversed(nodes):
+            if node.rule_set is not None:
+                found = node.rule_set.match(path.stem)
+                if found is not None:
+                    return found
+        return None
+
+    def get_target_name(self, member_path: str) -> Optional[str]:
+        """Get the target name for a member path, if any rule maps it."""
+        found = self.match(member_path)
+        return found.target if found is not None else None
+
+
+@functools.lru_cache(maxsize=16)
+def _compile(rules: Tuple[MappingRule, ...], case_sensitive: bool) -> MappingMatcher:
+    """Compile a matcher; configurations reused across jobs share it."""
+    return MappingMatcher(rules, case_sensitive)
@@ -0,0 +1,282 @@
+"""Per-phase memory profiling with tracemalloc and RSS sampling."""
+
+import contextlib
+import threading
+import tracemalloc
+from dataclasses import dataclass, field
+
+from typing import Dict, Iterator, List, Optional
+
+from .resource_guard import current_rss
+
+# RSS is sampled from a background thread this often
+DEFAULT_RSS_INTERVAL = 0.01
+
+# Allocation sites reported for each phase
+DEFAULT_TOP_SITES = 10
+
+# Budget name that applies to the peak of the whole run
+TOTAL_BUDGET = "total"
+
+
+@dataclass
+class AllocationSite:
+    """A source line and how much the memory allocated there grew."""
+
+    location: str
+    size_diff: int
+    count_diff: int
+
+    def to_dict(self) -> dict:
+        """Convert allocation site to dictionary for serialization."""
+        return {
+            "location": self.location,
+            "size_diff": self.size_diff,
+            "count_diff": self.count_diff,
+        }
+
+
+@dataclass
+class PhaseMemory:
+    """Memory used by one processing phase.
+
+    peak_bytes is the highest traced Python heap size during the phase and
+    retained_bytes is how much the heap grew between its start and end.
+    RSS figures are None where the platform does not report them.
+    """
+
+    phase: str
+    start_bytes: int = 0
+    peak_bytes: int = 0
+    retained_bytes: int = 0
+    rss_start_bytes: Optional[int] = None
+    rss_peak_bytes: Optional[int] = None
+    top_allocations: List[AllocationSite] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Convert phase memory to dictionary for serialization."""
+        return {
+            "phase": self.phase,
+            "start_bytes": self.start_bytes,
+            "peak_bytes": self.peak_bytes,
+            "retained_bytes": self.retained_bytes,
+            "rss_start_bytes": self.rss_start_bytes,
+            "rss_peak_bytes": self.rss_peak_bytes,
+            "top_allocations": [site.to_dict() for site in self.top_allocations],
+        }
+
+
+@dataclass
+class MemoryReport:
+    """Memory profile of a run, phase by phase."""
+
+    phases: List[PhaseMemory] = field(default_factory=list)
+    peak_bytes: int = 0
+    rss_peak_bytes: Optional[int] = None
+    # False on Python < 3.9, where phase peaks include earlier phases
+    per_phase_peaks: bool = True
+
+    def get_phase(self, name: str) -> Optional[PhaseMemory]:
+        """Get the last recorded phase with the given name."""
+        for phase in reversed(self.phases):
+            if phase.phase == name:
+                return phase
+        return None
+
+    def check_budgets(self, budgets: Dict[str, int]) -> List[str]:
+        """List the budgets, in bytes of traced peak, that were exceeded.
+
+        Budgets are keyed by phase name, or by "total" for the whole run.
+        Phases that did not run are not checked.
+        """
+        violations = []
+        for name, budget in budgets.items():
+            if name == TOTAL_BUDGET:
+                peak = self.peak_bytes
+            else:
+                phase = self.get_phase(name)
+                if phase is None:
+                    continue
+                peak = phase.peak_bytes
+            if peak > budget:
+                violations.append(
+                    f"{name} peaked at {peak} bytes (budget {budget} bytes)"
+                )
+        return violations
+
+    def to_dict(self) -> dict:
+        """Convert memory report to dictionary for serialization."""
+        return {
+            "peak_bytes": self.peak_bytes,
+            "rss_peak_bytes": self.rss_peak_bytes,
+            "per_phase_peaks": self.per_phase_peaks,
+            "phases": [phase.to_dict() for phase in self.phases],
+        }
+
+
+class RssSampler:
+    """Sample the process RSS on a daemon thread and keep the highest value."""
+
+    def __init__(self, interval: float = DEFAULT_RSS_INTERVAL):
+        self.interval = interval
+        self.peak: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start sampling in the background."""
+        self.reset()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="texterify-rss-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling, taking one last sample."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sample()
+
+    def reset(self) -> Optional[int]:
+        """Restart the peak from the current RSS and return it."""
+        rss = current_rss()
+        with self._lock:
+            self.peak = rss
+        return rss
+
+    def sample(self):
+        """Read the RSS once and raise the peak if it grew."""
+        rss = current_rss()
+        if rss is None:
+            return
+        with self._lock:
+            if self.peak is None or rss > self.peak:
+                self.peak = rss
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+
+class MemoryProfiler:
+    """Record peak and retained memory, and allocation sites, for each phase.
+
+    tracemalloc only sees allocations made through Python's allocators, so
+    RSS is sampled alongside it to catch memory held by zlib, lzma and the
+    operating system. Tracing slows processing down considerably, so this
+    is meant for benchmark runs rather than production jobs.
+    """
+
+    def __init__(
+        self,
+        top_sites: int = DEFAULT_TOP_SITES,
+        rss_interval: float = DEFAULT_RSS_INTERVAL,
+        frames: int = 1,
+    ):
+        self.top_sites = top_sites
+        self.frames = frames
+        self.report = MemoryReport(per_phase_peaks=hasattr(tracemalloc, "reset_peak"))
+        self._sampler = RssSampler(rss_interval)
+        self._started_tracing = False
+        self._running = False
+
+    def start(self):
+        """Start tracing allocations and sampling RSS."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._sampler.start()
+        self._running = True
+
+    def stop(self) -> MemoryReport:
+        """Stop profiling and return the finished report."""
+        if self._running:
+            self._sampler.stop()
+            self.report.rss_peak_bytes = self._max_rss(
+                self.report.rss_peak_bytes, self._sampler.peak
+            )
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+            self._running = False
+        return self.report
+
+    def __enter__(self) -> "MemoryProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[PhaseMemory]:
+        """Profile the memory used inside the block as the phase name."""
+        if not self._running:
+            raise RuntimeError("MemoryProfiler.phase() called before start()")
+
+        before = self._take_snapshot() if self.top_sites else None
+        if self.report.per_phase_peaks:
+            tracemalloc.reset_peak()
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        phase = PhaseMemory(
+            phase=name, start_bytes=start_bytes, rss_start_bytes=self._sampler.reset()
+        )
+        try:
+            yield phase
+        finally:
+            end_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            self._sampler.sample()
+            phase.peak_bytes = peak_bytes
+            phase.retained_bytes = end_bytes - start_bytes
+            phase.rss_peak_bytes = self._sampler.peak
+            if before is not None:
+                phase.top_allocations = self._compare(before, self._take_snapshot())
+
+            report = self.report
+            report.phases.append(phase)
+            report.peak_bytes = max(report.peak_bytes, peak_bytes)
+            report.rss_peak_bytes = self._max_rss(
+                report.rss_peak_bytes, phase.rss_peak_bytes
+            )
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        """Snapshot the heap, leaving out the profiler's own bookkeeping."""
+        return tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ]
+        )
+
+    def _compare(
+        self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+    ) -> List[AllocationSite]:
+        """Get the lines whose allocations grew the most between snapshots."""
+        stats = [
+            stat for stat in after.compare_to(before, "lineno") if stat.size_diff > 0
+        ]
+        sites = []
+        for stat in stats[: self.top_sites]:
+            frame = stat.traceback[0]
+            sites.append(
+                AllocationSite(
+                    location=f"{frame.filename}:{frame.lineno}",
+                    size_diff=stat.size_diff,
+                    count_diff=stat.count_diff,
+                )
+            )
+        return sites
+
+    @staticmethod
+    def _max_rss(first: Optional[int], second: Optional[int]) -> Optional[int]:
+        """Get the larger of two RSS readings, either of which may be missing."""
+        if first is None:
+            return second
+        if second is None:
+            return first
+        return max(first, second)
@@ -0,0 +1,139 @@
+"""Deflate one large stream on several threads, the way pigz does."""
+
+import functools
+import zlib
+from collections import deque
+from concurrent.futures import Executor, Future
+
+from typing import BinaryIO, Deque, Iterator, List, Tuple
+
+# Uncompressed bytes deflated as one block on one thread
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+# Size of the deflate window; each block is primed with this much of the
+# data before it
+DICTIONARY_SIZE = 32 * 1024
+
+# CRC-32 polynomial, bit-reversed
+CRC32_POLYNOMIAL = 0xEDB88320
+
+# (compressed bytes, CRC-32 of the block, uncompressed length of the block)
+DeflatedBlock = Tuple[bytes, int, int]
+
+
+def deflate_blocks(
+    source: BinaryIO,
+    executor: Executor,
+    level: int,
+    threads: int,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[DeflatedBlock]:
+    """Read source in blocks, deflate them on executor and yield them in order.
+
+    Joined, the compressed pieces form one raw deflate stream. Every block
+    but the last ends with a sync flush, which finishes it on a byte
+    boundary without ending the stream. Each block is primed with the last
+    DICTIONARY_SIZE bytes of the one before, so matches reach back across
+    blocks as they would in a serial stream; the output depends on the
+    block size but not on the number of threads. At most twice threads
+    blocks are read ahead of the one being yielded.
+    """
+    pending: Deque["Future[DeflatedBlock]"] = deque()
+    previous = b""
+    block = read_block(source, block_size)
+    try:
+        while True:
+            following = read_block(source, block_size)
+            last = not following
+            pending.append(
+                executor.submit(
+                    deflate_block, block, previous[-DICTIONARY_SIZE:], level, last
+                )
+            )
+            if len(pending) >= 2 * threads:
+                yield pending.popleft().result()
+            if last:
+                break
+            previous, block = block, following
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def deflate_block(
+    data: bytes, dictionary: bytes, level: int, last: bool
+) -> DeflatedBlock:
+    """Deflate one block, ending the stream after it if it is the last."""
+    if dictionary:
+        compressor = zlib.compressobj(
+            level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary
+        )
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    compressed = compressor.compress(data)
+    compressed += compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return compressed, zlib.crc32(data), len(data)
+
+
+def read_block(source: BinaryIO, size: int) -> bytes:
+    """Read size bytes, or fewer only at the end of source."""
+    parts = []
+    remaining = size
+    while remaining > 0:
+        data = source.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+    return b"".join(parts)
+
+
+def crc32_combine(crc1: int, crc2: int, length2: int) -> int:
+    """Get the CRC-32 of two pieces of data from the CRC-32 of each.
+
+    length2 is the length of the second piece. This is zlib's
+    crc32_combine, which the zlib module does not expose.
+    """
+    if length2 <= 0:
+        return crc1
+    return _gf2_times(_zeros_operator(length2), crc1) ^ crc2
+
+
+@functools.lru_cache(maxsize=16)
+def _zeros_operator(length: int) -> Tuple[int, ...]:
+    """Get the matrix advancing a CRC-32 over length zero bytes.
+
+    Blocks share a length, so the matrix is usually built only once.
+    """
+    # Operator for one zero bit, then squared up to one zero byte
+    power = [CRC32_POLYNOMIAL] + [1 << bit for bit in range(31)]
+    for _ in range(3):
+        power = _gf2_square(power)
+
+    operator = [1 << bit for bit in range(32)]
+    while length:
+        if length & 1:
+            operator = [_gf2_times(power, column) for column in operator]
+        length >>= 1
+        if length:
+            power = _gf2_square(power)
+    return tuple(operator)
+
+
+def _gf2_times(matrix, vector: int) -> int:
+    """Multiply a 32x32 matrix over GF(2), stored by column, by a vector."""
+    total = 0
+    column = 0
+    while vector:
+        if vector & 1:
+            total ^= matrix[column]
+        vector >>= 1
+        column += 1
+    return total
+
+
+def _gf2_square(matrix) -> List[int]:
+    """Square a 32x32 matrix over GF(2)."""
+    return [_gf2_times(matrix, column) for column in matrix]
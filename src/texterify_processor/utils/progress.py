@@ -0,0 +1,129 @@
+"""Throttled progress tracking for processing phases."""
+
+import dataclasses
+import threading
+import time
+from dataclasses import dataclass
+
+from typing import Callable, List, Optional
+
+# Hooks are called at most this often while a phase is running
+DEFAULT_INTERVAL = 0.25
+
+
+@dataclass
+class ProgressSnapshot:
+    """Progress of the current processing phase at one point in time."""
+
+    phase: str
+    bytes_done: int = 0
+    bytes_total: int = 0
+    members_done: int = 0
+    members_total: int = 0
+    elapsed: float = 0.0
+    finished: bool = False
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Get the average throughput of the phase so far."""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.bytes_done / self.elapsed
+
+    @property
+    def fraction(self) -> float:
+        """Get completion as a fraction, by bytes when known, else by members."""
+        if self.bytes_total:
+            return min(self.bytes_done / self.bytes_total, 1.0)
+        if self.members_total:
+            return min(self.members_done / self.members_total, 1.0)
+        return 1.0 if self.finished else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Get the estimated seconds remaining, if it can be estimated."""
+        fraction = self.fraction
+        if self.finished or fraction >= 1.0:
+            return 0.0
+        if fraction <= 0 or self.elapsed <= 0:
+            return None
+        return self.elapsed * (1 - fraction) / fraction
+
+    def to_dict(self) -> dict:
+        """Convert snapshot to dictionary for serialization."""
+        eta = self.eta
+        return {
+            "phase": self.phase,
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "members_done": self.members_done,
+            "members_total": self.members_total,
+            "elapsed": round(self.elapsed, 3),
+            "mb_per_second": round(self.bytes_per_second / (1024 * 1024), 3),
+            "eta": round(eta, 3) if eta is not None else None,
+            "finished": self.finished,
+        }
+
+
+ProgressHook = Callable[[ProgressSnapshot], None]
+
+
+class ProgressTracker:
+    """Count bytes and members for a phase and report them to hooks, throttled.
+
+    Every hook call gets its own copy of the snapshot, so hooks can keep it.
+    """
+
+    def __init__(
+        self,
+        hooks: Optional[List[ProgressHook]] = None,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        self.hooks = list(hooks or [])
+        self.interval = interval
+        self._snapshot: Optional[ProgressSnapshot] = None
+        self._started_at = 0.0
+        self._last_report = 0.0
+        # Archives can be written by several threads at once
+        self._lock = threading.Lock()
+
+    def start_phase(self, phase: str, bytes_total: int = 0, members_total: int = 0):
+        """Begin tracking a new phase."""
+        with self._lock:
+            self._snapshot = ProgressSnapshot(
+                phase=phase, bytes_total=bytes_total, members_total=members_total
+            )
+            self._started_at = time.monotonic()
+            self._last_report = self._started_at
+            self._report(self._started_at)
+
+    def advance(self, bytes_done: int = 0, members_done: int = 0):
+        """Record work done; hooks are only called once per interval."""
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return
+            snapshot.bytes_done += bytes_done
+            snapshot.members_done += members_done
+
+            now = time.monotonic()
+            if now - self._last_report >= self.interval:
+                self._last_report = now
+                self._report(now)
+
+    def finish_phase(self):
+        """Report the final numbers for the current phase."""
+        with self._lock:
+            if self._snapshot is None:
+                return
+            self._snapshot.finished = True
+            self._report(time.monotonic())
+            self._snapshot = None
+
+    def _report(self, now: float):
+        """Call every hook with a copy of the snapshot; caller holds the lock."""
+        if not self.hooks:
+            return
+        self._snapshot.elapsed = now - self._started_at
+        for hook in self.hooks:
+            hook(dataclasses.replace(self._snapshot))
@@ -0,0 +1,146 @@
+"""Resource limit enforcement for archive processing."""
+
+import stat
+import threading
+import time
+import zipfile
+
+import os
+from pathlib import PurePosixPath
+from typing import List, Optional
+
+from ..models.config import ResourceLimits
+
+# Members smaller than this cannot meaningfully fill a disk, so their
+# compression ratio is not checked
+RATIO_CHECK_MIN_BYTES = 1024 * 1024
+
+# Reading the process RSS is a syscall, so memory is sampled at most this often
+MEMORY_CHECK_INTERVAL = 0.25
+
+
+class ResourceLimitExceeded(Exception):
+    """Raised when an archive or job exceeds a configured resource limit."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job whose cancel event was set."""
+
+
+class ResourceGuard:
+    """Track one job's resource usage and fail fast when a limit is hit."""
+
+    def __init__(
+        self, limits: ResourceLimits, cancel_event: Optional[threading.Event] = None
+    ):
+        self.limits = limits
+        self.cancel_event = cancel_event
+        self.started_at = time.monotonic()
+        self.total_bytes = 0
+        self._last_memory_check = 0.0
+
+    def check_archive(self, members: List[zipfile.ZipInfo]):
+        """Check the central directory before any member data is read."""
+        limits = self.limits
+        if limits.max_member_count is not None:
+            if len(members) > limits.max_member_count:
+                raise ResourceLimitExceeded(
+                    f"archive has {len(members)} members "
+                    f"(limit {limits.max_member_count})"
+                )
+
+        declared_total = 0
+        for zinfo in members:
+            self.check_member_path(zinfo)
+            self.check_member_bytes(zinfo, zinfo.file_size)
+            declared_total += zinfo.file_size
+
+        self._check_total(declared_total)
+
+    def check_member_path(self, zinfo: zipfile.ZipInfo):
+        """Reject path traversal, absolute paths, deep nesting and symlinks."""
+        name = zinfo.filename.replace("\\", "/")
+        path = PurePosixPath(name)
+        if (
+            name.startswith("/")
+            or ".." in path.parts
+            or (path.parts and path.parts[0].endswith(":"))
+        ):
+            raise ResourceLimitExceeded(f"unsafe member path: {zinfo.filename}")
+
+        max_depth = self.limits.max_path_depth
+        if max_depth is not None and len(path.parts) > max_depth:
+            raise ResourceLimitExceeded(
+                f"member path is nested deeper than {max_depth} levels: "
+                f"{zinfo.filename}"
+            )
+
+        mode = zinfo.external_attr >> 16
+        if not self.limits.allow_symlinks and stat.S_ISLNK(mode):
+            raise ResourceLimitExceeded(
+                f"symlink members are not allowed: {zinfo.filename}"
+            )
+
+    def check_member_bytes(self, zinfo: zipfile.ZipInfo, member_bytes: int):
+        """Check the expansion ratio of a member after member_bytes were read."""
+        max_ratio = self.limits.max_compression_ratio
+        if max_ratio is None or member_bytes < RATIO_CHECK_MIN_BYTES:
+            return
+
+        compress_size = max(zinfo.compress_size, 1)
+        if member_bytes / compress_size > max_ratio:
+            raise ResourceLimitExceeded(
+                f"member {zinfo.filename} expands more than {max_ratio:g}x "
+                f"its compressed size"
+            )
+
+    def add_bytes(self, count: int):
+        """Account for bytes written to disk during extraction."""
+        self.total_bytes += count
+        self._check_total(self.total_bytes)
+
+    def check_budgets(self):
+        """Check the job's wall-clock and memory budgets, and its cancel event."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise JobCancelled("job was cancelled")
+
+        now = time.monotonic()
+        max_seconds = self.limits.max_job_seconds
+        if max_seconds is not None and now - self.started_at > max_seconds:
+            raise ResourceLimitExceeded(
+                f"job exceeded its {max_seconds:g}s wall-clock budget"
+            )
+
+        max_memory = self.limits.max_memory_bytes
+        if max_memory is None or now - self._last_memory_check < MEMORY_CHECK_INTERVAL:
+            return
+
+        self._last_memory_check = now
+        rss = current_rss()
+        if rss is not None and rss > max_memory:
+            raise ResourceLimitExceeded(
+                f"memory usage of {rss} bytes exceeds the {max_memory} byte budget"
+            )
+
+    def _check_total(self, total: int):
+        """Check a total uncompressed byte count against the limit."""
+        max_total = self.limits.max_total_bytes
+        if max_total is not None and total > max_total:
+            raise ResourceLimitExceeded(
+                f"total uncompressed size exceeds the {max_total} byte limit"
+            )
+
+
+def current_rss() -> Optional[int]:
+    """Get the resident set size of this process in bytes, if available.
+
+    Only /proc reports the current size; elsewhere None is returned rather
+    than the lifetime peak, which would keep failing every later job once
+    one job had exceeded a budget.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
@@ -0,0 +1,59 @@
+"""Generate synthetic Texterify exports for benchmarks and tests."""
+
+import random
+import zipfile
+from dataclasses import dataclass
+
+import json
+from pathlib import Path
+from typing import Tuple
+
+
+@dataclass
+class SyntheticExport:
+    """Shape of a generated export.
+
+    Language files are named <language>.json, with keys_per_language nested
+    keys each. Assets are random bytes, so they do not compress, which keeps
+    archive sizes close to what real image-heavy exports look like.
+    """
+
+    languages: Tuple[str, ...] = ("en", "tr")
+    keys_per_language: int = 1000
+    asset_count: int = 10
+    asset_size: int = 64 * 1024
+    seed: int = 0
+
+    def write(self, path: Path) -> Path:
+        """Write the export as a zip at path and return the path."""
+        rng = random.Random(self.seed)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for language in self.languages:
+                archive.writestr(
+                    f"{language}.json",
+                    json.dumps(self._language_file(rng, language), indent=2),
+                )
+            archive.writestr(
+                "_metadata.json",
+                json.dumps({"languages": list(self.languages), "synthetic": True}),
+            )
+            for index in range(self.asset_count):
+                archive.writestr(
+                    f"assets/images/asset_{index:04d}.bin", self._random_bytes(rng)
+                )
+        return path
+
+    def _random_bytes(self, rng: random.Random) -> bytes:
+        """Get asset_size random bytes."""
+        if self.asset_size <= 0:
+            return b""
+        return rng.getrandbits(8 * self.asset_size).to_bytes(self.asset_size, "little")
+
+    def _language_file(self, rng: random.Random, language: str) -> dict:
+        """Build a language file, grouping keys ten to a section."""
+        content: dict = {}
+        for index in range(self.keys_per_language):
+            section = content.setdefault(f"section_{index // 10:04d}", {})
+            words = " ".join(f"w{rng.randrange(10000)}" for _ in range(8))
+            section[f"key_{index:05d}"] = f"{language}: {words}"
+        return content
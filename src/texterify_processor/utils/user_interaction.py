@@ -2,9 +2,10 @@
 
 from enum import Enum
 
-import sys
 from typing import Optional
 
+from console_output import ConsoleOutput
+
 
 class ConflictResolution(Enum):
     """Enum for conflict resolution choices."""
@@ -17,62 +18,42 @@ class ConflictResolution(Enum):
 class UserInteraction:
     """Utility class for user interactions."""
 
-    @staticmethod
-    def _supports_unicode():
-        """Check if the current environment supports Unicode emojis."""
-        try:
-            # Test if we can encode a simple emoji
-            "🚀".encode(sys.stdout.encoding or "utf-8")
-            return True
-        except (UnicodeEncodeError, UnicodeError):
-            return False
-
-    @staticmethod
-    def _get_symbols():
-        """Get appropriate symbols based on Unicode support."""
-        if UserInteraction._supports_unicode():
-            return {
-                "warning": "⚠️ ",
-                "note": "📝",
-                "error": "❌",
-            }
-        else:
-            return {
-                "warning": "[WARN]",
-                "note": "[NOTE]",
-                "error": "[ERROR]",
-            }
-
     @staticmethod
     def get_conflict_resolution(existing_filename: str) -> Optional[ConflictResolution]:
         """Get user choice for handling file conflicts."""
-        symbols = UserInteraction._get_symbols()
-        print(f"\n{symbols['warning']} Output file already exists: {existing_filename}")
-        print("\nWhat would you like to do?")
-        print("1. Overwrite existing file")
-        print("2. Add counter to create new file")
-        print("3. Cancel operation")
+        warning = ConsoleOutput.get_symbol("warning")
+        note = ConsoleOutput.get_symbol("note")
+        error = ConsoleOutput.get_symbol("error")
+        ConsoleOutput.print_notice(
+            f"\n{warning} Output file already exists: {existing_filename}"
+        )
+        ConsoleOutput.print_notice("\nWhat would you like to do?")
+        ConsoleOutput.print_notice("1. Overwrite existing file")
+        ConsoleOutput.print_notice("2. Add counter to create new file")
+        ConsoleOutput.print_notice("3. Cancel operation")
 
         while True:
             try:
-                choice = input("\nEnter your choice (1-3): ").strip()
+                choice = ConsoleOutput.prompt("\nEnter your choice (1-3): ").strip()
 
                 if choice == "1":
-                    print(f"{symbols['note']} Will overwrite existing file")
+                    ConsoleOutput.print_notice(f"{note} Will overwrite existing file")
                     return ConflictResolution.OVERWRITE
                 elif choice == "2":
-                    print(f"{symbols['note']} Will create new file with counter")
+                    ConsoleOutput.print_notice(
+                        f"{note} Will create new file with counter"
+                    )
                     return ConflictResolution.ADD_COUNTER
                 elif choice == "3":
-                    print(f"{symbols['error']} Operation cancelled by user")
+                    ConsoleOutput.print_notice(f"{error} Operation cancelled by user")
                     return ConflictResolution.CANCEL
                 else:
-                    print(
-                        f"{symbols['error']} Invalid choice. Please enter 1, 2, or 3."
+                    ConsoleOutput.print_notice(
+                        f"{error} Invalid choice. Please enter 1, 2, or 3."
                     )
 
             except (EOFError, KeyboardInterrupt):
-                print(f"\n{symbols['error']} Operation cancelled by user")
+                ConsoleOutput.print_notice(f"\n{error} Operation cancelled by user")
                 return ConflictResolution.CANCEL
 
     @staticmethod
@@ -81,7 +62,7 @@ class UserInteraction:
         suffix = " [Y/n]" if default else " [y/N]"
 
         try:
-            response = input(f"{message}{suffix}: ").strip().lower()
+            response = ConsoleOutput.prompt(f"{message}{suffix}: ").strip().lower()
 
             if not response:
                 return default
@@ -213,6 +213,298 @@ class TestEndToEndProcessing(unittest.TestCase):
         )  # Sequential counters
 
 
+class TestBatchProcessing(unittest.TestCase):
+    """Test non-interactive batch processing"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+        self.zip_paths = []
+        for index in range(3):
+            zip_path = self.temp_path / f"batch_{index}.zip"
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                zf.writestr("en.json", json.dumps({"index": index}))
+            self.zip_paths.append(str(zip_path))
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch("builtins.input", side_effect=AssertionError("must not prompt"))
+    def test_batch_uses_counter_without_prompting(self, mock_input):
+        """Test that a batch resolves conflicts with counters and counts jobs"""
+        from texterify_processor import BatchController
+
+        batch = BatchController(self.zip_paths).run()
+
+        self.assertTrue(batch.success)
+        self.assertEqual(batch.total, 3)
+        self.assertEqual(batch.succeeded, 3)
+        self.assertEqual(len(list(self.temp_path.glob("lang_files_*.zip"))), 3)
+
+    def test_batch_skip_policy_reports_failure(self):
+        """Test that the skip policy leaves existing outputs alone"""
+        from texterify_processor import BatchController
+        from texterify_processor.utils.user_interaction import ConflictResolution
+
+        batch = BatchController(
+            self.zip_paths[:2], conflict_resolution=ConflictResolution.CANCEL
+        ).run()
+
+        self.assertEqual(batch.succeeded, 1)
+        self.assertEqual(batch.failed, 1)
+        self.assertEqual(len(list(self.temp_path.glob("lang_files_*.zip"))), 1)
+
+    def test_batch_writes_metrics_textfile(self):
+        """Test that batch results are exported for a textfile collector"""
+        from texterify_processor import BatchController
+        from texterify_processor.services import MetricsRegistry
+
+        metrics_file = self.temp_path / "texterify.prom"
+        metrics = MetricsRegistry(textfile=metrics_file)
+        BatchController(self.zip_paths, metrics=metrics).run()
+
+        text = metrics_file.read_text(encoding="utf-8")
+        self.assertIn('texterify_jobs_total{status="succeeded"} 3', text)
+        self.assertIn("texterify_queue_depth 0", text)
+        self.assertIn("# TYPE texterify_worker_utilization gauge", text)
+        self.assertIn('texterify_worker_utilization{worker="worker-1"} ', text)
+        self.assertIn('texterify_phase_duration_seconds_count{phase="extract"} 3', text)
+        self.assertEqual(list(self.temp_path.glob(".texterify.prom.*")), [])
+
+    def test_journal_skips_completed_jobs(self):
+        """Test that a rerun with the same journal only runs unfinished jobs"""
+        from texterify_processor import BatchController
+        from texterify_processor.services import BatchJournal
+
+        journal_path = self.temp_path / "batch.journal"
+        journal = BatchJournal(journal_path)
+        first = BatchController(self.zip_paths[:2], journal=journal).run()
+        journal.close()
+        self.assertEqual(first.succeeded, 2)
+
+        journal = BatchJournal(journal_path)
+        second = BatchController(self.zip_paths, journal=journal).run()
+        journal.close()
+
+        self.assertTrue(second.success)
+        self.assertEqual((second.total, second.succeeded, second.skipped), (3, 1, 2))
+        self.assertEqual(len(list(self.temp_path.glob("lang_files_*.zip"))), 3)
+
+        # A different config makes every job new again
+        journal = BatchJournal(journal_path)
+        third = BatchController(
+            self.zip_paths[:1], journal=journal, output_mode="tar"
+        ).run()
+        journal.close()
+        self.assertEqual(third.skipped, 0)
+
+    def test_journal_and_catalog_hash_each_input_once(self):
+        """Test that the catalog reuses the fingerprint taken for the journal"""
+        from texterify_processor import BatchController
+        from texterify_processor.services import BatchJournal, CatalogService
+        from texterify_processor.services.archive_service import ArchiveService
+
+        catalog = CatalogService(self.temp_path / "catalog.db")
+        self.addCleanup(catalog.close)
+        journal = BatchJournal(self.temp_path / "batch.journal")
+        self.addCleanup(journal.close)
+        with patch.object(
+            ArchiveService, "fingerprint", wraps=ArchiveService.fingerprint
+        ) as fingerprint:
+            batch = BatchController(
+                self.zip_paths, journal=journal, catalog=catalog
+            ).run()
+
+        self.assertEqual(batch.succeeded, 3)
+        hashed = [str(call[0][0]) for call in fingerprint.call_args_list]
+        for zip_path in self.zip_paths:
+            self.assertEqual(hashed.count(zip_path), 1)
+            self.assertEqual(len(catalog.find_jobs(input_path=zip_path)), 1)
+
+    def test_journal_removes_partial_outputs_of_interrupted_jobs(self):
+        """Test that a rerun removes what a crashed job left and redoes it"""
+        from texterify_processor import BatchController
+        from texterify_processor.models.journal import JOB_STARTED, JOB_WRITING
+        from texterify_processor.services import ArchiveService, BatchJournal
+
+        controller = ProcessorController(self.zip_paths[0])
+        partial = controller.output_service.get_output_path(
+            controller.output_service.generate_output_filename()
+        )
+        partial.write_bytes(b"PK\x03\x04 cut short")
+        key = BatchJournal.job_key(
+            ArchiveService.fingerprint(controller.zip_path), controller.config
+        )
+        journal_path = self.temp_path / "batch.journal"
+        journal = BatchJournal(journal_path, batch_size=1000, flush_interval=3600)
+        journal.record(key, JOB_STARTED, input=str(controller.zip_path))
+        journal.record(key, JOB_WRITING, path=str(partial))
+        # The writing record is on disk before any flush; a crash tore the next
+        self.assertIn(JOB_WRITING, journal_path.read_text(encoding="utf-8"))
+        with open(journal_path, "a", encoding="utf-8") as f:
+            f.write('{"key": "torn')
+
+        journal = BatchJournal(journal_path)
+        batch = BatchController(self.zip_paths[:1], journal=journal).run()
+        journal.close()
+
+        self.assertTrue(batch.success)
+        self.assertEqual(list(self.temp_path.glob("lang_files_*.zip")), [partial])
+        with zipfile.ZipFile(partial) as zf:
+            self.assertIsNone(zf.testzip())
+        reopened = BatchJournal(journal_path)
+        self.assertTrue(reopened.is_completed(key))
+        reopened.close()
+
+    def test_journal_keeps_outputs_owned_by_completed_jobs(self):
+        """Test that recovery spares a file a later job overwrote and finished"""
+        from texterify_processor.models.journal import (
+            JOB_COMPLETED,
+            JOB_STARTED,
+            JOB_WRITING,
+        )
+        from texterify_processor.services import BatchJournal
+
+        shared = self.temp_path / "lang_files.zip"
+        shared.write_bytes(b"finished output")
+        orphan = self.temp_path / "lang_files_orphan.zip"
+        orphan.write_bytes(b"cut short")
+        journal_path = self.temp_path / "batch.journal"
+        journal = BatchJournal(journal_path)
+        journal.record("interrupted", JOB_STARTED)
+        journal.record("interrupted", JOB_WRITING, path=str(shared))
+        journal.record("interrupted", JOB_WRITING, path=str(orphan))
+        journal.record("overwriter", JOB_STARTED)
+        journal.record("overwriter", JOB_WRITING, path=str(shared))
+        journal.record("overwriter", JOB_COMPLETED, output=str(shared))
+        journal.close()
+
+        journal = BatchJournal(journal_path)
+        removed = journal.recover()
+        journal.close()
+
+        self.assertEqual(removed, [orphan])
+        self.assertEqual(shared.read_bytes(), b"finished output")
+
+    def test_parallel_batch_gives_every_job_its_own_output(self):
+        """Test that concurrent jobs in one directory never share a name"""
+        from texterify_processor import BatchController
+
+        for index in range(3, 8):
+            zip_path = self.temp_path / f"batch_{index}.zip"
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                zf.writestr("en.json", json.dumps({"index": index}))
+            self.zip_paths.append(str(zip_path))
+
+        batch = BatchController(self.zip_paths, jobs=3, small_job_bytes=0).run()
+
+        self.assertTrue(batch.success)
+        self.assertEqual(batch.succeeded, 8)
+        outputs = list(self.temp_path.glob("lang_files_*.zip"))
+        self.assertEqual(len(outputs), 8)
+        self.assertEqual(
+            [worker.name for worker in batch.workers],
+            ["worker-1", "worker-2", "worker-3"],
+        )
+        self.assertEqual(sum(worker.jobs for worker in batch.workers), 8)
+        for worker in batch.workers:
+            self.assertLessEqual(worker.busy_seconds, worker.wall_seconds)
+
+    def test_parallel_batch_records_every_job_in_the_catalog(self):
+        """Test that jobs on worker threads can write to the catalog"""
+        from texterify_processor import BatchController
+        from texterify_processor.services import CatalogService
+
+        catalog = CatalogService(self.temp_path / "catalog.db")
+        self.addCleanup(catalog.close)
+        batch = BatchController(
+            self.zip_paths, jobs=2, small_job_bytes=0, catalog=catalog
+        ).run()
+
+        self.assertEqual(batch.succeeded, 3)
+        for zip_path in self.zip_paths:
+            self.assertEqual(len(catalog.find_jobs(input_path=zip_path)), 1)
+
+    def test_parallel_jobs_share_the_memory_budget(self):
+        """Test that workers keep the process memory budget and warn about it"""
+        from console_output import ConsoleOutput
+        from texterify_processor import BatchController
+        from texterify_processor.utils.resource_guard import current_rss
+
+        config_path = self.temp_path / "limits.json"
+        limits = {}
+        config = {
+            "language_mappings": {"en": "english"},
+            "settings": {"limits": limits},
+        }
+        for max_memory, expected in ((1 << 40, 3), (1, 0)):
+            limits["max_memory_bytes"] = max_memory
+            config_path.write_text(json.dumps(config), encoding="utf-8")
+            with patch.object(ConsoleOutput, "print_warning") as print_warning:
+                batch = BatchController(
+                    self.zip_paths, str(config_path), jobs=2, small_job_bytes=0
+                ).run()
+
+            warnings = [call[0][0] for call in print_warning.call_args_list]
+            shared = [w for w in warnings if "covers all 2 jobs" in w]
+            self.assertEqual(len(shared), 1)
+            if current_rss() is not None:
+                self.assertEqual(batch.succeeded, expected)
+
+    def test_parallel_overwrites_wait_for_each_other(self):
+        """Test that jobs overwriting one output take turns"""
+        from texterify_processor import BatchController
+        from texterify_processor.utils.user_interaction import ConflictResolution
+
+        batch = BatchController(
+            self.zip_paths,
+            conflict_resolution=ConflictResolution.OVERWRITE,
+            jobs=3,
+        ).run()
+
+        self.assertTrue(batch.success)
+        outputs = list(self.temp_path.glob("lang_files_*"))
+        self.assertEqual(len(outputs), 1)
+        with zipfile.ZipFile(outputs[0]) as zf:
+            self.assertIsNone(zf.testzip())
+
+    def test_conflict_prompt_does_not_hold_the_naming_lock(self):
+        """Test that other jobs can claim names while the user is prompted"""
+        import threading
+
+        from texterify_processor.services.output_service import OutputService
+        from texterify_processor.utils.user_interaction import (
+            ConflictResolution,
+            UserInteraction,
+        )
+
+        self.assertTrue(ProcessorController(self.zip_paths[0]).process().success)
+        acquired = []
+
+        def take_lock():
+            if OutputService.naming_lock.acquire(timeout=1):
+                acquired.append(True)
+                OutputService.naming_lock.release()
+
+        def prompt(filename):
+            other_job = threading.Thread(target=take_lock)
+            other_job.start()
+            other_job.join()
+            return ConflictResolution.ADD_COUNTER
+
+        with patch.object(
+            UserInteraction, "get_conflict_resolution", side_effect=prompt
+        ):
+            result = ProcessorController(self.zip_paths[1]).process()
+
+        self.assertTrue(result.success)
+        self.assertTrue(result.used_counter)
+        self.assertEqual(acquired, [True])
+
+
 class TestCommandLineInterface(unittest.TestCase):
     """Test command-line interface"""
 
@@ -228,6 +520,7 @@ class TestCommandLineInterface(unittest.TestCase):
         self.script_path = (
             Path(__file__).parent.parent / "src" / "texterify_processor.py"
         )
+        self.main_path = Path(__file__).parent.parent / "src" / "main.py"
 
     def tearDown(self):
         import shutil
@@ -266,6 +559,27 @@ class TestCommandLineInterface(unittest.TestCase):
             f"Expected 'texterify' in output: {repr(combined_output)}",
         )
 
+    def test_inspect_json_output(self):
+        """Test inspect command with --json output"""
+        result = subprocess.run(
+            [
+                sys.executable,
+                str(self.main_path),
+                "inspect",
+                str(self.test_zip),
+                "--json",
+            ],
+            capture_output=True,
+            text=True,
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        report = json.loads(result.stdout)
+        self.assertTrue(report["archive"]["is_valid"])
+        self.assertEqual(report["archive"]["members"][0]["name"], "en.json")
+        self.assertIsNotNone(report["archive"]["members"][0]["target_name"])
+        self.assertTrue(report["output_filename"].endswith(".zip"))
+
 
 class TestErrorHandling(unittest.TestCase):
     """Test error handling scenarios"""